@@ -1,5 +1,22 @@
-from .security import hash_password, encrypt_data, decrypt_data
+import heapq
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
+import base64
+
+from .security import (
+    hash_password, encrypt_data, decrypt_data, encrypt_many, decrypt_many, blind_index,
+    GENESIS_HASH, chain_log_hash, sign_checkpoint, verify_checkpoint_signature,
+    REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_REUSE_GRACE_SECONDS, generate_refresh_token, hash_refresh_token,
+)
+from .ethics import evaluate_ethics_batch
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update, delete, select, func, or_, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from . import models, schemas
@@ -35,6 +52,137 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
+def get_user_by_login(db: Session, login: str):
+    """
+    Email veya kullanıcı adıyla tek sorguda arar (iki unique index de kullanılır).
+    Bir kullanıcının email'i başka birinin kullanıcı adıyla çakışırsa email eşleşmesi önceliklidir.
+    """
+    users = db.query(models.User).filter(or_(models.User.email == login, models.User.username == login)).all()
+    for user in users:
+        if user.email == login:
+            return user
+    return users[0] if users else None
+
+
+# ---------- REFRESH TOKENS ----------
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> Tuple[str, models.RefreshToken]:
+    """
+    Yeni refresh token üretir (family_id verilmezse yeni aile). Veritabanında yalnızca hash'i tutulur.
+    Commit çağırana aittir.
+    """
+    token = generate_refresh_token()
+    row = models.RefreshToken(
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(row)
+    db.flush()
+    return token, row
+
+
+def revoke_refresh_family(db: Session, family_id: str) -> int:
+    return db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family_id == family_id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    ).rowcount
+
+
+def _family_active(db: Session, family_id: str, now: datetime) -> bool:
+    return db.execute(
+        select(models.RefreshToken.id).where(
+            models.RefreshToken.family_id == family_id,
+            models.RefreshToken.revoked_at.is_(None),
+            models.RefreshToken.expires_at > now,
+        ).limit(1)
+    ).first() is not None
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[models.User, str]:
+    """
+    Refresh token'ı tek kullanımlık olarak tüketir ve aynı ailede yenisini verir (commit eder).
+    İptal, koşullu UPDATE ile yapılır; aynı token'la eşzamanlı iki istekten yalnızca biri kazanır.
+
+    Kaybeden istek, token REFRESH_TOKEN_REUSE_GRACE_SECONDS içinde döndürülmüşse ve aile hâlâ
+    aktifse (örn. aynı localStorage'ı paylaşan iki sekme aynı anda yeniledi) aynı ailede kendi
+    token'ını alır. Daha geç gelen veya iptal edilmiş (logout) bir ailedeki token yeniden kullanım
+    sayılır ve tüm aile iptal edilir.
+
+    Raises:
+        ValueError: Token geçersiz, süresi dolmuş veya yeniden kullanılmışsa
+    """
+    row = db.execute(
+        select(models.RefreshToken).where(models.RefreshToken.token_hash == hash_refresh_token(token))
+    ).scalar_one_or_none()
+    if row is None:
+        raise ValueError("Invalid refresh token")
+
+    now = datetime.utcnow()
+    consumed = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == row.id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    ).rowcount
+    if not consumed:
+        # Kazanan transaction'ın yazdığı revoked_at / replaced_by_id değerlerini oku
+        db.refresh(row)
+        in_grace = (
+            row.replaced_by_id is not None
+            and row.revoked_at is not None
+            and now - row.revoked_at <= timedelta(seconds=REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        )
+        if not (in_grace and row.expires_at > now and _family_active(db, row.family_id, now)):
+            # Kullanılmış token tekrar geldi: token çalınmış olabilir, tüm oturum ailesi iptal
+            revoke_refresh_family(db, row.family_id)
+            db.commit()
+            raise ValueError("Refresh token reuse detected")
+
+        user = db.get(models.User, row.user_id)
+        if user is None:
+            db.rollback()
+            raise ValueError("Invalid refresh token")
+        new_token, _ = issue_refresh_token(db, user.id, row.family_id)
+        db.commit()
+        return user, new_token
+    if row.expires_at <= now:
+        db.rollback()
+        raise ValueError("Refresh token expired")
+
+    user = db.get(models.User, row.user_id)
+    if user is None:
+        db.rollback()
+        raise ValueError("Invalid refresh token")
+
+    new_token, new_row = issue_refresh_token(db, user.id, row.family_id)
+    db.execute(
+        update(models.RefreshToken).where(models.RefreshToken.id == row.id).values(replaced_by_id=new_row.id)
+    )
+    db.commit()
+    return user, new_token
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Logout: token'ın ait olduğu oturum ailesinin tamamını iptal eder (commit eder)."""
+    family_id = db.execute(
+        select(models.RefreshToken.family_id).where(models.RefreshToken.token_hash == hash_refresh_token(token))
+    ).scalar_one_or_none()
+    if family_id is None:
+        return False
+    revoke_refresh_family(db, family_id)
+    db.commit()
+    return True
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    deleted = db.execute(
+        delete(models.RefreshToken).where(models.RefreshToken.expires_at < datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return deleted
+
 
 # ---------- AI DECISION ----------
 
@@ -47,9 +195,19 @@ def create_ai_decision(db: Session, decision: schemas.AIDecisionCreate, owner_id
         decision_label=decision.decision_label,
         score=decision.score,
         sensitive_attribute=encrypted_sensitive_attr, # Şifreli hâlini kaydet
+        sensitive_attribute_bidx=blind_index(decision.sensitive_attribute),
+        created_at=datetime.utcnow(),
     )
     try:
         db.add(db_decision)
+        track_inserted_decisions(db, [{
+            "decision_label": db_decision.decision_label,
+            "score": db_decision.score,
+            "created_at": db_decision.created_at,
+            "sensitive_attribute": db_decision.sensitive_attribute,
+            "sensitive_attribute_bidx": db_decision.sensitive_attribute_bidx,
+        }])
+        queue_fairness_events(db, [decision.sensitive_attribute], [decision.decision_label], db_decision.created_at)
         db.commit()
         db.refresh(db_decision)
 
@@ -62,31 +220,1030 @@ def create_ai_decision(db: Session, decision: schemas.AIDecisionCreate, owner_id
         raise e
 
 
-def get_ai_decision(db: Session, decision_id: int):
+def get_ai_decision(db: Session, decision_id: int, decrypt: bool = True):
+    """
+    decrypt=False: kayıt session'dan ayrılmış ama hâlâ şifreli döner; çözme işi çağırana
+    (ör. async endpoint'in thread pool'u) bırakılır, bkz. decrypt_detached_decisions.
+    """
     decision = db.query(models.AIDecision).filter(models.AIDecision.id == decision_id).first()
 
+    if decision and not decrypt:
+        return detach_decisions(db, [decision])[0]
+
     # Okurken şifreyi çöz (Decryption)
     if decision and decision.sensitive_attribute:
         # DB objesini geçici olarak değiştiriyoruz (Commit etmediğimiz sürece DB'de değişmez)
-        decision.sensitive_attribute = decrypt_data(decision.sensitive_attribute)
+        decrypt_decisions(db, [decision])
         
     return decision
 
+# ---------- KEYSET PAGINATION ----------
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """(created_at, id) -> opak cursor string"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: Cursor bozuksa
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def build_decision_list_stmt(limit: int, cursor: Optional[str] = None,
+                             decision_label: Optional[str] = None, owner_id: Optional[int] = None,
+                             min_score: Optional[float] = None, max_score: Optional[float] = None,
+                             start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    (created_at DESC, id DESC) sırasında keyset sayfalama sorgusu. OFFSET kullanılmaz; cursor
+    bir önceki sayfanın son satırıdır, böylece derin sayfalar ilk sayfa kadar ucuzdur.
+    Bir fazla satır (limit + 1) istenir; fazlası varsa sonraki sayfa vardır.
+    """
+    stmt = select(models.AIDecision)
+    if decision_label:
+        stmt = stmt.where(models.AIDecision.decision_label == decision_label)
+    if owner_id is not None:
+        stmt = stmt.where(models.AIDecision.owner_id == owner_id)
+    if min_score is not None:
+        stmt = stmt.where(models.AIDecision.score >= min_score)
+    if max_score is not None:
+        stmt = stmt.where(models.AIDecision.score <= max_score)
+    if start is not None:
+        stmt = stmt.where(models.AIDecision.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.AIDecision.created_at < end)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(models.AIDecision.created_at, models.AIDecision.id) < tuple_(created_at, row_id))
+
+    return stmt.order_by(models.AIDecision.created_at.desc(), models.AIDecision.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """limit + 1 satırdan (sayfa, sonraki cursor) üretir."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+
+def list_ai_decisions(db: Session, limit: int, cursor: Optional[str] = None, decrypt: bool = True,
+                      **filters) -> Tuple[List[models.AIDecision], Optional[str]]:
+    """decrypt=False: sayfa session'dan ayrılmış, şifreli döner (bkz. get_ai_decision)."""
+    rows = list(db.execute(build_decision_list_stmt(limit, cursor, **filters)).scalars().all())
+    page, next_cursor = split_page(rows, limit)
+    if not decrypt:
+        return detach_decisions(db, page), next_cursor
+    return decrypt_decisions(db, page), next_cursor
+
+
+# ---------- EXPORT ----------
+
+DECISION_EXPORT_COLUMNS = ("id", "owner_id", "decision_label", "score", "sensitive_attribute",
+                           "sensitive_attribute_bidx", "created_at")
+LOG_EXPORT_COLUMNS = ("id", "chain_seq", "decision_id", "actor_user_id", "event_type", "message",
+                      "prev_hash", "hash", "created_at")
+
+
+def build_decision_export_stmt(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Tam karar geçmişi (id sırasıyla), ORM objesi yerine yalnızca kolon tuple'ları."""
+    stmt = select(*(getattr(models.AIDecision, c) for c in DECISION_EXPORT_COLUMNS))
+    if start is not None:
+        stmt = stmt.where(models.AIDecision.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.AIDecision.created_at < end)
+    return stmt.order_by(models.AIDecision.id)
+
+
+def build_log_export_stmt(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          event_type: Optional[str] = None):
+    stmt = select(*(getattr(models.DecisionLog, c) for c in LOG_EXPORT_COLUMNS))
+    if event_type:
+        stmt = stmt.where(models.DecisionLog.event_type == event_type)
+    if start is not None:
+        stmt = stmt.where(models.DecisionLog.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.DecisionLog.created_at < end)
+    return stmt.order_by(models.DecisionLog.id)
+
+
+# ---------- AGGREGATES ----------
+
+# Commit sonrası canlı fairness monitörüne aktarılacak olaylar (session.info içinde bekler)
+FAIRNESS_EVENTS_KEY = "fairness_events"
+APPROVED_LABELS = {"APPROVED"}
+
+
+def queue_fairness_events(db: Session, groups: List[Optional[str]], labels: List[str], created_at: datetime):
+    """
+    Kararları (grup, onaylandı mı, zaman) olarak session'a iliştirir; transaction commit
+    edildiğinde monitör tarafından işlenir, rollback olursa atılır.
+    """
+    ts = created_at.replace(tzinfo=timezone.utc).timestamp()
+    db.info.setdefault(FAIRNESS_EVENTS_KEY, []).extend(
+        (group, label.upper() in APPROVED_LABELS, ts)
+        for group, label in zip(groups, labels)
+    )
+
+
+def _increment(db: Session, model, key: Dict[str, Any], deltas: Dict[str, Any]):
+    """
+    Sayaç satırını atomik olarak artırır (UPDATE ... SET c = c + n); satır yoksa ekler.
+    Eşzamanlı ilk INSERT çakışırsa savepoint geri alınır ve UPDATE tekrarlanır.
+    """
+    conditions = [getattr(model, k) == v for k, v in key.items()]
+    stmt = update(model).where(*conditions).values(
+        {col: getattr(model, col) + delta for col, delta in deltas.items()}
+    )
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(model).values(**key, **deltas))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def _register_groups(db: Session, samples: Dict[str, str]):
+    """
+    Sözlükte olmayan grupları (blind index -> şifreli örnek) ekler. Bilinen gruplar için maliyet
+    tek bir primary key sorgusudur. Eşzamanlı ilk INSERT çakışırsa diğer yazarın örneği kalır.
+    """
+    if not samples:
+        return
+    known = set(db.execute(
+        select(models.SensitiveGroup.bidx).where(models.SensitiveGroup.bidx.in_(list(samples)))
+    ).scalars())
+    for bidx in sorted(set(samples) - known):
+        try:
+            with db.begin_nested():
+                db.execute(insert(models.SensitiveGroup).values(bidx=bidx, sample=samples[bidx]))
+        except IntegrityError:
+            pass
+
+
+def _group_samples(rows: List[dict]) -> Dict[str, str]:
+    samples: Dict[str, str] = {}
+    for row in rows:
+        bidx, token = row.get("sensitive_attribute_bidx"), row.get("sensitive_attribute")
+        if bidx and token:
+            samples.setdefault(bidx, token)
+    return samples
+
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+ROLLUP_SCORE_BINS = 10
+
+
+def _bucket_start(ts: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _score_bin(score: float) -> str:
+    return str(min(int(score * ROLLUP_SCORE_BINS), ROLLUP_SCORE_BINS - 1))
+
+
+def _rollup_deltas(rows: List[dict]) -> Dict[tuple, list]:
+    """
+    (granularity, bucket_start, dimension, key) -> [count, score_sum]
+    Grup boyutunun anahtarı blind index'tir; hassas değer rollup tablosunda düz metin olarak tutulmaz.
+    """
+    deltas: Dict[tuple, list] = {}
+    for row in rows:
+        score = row["score"]
+        dimensions = [("label", row["decision_label"]), ("score_bin", _score_bin(score))]
+        group = row.get("sensitive_attribute_bidx")
+        if group:
+            dimensions.append(("group", group))
+
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = _bucket_start(row["created_at"], granularity)
+            for dimension, key in dimensions:
+                acc = deltas.setdefault((granularity, bucket, dimension, key), [0, 0.0])
+                acc[0] += 1
+                acc[1] += score
+    return deltas
+
+
+# deferred_aggregates bloğu içinde biriken karar satırları (session.info içinde bekler)
+DEFERRED_AGGREGATES_KEY = "deferred_aggregate_rows"
+
+
+@contextmanager
+def deferred_aggregates(db: Session):
+    """
+    Blok içindeki tüm insert'lerin aggregate güncellemelerini biriktirir ve blok sonunda tek
+    seferde, tüm satırlar üzerinden sıralı anahtar sırasıyla uygular. Aynı transaction'da birden
+    fazla insert çağrısı (örn. farklı owner'lar) yapan yazarlar böylece sayaç satırlarını
+    diğer transaction'larla aynı sırada kilitler. Blok hata ile biterse hiçbir şey uygulanmaz.
+
+    Kilit sırası her yerde aynıdır: önce audit zinciri başı (log yazılıyorsa), sonra sayaçlar ve
+    rollup'lar anahtar sırasıyla. İç içe bloklar dıştaki bloğa katılır.
+    """
+    if DEFERRED_AGGREGATES_KEY in db.info:
+        yield
+        return
+    pending: List[dict] = []
+    db.info[DEFERRED_AGGREGATES_KEY] = pending
+    try:
+        yield
+    finally:
+        db.info.pop(DEFERRED_AGGREGATES_KEY, None)
+    _apply_aggregates(db, pending)
+
+
+def track_inserted_decisions(db: Session, rows: List[dict]):
+    """
+    Yeni eklenen karar satırları için artımlı aggregate'leri (label sayaçları, saatlik/günlük
+    rollup'lar) günceller. Kararı ekleyen transaction içinde çağrılır, böylece aggregate'ler
+    kararla birlikte commit/rollback olur. deferred_aggregates bloğu içindeyse yalnızca biriktirir.
+    """
+    pending = db.info.get(DEFERRED_AGGREGATES_KEY)
+    if pending is not None:
+        pending.extend(rows)
+        return
+    _apply_aggregates(db, rows)
+
+
+def _apply_aggregates(db: Session, rows: List[dict]):
+    if not rows:
+        return
+    # Sabit sıra: eşzamanlı transaction'lar sayaç satırlarını aynı sırada kilitler (deadlock yok)
+    for label, n in sorted(Counter(row["decision_label"] for row in rows).items()):
+        _increment(db, models.DecisionLabelCount, {"label": label}, {"count": n})
+
+    _register_groups(db, _group_samples(rows))
+
+    for (granularity, bucket, dimension, key), (count, score_sum) in sorted(_rollup_deltas(rows).items()):
+        _increment(
+            db,
+            models.DecisionRollup,
+            {"granularity": granularity, "bucket_start": bucket, "dimension": dimension, "key": key},
+            {"count": count, "score_sum": score_sum},
+        )
+
+
+def get_label_counts(db: Session) -> Dict[str, int]:
+    return {label: count for label, count in db.query(models.DecisionLabelCount.label, models.DecisionLabelCount.count)}
+
+
+def _label_count_snapshot(db: Session) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Sayaçları ve ai_decisions üzerindeki gerçek sayıları kilitsiz okur. Sayaçlar önce okunur:
+    arada commit olan bir insert sayacı değiştirdiği için uygulama aşamasında fark edilir.
+    Okuma transaction'ı dönmeden kapatılır; ingest tarama boyunca beklemez.
+
+    Returns:
+        (mevcut sayaçlar, gerçek sayılar)
+    """
+    try:
+        current = dict(db.execute(
+            select(models.DecisionLabelCount.label, models.DecisionLabelCount.count)
+        ).all())
+        actual = dict(db.execute(
+            select(models.AIDecision.decision_label, func.count()).group_by(models.AIDecision.decision_label)
+        ).all())
+        return current, actual
+    finally:
+        db.rollback()
+
+
+def _apply_correction(db: Session, stmt) -> bool:
+    """
+    Tek bir düzeltmeyi kendi kısa transaction'ında uygular. Compare-and-set koşulu tutmazsa
+    (satır snapshot'tan sonra değişmiş) veya satırı eşzamanlı bir yazar eklemişse False döner;
+    o satır bir sonraki reconcile'a kalır.
+    """
+    try:
+        applied = db.execute(stmt).rowcount == 1
+        db.commit()
+        return applied
+    except IntegrityError:
+        db.rollback()
+        return False
+    except Exception:
+        db.rollback()
+        raise
+
+
+def reconcile_label_counts(db: Session) -> Dict[str, int]:
+    """
+    Sayaçları ai_decisions üzerinden GROUP BY ile yeniden hesaplar ve sapmayı düzeltir.
+    Hesaplama kilitsiz bir snapshot'tan yapılır; her etiketin farkı ayrı bir transaction'da,
+    sayaç snapshot'taki değerindeyse uygulanır (compare-and-set). Böylece tarama sırasında gelen
+    insert'ler ne bekler ne de kaybolur; birden fazla worker aynı anda reconcile edebilir.
+
+    Returns:
+        Düzeltilen sapmalar {label: gerçek - sayaç}
+    """
+    current, actual = _label_count_snapshot(db)
+    table = models.DecisionLabelCount
+    drift = {}
+    for label in sorted(set(current) | set(actual)):
+        observed, expected = current.get(label), actual.get(label, 0)
+        if observed == expected:
+            continue
+        if observed is None:
+            stmt = insert(table).values(label=label, count=expected)
+        elif expected == 0:
+            stmt = delete(table).where(table.label == label, table.count == observed)
+        else:
+            stmt = (
+                update(table)
+                .where(table.label == label, table.count == observed)
+                .values(count=table.count + (expected - observed))
+            )
+        if _apply_correction(db, stmt):
+            drift[label] = expected - (observed or 0)
+    return drift
+
+
+def _compute_rollups(db: Session, batch_size: int,
+                     samples: Optional[Dict[str, str]] = None) -> Tuple[Dict[tuple, list], int]:
+    """
+    Rollup değerlerini ai_decisions üzerinden hesaplar. Satırlar server-side cursor ile parça parça
+    okunur; grup boyutu blind index'ten geldiği için şifre çözülmez. `samples` verilirse her grup
+    için bir şifreli örnek toplanır (grup sözlüğünü doldurmak için).
+
+    Returns:
+        ({(granularity, bucket_start, dimension, key): [count, score_sum]}, işlenen karar sayısı)
+    """
+    deltas: Dict[tuple, list] = {}
+    processed = 0
+    stmt = select(
+        models.AIDecision.decision_label,
+        models.AIDecision.score,
+        models.AIDecision.created_at,
+        models.AIDecision.sensitive_attribute_bidx,
+        models.AIDecision.sensitive_attribute,
+    ).execution_options(yield_per=batch_size)
+
+    for partition in db.execute(stmt).partitions():
+        rows = [
+            {"decision_label": r[0], "score": r[1], "created_at": r[2], "sensitive_attribute_bidx": r[3],
+             "sensitive_attribute": r[4]}
+            for r in partition
+        ]
+        if samples is not None:
+            for bidx, token in _group_samples(rows).items():
+                samples.setdefault(bidx, token)
+        for key, (count, score_sum) in _rollup_deltas(rows).items():
+            acc = deltas.setdefault(key, [0, 0.0])
+            acc[0] += count
+            acc[1] += score_sum
+        processed += len(rows)
+    return deltas, processed
+
+
+def _rollup_row(key: tuple, value: list) -> dict:
+    granularity, bucket, dimension, rollup_key = key
+    return {"granularity": granularity, "bucket_start": bucket, "dimension": dimension,
+            "key": rollup_key, "count": value[0], "score_sum": value[1]}
+
+
+def rebuild_rollups(db: Session, batch_size: int = 5000) -> int:
+    """
+    Rollup tablosunu ai_decisions üzerinden baştan oluşturur (ilk kurulum / mevcut veriler için).
+
+    Returns:
+        İşlenen karar sayısı
+    """
+    try:
+        samples: Dict[str, str] = {}
+        deltas, processed = _compute_rollups(db, batch_size, samples)
+        db.execute(delete(models.DecisionRollup))
+        if deltas:
+            db.execute(insert(models.DecisionRollup), [_rollup_row(k, v) for k, v in deltas.items()])
+        _register_groups(db, samples)
+        db.commit()
+        return processed
+    except Exception as e:
+        db.rollback()
+        raise e
+
+
+ROLLUP_SCORE_TOLERANCE = 1e-6
+
+
+def _rollup_snapshot(db: Session, batch_size: int) -> Tuple[Dict[tuple, tuple], Dict[tuple, list]]:
+    """
+    Mevcut rollup satırlarını ve ai_decisions'tan hesaplanan gerçek değerleri kilitsiz okur
+    (_label_count_snapshot ile aynı sıra: önce mevcut satırlar). Okuma transaction'ı dönmeden kapatılır.
+
+    Returns:
+        ({anahtar: (count, score_sum)}, {anahtar: [count, score_sum]})
+    """
+    try:
+        current = {
+            (r.granularity, r.bucket_start, r.dimension, r.key): (r.count, r.score_sum)
+            for r in db.execute(select(
+                models.DecisionRollup.granularity,
+                models.DecisionRollup.bucket_start,
+                models.DecisionRollup.dimension,
+                models.DecisionRollup.key,
+                models.DecisionRollup.count,
+                models.DecisionRollup.score_sum,
+            ))
+        }
+        actual, _ = _compute_rollups(db, batch_size)
+        return current, actual
+    finally:
+        db.rollback()
+
+
+def reconcile_rollups(db: Session, batch_size: int = 5000) -> int:
+    """
+    Rollup'ları ai_decisions üzerinden yeniden hesaplar ve yalnızca sapan satırları düzeltir
+    (reconcile_label_counts ile aynı yaklaşım: kilitsiz snapshot, satır başına compare-and-set).
+    Artımlı upsert'lerde kaybolan / fazla sayılan güncellemeler ve silinmiş kararlar burada toparlanır.
+
+    Returns:
+        Düzeltilen (eklenen, güncellenen veya silinen) rollup satırı sayısı
+    """
+    current, actual = _rollup_snapshot(db, batch_size)
+    table = models.DecisionRollup
+    fixed = 0
+    for key in sorted(set(current) | set(actual)):
+        observed, expected = current.get(key), actual.get(key)
+        if observed and expected and observed[0] == expected[0] \
+                and abs(observed[1] - expected[1]) <= ROLLUP_SCORE_TOLERANCE:
+            continue
+
+        granularity, bucket, dimension, name = key
+        if observed is None:
+            stmt = insert(table).values(**_rollup_row(key, expected))
+        else:
+            match = (
+                table.granularity == granularity, table.bucket_start == bucket,
+                table.dimension == dimension, table.key == name,
+                table.count == observed[0], table.score_sum == observed[1],
+            )
+            if expected is None:
+                stmt = delete(table).where(*match)
+            else:
+                stmt = update(table).where(*match).values(count=expected[0], score_sum=expected[1])
+        fixed += _apply_correction(db, stmt)
+    return fixed
+
+
+def rollups_initialized(db: Session) -> bool:
+    """
+    Rollup tablosu doluysa veya hiç karar yoksa True. Grup anahtarları eski sürümdeki gibi
+    düz metinse (blind index değilse) veya grup sözlüğünde karşılığı yoksa tablo yeniden
+    oluşturulmalıdır (yeniden oluşturma sözlüğü de doldurur).
+    """
+    group_keys = (
+        select(models.DecisionRollup.key)
+        .where(models.DecisionRollup.dimension == "group")
+    )
+    has_legacy_groups = db.execute(
+        group_keys.where(
+            (func.length(models.DecisionRollup.key) != 64)
+            | models.DecisionRollup.key.not_in(select(models.SensitiveGroup.bidx))
+        ).limit(1)
+    ).first() is not None
+    if has_legacy_groups:
+        return False
+    has_rollups = db.execute(select(models.DecisionRollup.granularity).limit(1)).first() is not None
+    has_decisions = db.execute(select(models.AIDecision.id).limit(1)).first() is not None
+    return has_rollups or not has_decisions
+
+
+def get_rollup_timeseries(db: Session, granularity: str, start: datetime, end: datetime) -> List[dict]:
+    """
+    [start, end) aralığındaki bucket'ları yalnızca rollup tablosundan okur.
+    Maliyet bucket sayısıyla orantılıdır, ai_decisions boyutundan bağımsızdır.
+    """
+    rows = (
+        db.query(models.DecisionRollup)
+        .filter(
+            models.DecisionRollup.granularity == granularity,
+            models.DecisionRollup.bucket_start >= start,
+            models.DecisionRollup.bucket_start < end,
+        )
+        .order_by(models.DecisionRollup.bucket_start)
+        .all()
+    )
+
+    buckets: Dict[datetime, dict] = {}
+    for r in rows:
+        bucket = buckets.setdefault(r.bucket_start, {
+            "bucket_start": r.bucket_start,
+            "total": 0,
+            "score_sum": 0.0,
+            "labels": {},
+            "groups": {},
+            "score_histogram": [0] * ROLLUP_SCORE_BINS,
+        })
+        if r.dimension == "label":
+            bucket["labels"][r.key] = r.count
+            bucket["total"] += r.count
+            bucket["score_sum"] += r.score_sum
+        elif r.dimension == "group":
+            bucket["groups"][r.key] = r.count
+        elif r.dimension == "score_bin":
+            bucket["score_histogram"][int(r.key)] = r.count
+
+    # Grup anahtarları blind index'tir; etiketler okuma anında grup sözlüğündeki tek örnekten çözülür
+    labels = _group_labels(db, {bidx for bucket in buckets.values() for bidx in bucket["groups"]})
+
+    result = []
+    for bucket in buckets.values():
+        bucket["groups"] = {labels.get(bidx, "[Encrypted Data]"): count for bidx, count in bucket["groups"].items()}
+        score_sum = bucket.pop("score_sum")
+        bucket["score_avg"] = round(score_sum / bucket["total"], 4) if bucket["total"] else None
+        result.append(bucket)
+    return result
+
+
+# ---------- BLIND INDEX ----------
+
+def backfill_blind_index(db: Session, batch_size: int = 1000) -> int:
+    """
+    Blind index'i olmayan eski kayıtlar için şifreyi çözüp HMAC indeksini yazar.
+    id sırasıyla batch'ler halinde ilerler, her batch ayrı commit edilir.
+
+    Returns:
+        Güncellenen kayıt sayısı
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(models.AIDecision.id, models.AIDecision.sensitive_attribute)
+            .where(
+                models.AIDecision.id > last_id,
+                models.AIDecision.sensitive_attribute_bidx.is_(None),
+                models.AIDecision.sensitive_attribute.is_not(None),
+            )
+            .order_by(models.AIDecision.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return updated
+
+        last_id = batch[-1][0]
+        changes = []
+        for decision_id, token in batch:
+            plain = decrypt_data(token)
+            if plain and plain != "[Encrypted Data]":  # çözülemeyenler atlanır
+                changes.append({"id": decision_id, "sensitive_attribute_bidx": blind_index(plain)})
+
+        try:
+            if changes:
+                db.execute(update(models.AIDecision), changes)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+        updated += len(changes)
+
+
+def _group_tokens(db: Session, bidxs) -> Dict[str, str]:
+    """
+    Blind index -> grup sözlüğündeki şifreli örnek. Primary key araması; ai_decisions okunmaz.
+    Sözlükte olmayan (henüz yeniden oluşturulmamış eski) gruplar sonuçta yer almaz.
+    """
+    if not bidxs:
+        return {}
+    return dict(db.execute(
+        select(models.SensitiveGroup.bidx, models.SensitiveGroup.sample)
+        .where(models.SensitiveGroup.bidx.in_(list(bidxs)))
+    ).all())
+
+
+def _group_labels(db: Session, bidxs) -> Dict[str, str]:
+    """Blind index -> grup adı; her grup için yalnızca sözlükteki örnek çözülür."""
+    tokens = _group_tokens(db, bidxs)
+    return dict(zip(tokens, decrypt_many(list(tokens.values()))))
+
+
+def get_group_label_counts(db: Session, decrypt: bool = True) -> List[dict]:
+    """
+    Hassas grup x decision_label sayıları; blind index üzerinde indeksli GROUP BY ile veritabanında
+    hesaplanır. Grup adı için grup sözlüğündeki örnek çözülür (_group_labels).
+    decrypt=False: "group" örnek kaydın şifreli değeridir; decrypt_group_counts ile çözülür.
+
+    Returns:
+        [{"group", "decisions", "labels": {label: count}}]
+    """
+    rows = db.execute(
+        select(
+            models.AIDecision.sensitive_attribute_bidx,
+            models.AIDecision.decision_label,
+            func.count(),
+        )
+        .where(models.AIDecision.sensitive_attribute_bidx.is_not(None))
+        .group_by(models.AIDecision.sensitive_attribute_bidx, models.AIDecision.decision_label)
+    ).all()
+
+    groups: Dict[str, dict] = {}
+    for bidx, label, count in rows:
+        group = groups.setdefault(bidx, {"decisions": 0, "labels": {}})
+        group["decisions"] += count
+        group["labels"][label] = count
+
+    if not decrypt:
+        tokens = _group_tokens(db, groups.keys())
+        return [{"group": tokens.get(bidx), **group} for bidx, group in groups.items()]
+    labels = _group_labels(db, groups.keys())
+    return [{"group": labels.get(bidx, "[Encrypted Data]"), **group} for bidx, group in groups.items()]
+
+
+def decrypt_group_counts(groups: List[dict]) -> List[dict]:
+    """get_group_label_counts(decrypt=False) sonucundaki grup adlarını çözer; session gerekmez."""
+    for group, plain in zip(groups, decrypt_many([g["group"] for g in groups])):
+        group["group"] = plain or "[Encrypted Data]"
+    return groups
+
+
+# ---------- AI DECISION (BULK) ----------
+
+def validate_ai_decisions(items: List[Any]) -> Tuple[List[Tuple[int, schemas.AIDecisionCreate]], List[dict]]:
+    """
+    Ham karar listesini tek tek doğrular. Hatalı kayıtlar tüm batch'i durdurmaz.
+
+    Returns:
+        (valid, errors): valid -> [(index, AIDecisionCreate)], errors -> [{"index", "errors"}]
+    """
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schemas.AIDecisionCreate.model_validate(item)))
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "errors": [
+                    {"loc": list(err["loc"]), "msg": err["msg"]}
+                    for err in e.errors(include_url=False)
+                ],
+            })
+    return valid, errors
+
+
+def build_ai_decision_rows(decisions: List[schemas.AIDecisionCreate], owner_id: int,
+                           labels: Optional[List[str]] = None) -> List[dict]:
+    """
+    Bulk INSERT için satır sözlüklerini hazırlar. Hassas alanlar toplu şifrelenir.
+    `labels` verilirse (örn. etik değerlendirme sonucu) decision_label yerine kullanılır.
+    """
+    encrypted = encrypt_many([d.sensitive_attribute for d in decisions])
+    now = datetime.utcnow()
+    return [
+        {
+            "owner_id": owner_id,
+            "decision_label": labels[i] if labels is not None else d.decision_label,
+            "score": d.score,
+            "sensitive_attribute": encrypted[i],
+            "sensitive_attribute_bidx": blind_index(d.sensitive_attribute),
+            "created_at": now,
+        }
+        for i, d in enumerate(decisions)
+    ]
+
+
+def insert_ai_decision_rows(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Satırları tek bir executemany/multi-row INSERT ile ekler ve id'leri girdi sırasıyla döndürür.
+    Commit çağırana aittir.
+    """
+    if not rows:
+        return []
+    stmt = insert(models.AIDecision).returning(models.AIDecision.id, sort_by_parameter_order=True)
+    ids = list(db.execute(stmt, rows).scalars().all())
+    track_inserted_decisions(db, rows)
+    return ids
+
+
+def insert_ai_decisions(db: Session, decisions: List[schemas.AIDecisionCreate], owner_id: int,
+                        labels: Optional[List[str]] = None) -> Tuple[List[int], List[dict]]:
+    """build_ai_decision_rows + insert_ai_decision_rows. (ids, rows) döndürür, commit etmez."""
+    rows = build_ai_decision_rows(decisions, owner_id, labels=labels)
+    sensitive_values = [d.sensitive_attribute for d in decisions]
+    ids = insert_ai_decision_rows(db, rows)
+    if rows:
+        # Monitör modelin orijinal kararını izler (etik etiketi değil)
+        queue_fairness_events(db, sensitive_values, [d.decision_label for d in decisions], rows[0]["created_at"])
+    return ids, rows
+
+
+def create_ai_decisions_bulk(db: Session, decisions: List[schemas.AIDecisionCreate], owner_id: int) -> List[int]:
+    """Doğrulanmış kararları tek transaction içinde kaydeder, atanan id'leri döndürür."""
+    try:
+        ids, _ = insert_ai_decisions(db, decisions, owner_id)
+        db.commit()
+        return ids
+    except Exception as e:
+        db.rollback()
+        raise e
+
+
+# ---------- ETHICS EVALUATION ----------
+
+def insert_ethics_evaluations(db: Session, decisions: List[schemas.AIDecisionCreate], actor: dict) -> List[dict]:
+    """
+    Kararları toplu olarak etik kurallarından geçirir; kararları ve ETHICS_EVALUATION
+    loglarını bulk INSERT ile ekler. Commit çağırana aittir.
+
+    Args:
+        actor: JWT payload ("id" ve "sub" alanları)
+
+    Returns:
+        Her karar için {"decision_id", "ethics_status", "explanation", "log_hash"}
+    """
+    if not decisions:
+        return []
+
+    outcomes = evaluate_ethics_batch(
+        [d.decision_label for d in decisions],
+        [d.score for d in decisions],
+        [d.sensitive_attribute for d in decisions],
+    )
+    # Aggregate'ler zincir başından sonra kilitlenir (deferred_aggregates'teki kilit sırası)
+    with deferred_aggregates(db):
+        ids, rows = insert_ai_decisions(db, decisions, actor["id"], labels=[status for status, _ in outcomes])
+
+        log_rows = []
+        for decision_id, (status_label, explanation), row in zip(ids, outcomes, rows):
+            log_rows.append({
+                "decision_id": decision_id,
+                "actor_user_id": actor["id"],
+                "event_type": "ETHICS_EVALUATION",
+                "message": f"ETHICS EVALUATION: User {actor['sub']} processed decision. Result: {status_label}. Reason: {explanation}",
+                "created_at": row["created_at"],
+            })
+        log_rows = append_decision_logs(db, log_rows)
+
+    return [
+        {
+            "decision_id": decision_id,
+            "ethics_status": status_label,
+            "explanation": explanation,
+            "log_hash": log_row["hash"],
+        }
+        for decision_id, (status_label, explanation), log_row in zip(ids, outcomes, log_rows)
+    ]
+
+
+def create_ethics_evaluations(db: Session, decisions: List[schemas.AIDecisionCreate], actor: dict) -> List[dict]:
+    """Etik değerlendirmeyi tek transaction içinde yapar ve commit eder."""
+    try:
+        results = insert_ethics_evaluations(db, decisions, actor)
+        db.commit()
+        return results
+    except Exception as e:
+        db.rollback()
+        raise e
+
+
+def decrypt_decisions(db: Session, decisions: List[models.AIDecision]) -> List[models.AIDecision]:
+    """
+    Kararların sensitive_attribute alanlarını toplu olarak çözer.
+    Objeler session'dan ayrılır, böylece düz metin yanlışlıkla DB'ye yazılamaz.
+    """
+    return decrypt_detached_decisions(detach_decisions(db, decisions))
+
+
+def detach_decisions(db: Session, decisions: List[models.AIDecision]) -> List[models.AIDecision]:
+    for decision in decisions:
+        if decision in db:
+            db.expunge(decision)
+    return decisions
+
+
+def decrypt_detached_decisions(decisions: List[models.AIDecision]) -> List[models.AIDecision]:
+    """
+    Session'dan ayrılmış kararları çözer. Session'a dokunmadığı için event loop dışında
+    (thread pool'da) çağrılabilir; Fernet çözme işi CPU'ya bağlıdır.
+    """
+    plains = decrypt_many([d.sensitive_attribute for d in decisions])
+    for decision, plain in zip(decisions, plains):
+        decision.sensitive_attribute = plain
+    return decisions
+
+
 # ---------- DECISION LOG ----------
 
-def create_decision_log(db: Session, log: schemas.DecisionLogCreate, actor_id: int, log_hash: str) -> models.DecisionLog:
-    db_log = models.DecisionLog(
-        decision_id=log.decision_id,
-        actor_user_id=actor_id,
-        event_type=log.event_type,
-        message=log.message,
-        hash=log_hash
+def build_log_list_stmt(limit: int, cursor: Optional[str] = None,
+                        event_type: Optional[str] = None, decision_id: Optional[int] = None,
+                        actor_user_id: Optional[int] = None,
+                        start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    Audit logları (created_at DESC, id DESC) sırasında keyset sayfalar.
+    Her filtre kombinasyonu (filtre kolonu, created_at, id) index'lerinden biriyle karşılanır.
+    """
+    stmt = select(models.DecisionLog)
+    if event_type:
+        stmt = stmt.where(models.DecisionLog.event_type == event_type)
+    if decision_id is not None:
+        stmt = stmt.where(models.DecisionLog.decision_id == decision_id)
+    if actor_user_id is not None:
+        stmt = stmt.where(models.DecisionLog.actor_user_id == actor_user_id)
+    if start is not None:
+        stmt = stmt.where(models.DecisionLog.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.DecisionLog.created_at < end)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(models.DecisionLog.created_at, models.DecisionLog.id) < tuple_(created_at, row_id))
+
+    return stmt.order_by(models.DecisionLog.created_at.desc(), models.DecisionLog.id.desc()).limit(limit + 1)
+
+
+def list_decision_logs(db: Session, limit: int, cursor: Optional[str] = None, **filters) -> Tuple[List[models.DecisionLog], Optional[str]]:
+    rows = list(db.execute(build_log_list_stmt(limit, cursor, **filters)).scalars().all())
+    return split_page(rows, limit)
+
+
+AUDIT_CHAIN_HEAD_ID = 1
+AUDIT_VERIFY_BATCH_SIZE = 50_000
+
+
+def append_decision_logs(db: Session, rows: List[dict]) -> List[dict]:
+    """
+    Log satırlarını hash zincirinin sonuna ekler (tüm log yazma yolları buradan geçer).
+    Her satır önceki satırın hash'ine bağlanır ve ardışık bir chain_seq alır.
+    Zincir başı satırı transaction sonuna kadar kilitli kalır. Commit çağırana aittir.
+
+    Bedeli: tek AuditChainHead satırının kilidi log yazan tüm transaction'ları sıraya sokar;
+    iki yazar aynı anda ilerleyemez. Bu yüzden log ekleyen transaction'lar kısa tutulmalı,
+    çağıranlar ağır işleri (şifreleme, etik değerlendirme) bu çağrıdan önce bitirmeli ve
+    commit'i geciktirmemelidir. Toplu yollar (ingest kuyruğu) satırları tek çağrıda ekler.
+
+    Args:
+        rows: decision_id, actor_user_id, event_type, message ve opsiyonel created_at
+
+    Returns:
+        id, chain_seq, prev_hash ve hash alanları eklenmiş satırlar (girdi sırasıyla)
+    """
+    if not rows:
+        return []
+
+    # Önce yaz, sonra oku: UPDATE satır kilidini alır (SQLite'ta yazma kilidini), böylece
+    # okunan baş eşzamanlı bir yazarın commit'inden sonraki güncel değerdir.
+    _increment(db, models.AuditChainHead, {"id": AUDIT_CHAIN_HEAD_ID}, {"entry_count": len(rows)})
+    entry_count, last_hash = db.execute(
+        select(models.AuditChainHead.entry_count, models.AuditChainHead.last_hash)
+        .where(models.AuditChainHead.id == AUDIT_CHAIN_HEAD_ID)
+        .with_for_update()
+    ).one()
+
+    prev_hash = last_hash or GENESIS_HASH
+    chain_seq = entry_count - len(rows)
+    now = datetime.utcnow()
+    chained = []
+    for row in rows:
+        chain_seq += 1
+        created_at = row.get("created_at") or now
+        log_hash = chain_log_hash(prev_hash, chain_seq, row["event_type"], row.get("decision_id"),
+                                  row.get("actor_user_id"), created_at, row["message"])
+        chained.append({
+            "decision_id": row.get("decision_id"),
+            "actor_user_id": row.get("actor_user_id"),
+            "event_type": row["event_type"],
+            "message": row["message"],
+            "created_at": created_at,
+            "chain_seq": chain_seq,
+            "prev_hash": prev_hash,
+            "hash": log_hash,
+        })
+        prev_hash = log_hash
+
+    stmt = insert(models.DecisionLog).returning(models.DecisionLog.id, sort_by_parameter_order=True)
+    ids = db.execute(stmt, chained).scalars().all()
+    for row, log_id in zip(chained, ids):
+        row["id"] = log_id
+
+    db.execute(
+        update(models.AuditChainHead)
+        .where(models.AuditChainHead.id == AUDIT_CHAIN_HEAD_ID)
+        .values(last_hash=prev_hash)
     )
+    return chained
+
+
+def create_decision_log(db: Session, log: schemas.DecisionLogCreate, actor_id: Optional[int]) -> models.DecisionLog:
     try:
-        db.add(db_log)
+        row = append_decision_logs(db, [{
+            "decision_id": log.decision_id,
+            "actor_user_id": actor_id,
+            "event_type": log.event_type,
+            "message": log.message,
+        }])[0]
         db.commit()
-        db.refresh(db_log)
-        return db_log
+        return db.get(models.DecisionLog, row["id"])
     except Exception as e:
         db.rollback()
         raise e
+
+
+def _verify_result(valid: bool, from_seq: int, to_seq: int, checkpoint_seq: Optional[int] = None,
+                   failed_log_id: Optional[int] = None, error: Optional[str] = None) -> dict:
+    return {
+        "valid": valid,
+        "from_seq": from_seq,
+        "to_seq": to_seq,
+        "verified": to_seq - from_seq,
+        "checkpoint_seq": checkpoint_seq,
+        "failed_log_id": failed_log_id,
+        "error": error,
+    }
+
+
+# Zincir doğrulamasında okunan kolonlar (arşiv dosyaları da bu sırayla tuple üretir)
+CHAIN_VERIFY_COLUMNS = ("id", "chain_seq", "prev_hash", "hash", "event_type",
+                        "decision_id", "actor_user_id", "created_at", "message")
+
+
+def _iter_chain_rows(db: Session, from_seq: int, batch_size: int):
+    stmt = (
+        select(*(getattr(models.DecisionLog, c) for c in CHAIN_VERIFY_COLUMNS))
+        .where(models.DecisionLog.chain_seq > from_seq)
+        .order_by(models.DecisionLog.chain_seq)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(stmt).partitions():
+        yield from partition
+
+
+def verify_audit_chain(db: Session, full: bool = False, batch_size: int = AUDIT_VERIFY_BATCH_SIZE) -> dict:
+    """
+    Audit log hash zincirini son imzalı checkpoint'ten (full=True ise baştan) itibaren doğrular.
+
+    Yalnızca hash girdisi olan kolonlar chain_seq sırasıyla büyük partiler halinde akıtılır;
+    ORM objesi oluşturulmaz. Arşive taşınmış aralıklar gerekiyorsa arşiv dosyalarından okunup
+    chain_seq sırasıyla birleştirilir. Atlanmış sıra, kopuk prev_hash, değişmiş içerik, tutarsız checkpoint
+    ve zincir başıyla uyuşmayan kuyruk (silinmiş son satırlar) hata sayılır.
+    Zincir sağlamsa ulaşılan nokta için yeni imzalı checkpoint yazılır ve commit edilir.
+    """
+    checkpoints = db.execute(
+        select(models.AuditCheckpoint.chain_seq, models.AuditCheckpoint.last_hash, models.AuditCheckpoint.signature)
+        .order_by(models.AuditCheckpoint.chain_seq)
+    ).all()
+    for seq, last_hash, signature in checkpoints:
+        if not verify_checkpoint_signature(seq, last_hash, signature):
+            return _verify_result(False, 0, 0, error=f"Checkpoint at chain_seq {seq} has an invalid signature")
+
+    from_seq, prev_hash = 0, GENESIS_HASH
+    if checkpoints and not full:
+        from_seq, prev_hash = checkpoints[-1][0], checkpoints[-1][1]
+    checkpoint_hashes = {seq: last_hash for seq, last_hash, _ in checkpoints if seq > from_seq}
+    latest_checkpoint = checkpoints[-1][0] if checkpoints else 0
+
+    log = models.DecisionLog
+    rows = _iter_chain_rows(db, from_seq, batch_size)
+    # Arşivlenmiş aralıklar (yalnızca checkpoint kapsamındaki eski aylar) dosyalardan okunur
+    from .log_archive import ArchiveIntegrityError, archived_chain_max_seq, iter_archived_chain_rows
+    if archived_chain_max_seq(db) > from_seq:
+        rows = heapq.merge(iter_archived_chain_rows(db, from_seq), rows, key=lambda row: row[1])
+
+    seq = from_seq
+    try:
+        for log_id, chain_seq, row_prev, row_hash, event_type, decision_id, actor_id, created_at, message in rows:
+            seq += 1
+            if chain_seq != seq:
+                return _verify_result(False, from_seq, seq - 1, failed_log_id=log_id,
+                                      error=f"Missing entries before chain_seq {chain_seq}")
+            if row_prev != prev_hash:
+                return _verify_result(False, from_seq, seq - 1, failed_log_id=log_id,
+                                      error=f"prev_hash mismatch at chain_seq {seq}")
+            if chain_log_hash(prev_hash, seq, event_type, decision_id, actor_id, created_at, message) != row_hash:
+                return _verify_result(False, from_seq, seq - 1, failed_log_id=log_id,
+                                      error=f"Content hash mismatch at chain_seq {seq}")
+            if seq in checkpoint_hashes and checkpoint_hashes[seq] != row_hash:
+                return _verify_result(False, from_seq, seq - 1, failed_log_id=log_id,
+                                      error=f"Chain diverges from checkpoint at chain_seq {seq}")
+            prev_hash = row_hash
+    except ArchiveIntegrityError as e:
+        return _verify_result(False, from_seq, seq - 1, error=str(e))
+
+    head = db.execute(
+        select(models.AuditChainHead.entry_count, models.AuditChainHead.last_hash)
+        .where(models.AuditChainHead.id == AUDIT_CHAIN_HEAD_ID)
+    ).one_or_none()
+    head_count, head_hash = head if head else (0, None)
+    if head_count < seq or (head_count == seq and seq > 0 and head_hash != prev_hash):
+        return _verify_result(False, from_seq, seq, error="Chain head does not match the last entry")
+    if head_count > seq:
+        # Tarama sonrası commit edilen satırlar mı, yoksa silinmiş kuyruk mu?
+        newer = db.execute(select(func.min(log.chain_seq)).where(log.chain_seq > seq)).scalar()
+        if newer is None:
+            return _verify_result(False, from_seq, seq,
+                                  error=f"Chain head expects {head_count} entries, found {seq}")
+
+    checkpoint_seq = None
+    if seq > latest_checkpoint:
+        db.add(models.AuditCheckpoint(chain_seq=seq, last_hash=prev_hash, signature=sign_checkpoint(seq, prev_hash)))
+        db.commit()
+        checkpoint_seq = seq
+    return _verify_result(True, from_seq, seq, checkpoint_seq=checkpoint_seq)
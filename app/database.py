@@ -1,8 +1,12 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, literal, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from utils.telemetry import instrumented_pool
 
 # .env dosyasını yükle
 load_dotenv()
@@ -12,12 +16,38 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL .env dosyasında tanımlı değil!")
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Bağlantı havuzu ayarları (.env ile değiştirilebilir)
+DB_ECHO = _env_flag("DB_ECHO", False)               # Her SQL sorgusunu logla (yalnızca debug için)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", True)
+
+
+def _engine_options(url: str, pool_class: type) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+    # SQLite kendi havuz sınıfını seçer; boyut/taşma ayarları yalnızca sunucu veritabanları için.
+    # Havuz sınıfı bağlantı bekleme süresini /metrics'e yazar.
+    if not url.startswith("sqlite"):
+        options.update(
+            poolclass=pool_class,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
 # SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,      # SQL sorgularını terminalde görmek istersen güzel
-    future=True,
-)
+engine = create_engine(DATABASE_URL, future=True,
+                       **_engine_options(DATABASE_URL, instrumented_pool(QueuePool, "sync")))
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -33,3 +63,112 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# =====================
+# ASYNC ENGINE
+# =====================
+
+# Sync sürücüden async karşılığına (ASYNC_DATABASE_URL verilmezse DATABASE_URL'den türetilir)
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """
+    Async engine ilk kullanımda oluşturulur; yalnızca sync yolları kullanan scriptler
+    asyncpg/aiosqlite kurulu olmadan da çalışır.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            **_engine_options(ASYNC_DATABASE_URL, instrumented_pool(AsyncAdaptedQueuePool, "async")),
+        )
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db():
+    """
+    Async endpoint'ler için session dependency. Sorgu beklerken thread tutulmaz, eşzamanlı
+    istek sayısı thread pool ile değil bağlantı havuzuyla sınırlıdır.
+    """
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
+
+class SchemaMigrationRequired(RuntimeError):
+    """Eksik kolon ALTER TABLE ile güvenle eklenemiyor; elle migration gerekir."""
+
+
+def _add_column_sql(table, column, dialect) -> str:
+    """
+    Eksik kolon için ALTER TABLE. NOT NULL kolonlar yalnızca sabit bir varsayılanla eklenebilir
+    (mevcut satırlar bu değeri alır); aksi halde SchemaMigrationRequired.
+    """
+    preparer = dialect.identifier_preparer
+    ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} " \
+          f"{column.type.compile(dialect=dialect)}"
+    if column.nullable:
+        return ddl
+
+    if column.default is None or not column.default.is_scalar:
+        raise SchemaMigrationRequired(
+            f"Column {table.name}.{column.name} is NOT NULL without a constant default and is missing "
+            f"from the database; add it with a migration that backfills existing rows"
+        )
+    default_sql = literal(column.default.arg, column.type).compile(dialect=dialect,
+                                                                   compile_kwargs={"literal_binds": True})
+    return f"{ddl} NOT NULL DEFAULT {default_sql}"
+
+
+def ensure_schema(bind=None):
+    """
+    create_all mevcut tablolara yeni kolon/index eklemez. Modellerde olup veritabanında
+    olmayan kolonları ALTER TABLE ile, eksik index'leri CREATE INDEX ile ekler.
+
+    Raises:
+        SchemaMigrationRequired: Sabit varsayılanı olmayan NOT NULL bir kolon eksikse
+            (sessizce atlanırsa ilk INSERT/SELECT'te patlardı)
+    """
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    conn.execute(text(_add_column_sql(table, column, bind.dialect)))
+
+        for table in Base.metadata.sorted_tables:
+            existing_indexes = {idx["name"] for idx in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=conn)
@@ -1,8 +1,32 @@
+import numpy as np
+
+BIASED = ("BIASED", "Sensitive attribute detected with low confidence score")
+RISKY = ("RISKY", "Low confidence decision")
+FAIR = ("FAIR", "Decision passed basic ethical checks")
+
+_OUTCOMES = (BIASED, RISKY, FAIR)
+
+
 def evaluate_ethics(decision_label: str, score: float, sensitive_attribute: str | None):
     if sensitive_attribute and score < 0.5:
-        return "BIASED", "Sensitive attribute detected with low confidence score"
+        return BIASED
 
     if score < 0.6:
-        return "RISKY", "Low confidence decision"
+        return RISKY
+
+    return FAIR
+
+
+def evaluate_ethics_batch(decision_labels, scores, sensitive_attributes) -> list[tuple[str, str]]:
+    """
+    Vectorized version of `evaluate_ethics` over parallel arrays.
+    Applies the same rules with NumPy masks and returns (status, explanation) per item.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    has_attr = np.fromiter((bool(a) for a in sensitive_attributes), dtype=bool, count=len(scores))
+
+    biased = has_attr & (scores < 0.5)
+    risky = ~biased & (scores < 0.6)
+    codes = np.where(biased, 0, np.where(risky, 1, 2))
 
-    return "FAIR", "Decision passed basic ethical checks"
+    return [_OUTCOMES[code] for code in codes.tolist()]
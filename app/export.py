@@ -0,0 +1,149 @@
+"""
+Tam tablo export'ları (NDJSON, CSV, Parquet) için akış üreticileri.
+
+Satırlar server-side cursor ile (yield_per) parti parti okunur ve her parti serileştirilip
+hemen gönderilir; bellek kullanımı tablo boyutundan bağımsızdır. Üreticiler kendi session'larını
+açar, çünkü StreamingResponse istek bağımlılıkları kapandıktan sonra tüketilir.
+"""
+import csv
+import io
+import os
+from typing import Callable, Iterator, List, Sequence
+
+import orjson
+from sqlalchemy.orm import Session
+
+from .security import decrypt_many
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Parquet kolon tipleri (pyarrow type factory adı ve argümanları)
+_PARQUET_TYPES = {
+    "id": ("int64",), "owner_id": ("int64",), "decision_id": ("int64",), "actor_user_id": ("int64",),
+    "chain_seq": ("int64",), "score": ("float64",), "created_at": ("timestamp", "us"),
+}
+
+
+class ExportFormatError(Exception):
+    pass
+
+
+def require_format(fmt: str):
+    """
+    Raises:
+        ExportFormatError: Format bilinmiyorsa veya Parquet için pyarrow kurulu değilse
+    """
+    if fmt not in FORMATS:
+        raise ExportFormatError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportFormatError("Parquet export requires pyarrow to be installed")
+
+
+def iter_row_batches(session_factory: Callable[[], Session], stmt, columns: Sequence[str],
+                     decrypt: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    Sorguyu server-side cursor ile okuyup tuple partileri üretir.
+    decrypt=True ise sensitive_attribute kolonu parti başına toplu çözülür.
+    """
+    sensitive_idx = columns.index("sensitive_attribute") if decrypt and "sensitive_attribute" in columns else None
+
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            if sensitive_idx is None:
+                yield partition
+                continue
+            plains = decrypt_many([row[sensitive_idx] for row in partition])
+            yield [row[:sensitive_idx] + (plain,) + row[sensitive_idx + 1:] for row, plain in zip(partition, plains)]
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches: Iterator[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in batch)
+
+
+def csv_chunks(batches: Iterator[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(
+            tuple(value.isoformat() if hasattr(value, "isoformat") else value for value in row)
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    ParquetWriter için yazılabilir hedef. Yazılanları biriktirir, `drain` ile boşaltılır;
+    tell() toplam yazılan byte'ı döndürür (footer offset'leri bunun üzerinden hesaplanır).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(batches: Iterator[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    """Her parti ayrı bir row group olarak yazılır ve hemen gönderilir."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (name, getattr(pa, spec[0])(*spec[1:]))
+        for name, spec in ((c, _PARQUET_TYPES.get(c, ("string",))) for c in columns)
+    ])
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in batches:
+            arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(fmt: str, session_factory: Callable[[], Session], stmt, columns: Sequence[str],
+                  decrypt: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    batches = iter_row_batches(session_factory, stmt, columns, decrypt=decrypt, batch_size=batch_size)
+    if fmt == "csv":
+        return csv_chunks(batches, columns)
+    if fmt == "parquet":
+        return parquet_chunks(batches, columns)
+    return ndjson_chunks(batches, columns)
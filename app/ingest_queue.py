@@ -0,0 +1,239 @@
+"""
+Write-behind ingestion queue.
+
+Kararlar (ve etik değerlendirmeler) bounded bir in-process kuyruğa alınır, arka plandaki
+flusher thread'i bunları boyut veya zaman eşiğine göre toplu olarak tek transaction'da yazar.
+Her gönderim bir ticket id alır; durum `status()` ile sorgulanabilir.
+
+Kayıtlar 202 ile kabul edildiği için bir batch hatası tüm batch'i kaybetmez: batch backoff ile
+tekrar denenir, yine başarısız olursa kayıtlar tek tek yazılır ve yalnızca hatalı olanlar "failed" olur.
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import crud, schemas
+
+
+INGEST_QUEUE_MAX_SIZE = int(os.getenv("INGEST_QUEUE_MAX_SIZE", "10000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "0.5"))  # saniye
+INGEST_MAX_TICKETS = int(os.getenv("INGEST_MAX_TICKETS", "100000"))
+INGEST_FLUSH_RETRIES = int(os.getenv("INGEST_FLUSH_RETRIES", "3"))  # ilk denemeden sonraki tekrar sayısı
+INGEST_RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "0.2"))  # saniye, her denemede iki katına çıkar
+
+KIND_DECISION = "decision"
+KIND_ETHICS = "ethics"
+
+STATUS_QUEUED = "queued"
+STATUS_COMMITTED = "committed"
+STATUS_FAILED = "failed"
+
+_STOP = object()
+
+
+class QueueFullError(Exception):
+    """Kuyruk dolu veya kapanıyor; istemci daha sonra tekrar denemeli."""
+    pass
+
+
+class _Item:
+    __slots__ = ("ticket_id", "kind", "decision", "actor")
+
+    def __init__(self, ticket_id: str, kind: str, decision: schemas.AIDecisionCreate, actor: dict):
+        self.ticket_id = ticket_id
+        self.kind = kind
+        self.decision = decision
+        self.actor = actor
+
+
+class IngestQueue:
+    def __init__(self, session_factory: Callable[[], Session],
+                 max_size: int = INGEST_QUEUE_MAX_SIZE,
+                 batch_size: int = INGEST_BATCH_SIZE,
+                 flush_interval: float = INGEST_FLUSH_INTERVAL,
+                 max_tickets: int = INGEST_MAX_TICKETS,
+                 flush_retries: int = INGEST_FLUSH_RETRIES,
+                 retry_backoff: float = INGEST_RETRY_BACKOFF):
+        self._session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_tickets = max_tickets
+        self._flush_retries = flush_retries
+        self._retry_backoff = retry_backoff
+
+        self._tickets: "OrderedDict[str, dict]" = OrderedDict()
+        self._tickets_lock = threading.Lock()
+        self._accepting = False
+        # submit'in kabul kontrolü + put'u ile stop'un kapatması atomik: _STOP'tan sonra kayıt giremez
+        self._accept_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._accept_lock:
+            self._accepting = True
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Yeni kayıt almayı durdurur ve kuyrukta kalanları yazdıktan sonra kapanır (graceful drain)."""
+        if not self._thread:
+            return
+        with self._accept_lock:
+            self._accepting = False
+        # Kilit bırakıldıktan sonra: kabul edilmiş tüm kayıtlar kuyrukta sentinel'in önünde
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ---------- producer side ----------
+
+    def submit(self, kind: str, decision: schemas.AIDecisionCreate, actor: dict) -> str:
+        """
+        Kaydı kuyruğa ekler ve ticket id döndürür.
+
+        Raises:
+            QueueFullError: Kuyruk doluysa (backpressure) veya kapanıyorsa
+        """
+        ticket_id = uuid.uuid4().hex
+        with self._accept_lock:
+            if not self._accepting:
+                raise QueueFullError("Ingestion queue is not accepting new items")
+
+            self._set_ticket(ticket_id, {"status": STATUS_QUEUED, "kind": kind, "owner_id": actor["id"], "result": None})
+            try:
+                self._queue.put_nowait(_Item(ticket_id, kind, decision, actor))
+            except queue.Full:
+                with self._tickets_lock:
+                    self._tickets.pop(ticket_id, None)
+                raise QueueFullError("Ingestion queue is full")
+        return ticket_id
+
+    def status(self, ticket_id: str) -> Optional[dict]:
+        with self._tickets_lock:
+            ticket = self._tickets.get(ticket_id)
+            return dict(ticket) if ticket else None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    # ---------- flusher side ----------
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[_Item]):
+        """
+        Batch'i tek transaction'da yazar; geçici hatalarda (bağlantı kopması, kilit zaman aşımı)
+        artan beklemeyle tekrar dener. Tüm denemeler başarısız olursa kayıtları tek tek yazar,
+        böylece hatalı bir satır yalnızca kendi ticket'ını "failed" yapar.
+        """
+        for attempt in range(self._flush_retries + 1):
+            try:
+                results = self._write(batch)
+                break
+            except Exception as e:
+                print(f"Error during write-behind flush (attempt {attempt + 1}): {e}")
+                if attempt < self._flush_retries:
+                    time.sleep(self._retry_backoff * (2 ** attempt))
+        else:
+            results = {}
+            for item in batch:
+                try:
+                    results.update(self._write([item]))
+                except Exception as e:
+                    print(f"Error writing ingest ticket {item.ticket_id}: {e}")
+                    self._update_ticket(item.ticket_id, STATUS_FAILED, {"detail": "Database error during flush"})
+
+        for ticket_id, result in results.items():
+            self._update_ticket(ticket_id, STATUS_COMMITTED, result)
+
+    def _write(self, batch: List[_Item]) -> dict:
+        """
+        Kayıtları tek transaction'da yazar ve {ticket_id: sonuç} döndürür.
+
+        Raises:
+            Exception: Veritabanı hatası (transaction geri alınmıştır)
+        """
+        decisions: "OrderedDict[int, List[_Item]]" = OrderedDict()
+        evaluations: "OrderedDict[tuple, List[_Item]]" = OrderedDict()
+        for item in batch:
+            if item.kind == KIND_ETHICS:
+                evaluations.setdefault((item.actor["id"], item.actor.get("sub")), []).append(item)
+            else:
+                decisions.setdefault(item.actor["id"], []).append(item)
+
+        db = self._session_factory()
+        try:
+            results = {}
+            # Sayaç/rollup upsert'leri tüm owner'lar için tek seferde, global anahtar sırasıyla uygulanır
+            with crud.deferred_aggregates(db):
+                for owner_id, items in decisions.items():
+                    ids, _ = crud.insert_ai_decisions(db, [i.decision for i in items], owner_id)
+                    for i, decision_id in zip(items, ids):
+                        results[i.ticket_id] = {"decision_id": decision_id}
+
+                for (actor_id, sub), items in evaluations.items():
+                    evaluated = crud.insert_ethics_evaluations(
+                        db, [i.decision for i in items], actor={"id": actor_id, "sub": sub}
+                    )
+                    for i, result in zip(items, evaluated):
+                        results[i.ticket_id] = result
+
+            db.commit()
+            return results
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ---------- tickets ----------
+
+    def _set_ticket(self, ticket_id: str, ticket: dict):
+        with self._tickets_lock:
+            self._tickets[ticket_id] = ticket
+            while len(self._tickets) > self._max_tickets:
+                self._tickets.popitem(last=False)
+
+    def _update_ticket(self, ticket_id: str, status: str, result: dict):
+        with self._tickets_lock:
+            ticket = self._tickets.get(ticket_id)
+            if ticket is not None:
+                ticket["status"] = status
+                ticket["result"] = result
@@ -0,0 +1,71 @@
+"""
+Basit periyodik arka plan işleri (reconciliation, backfill vb.).
+Her iş kendi daemon thread'inde, kendi DB session'ı ile çalışır.
+"""
+import threading
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval_seconds: float,
+                 func: Callable[[Session], object],
+                 session_factory: Callable[[], Session],
+                 run_at_start: bool = False):
+        self.name = name
+        self.run_at_start = run_at_start
+        self.interval_seconds = interval_seconds
+        self._func = func
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        db = self._session_factory()
+        try:
+            return self._func(db)
+        finally:
+            db.close()
+
+    def _run(self):
+        if self.run_at_start:
+            self._run_safely()
+        while not self._stop.wait(self.interval_seconds):
+            self._run_safely()
+
+    def _run_safely(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            print(f"⚠️ Job {self.name} failed: {e}")
+
+
+class JobScheduler:
+    def __init__(self):
+        self.jobs: List[PeriodicJob] = []
+
+    def add(self, job: PeriodicJob) -> PeriodicJob:
+        self.jobs.append(job)
+        return job
+
+    def start(self):
+        for job in self.jobs:
+            job.start()
+
+    def stop(self):
+        for job in self.jobs:
+            job.stop()
@@ -0,0 +1,351 @@
+"""
+decision_logs için aylık mantıksal partition'lar ve soğuk arşiv.
+
+Saklama süresini (LOG_RETENTION_DAYS) aşmış her ay, imzalı bir checkpoint tarafından tamamen
+kapsanıyorsa gzip'li NDJSON dosyasına (Config.OUTPUT_DIR/log_archive) taşınır, manifest'e
+(decision_log_archives) yazılır ve sıcak tablodan silinir. Hash zinciri değişmez: arşivdeki
+satırlar tam doğrulamada chain_seq sırasıyla dosyalardan okunur; /admin/logs arşivlenmiş
+aralıklar için dosyalardan okumaya devam eder (read-through). Sayfalama için doğrulanmış ve
+sıralanmış dosya içerikleri process içinde sınırlı bir cache'te tutulur; zincir doğrulaması
+cache'i kullanmaz, dosyayı her seferinde yeniden hash'ler.
+"""
+import bisect
+import gzip
+import hashlib
+import heapq
+import os
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from config import Config
+
+from . import crud, models
+from .cache import TTLCache
+from .export import EXPORT_BATCH_SIZE, ndjson_chunks
+from .security import verify_checkpoint_signature
+
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "180"))
+ARCHIVE_DIR = Path(os.getenv("LOG_ARCHIVE_DIR", str(Config.OUTPUT_DIR / "log_archive")))
+
+# /admin/logs sayfalaması için doğrulanmış arşiv içerikleri (dosya başına bir girdi).
+# Bu satır sayısından büyük aylar cache'lenmez, her sayfada akış halinde taranır.
+ARCHIVE_CACHE_SIZE = int(os.getenv("LOG_ARCHIVE_CACHE_SIZE", "4"))
+ARCHIVE_CACHE_TTL = float(os.getenv("LOG_ARCHIVE_CACHE_TTL", "3600"))
+ARCHIVE_CACHE_MAX_ROWS = int(os.getenv("LOG_ARCHIVE_CACHE_MAX_ROWS", "200000"))
+
+_verified_archives = TTLCache(max_entries=ARCHIVE_CACHE_SIZE, ttl_seconds=ARCHIVE_CACHE_TTL)
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(ts: datetime) -> datetime:
+    return month_start(month_start(ts) + timedelta(days=32))
+
+
+def _parse_record(line: bytes) -> dict:
+    record = orjson.loads(line)
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    return record
+
+
+class ArchiveIntegrityError(Exception):
+    """Arşiv dosyası okunamıyor veya manifest'teki sha256 ile uyuşmuyor."""
+
+
+class _HashingReader:
+    """Okunan ham baytların sha256'sını tutan dosya sarmalayıcısı (tek geçişte doğrulama için)."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.digest.update(data)
+        return data
+
+
+def iter_archive_records(archive: models.DecisionLogArchive) -> Iterator[dict]:
+    """
+    Arşiv dosyasının kayıtları. Dosya okunurken sha256'sı hesaplanır ve sonunda manifest'teki
+    değerle karşılaştırılır; uyuşmazsa ArchiveIntegrityError. Tüm çağıranlar (sayfalama,
+    zincir doğrulaması) dosyayı sonuna kadar tükettiği için sonuç dönmeden hata yükselir.
+    """
+    try:
+        with open(archive.path, "rb") as raw:
+            reader = _HashingReader(raw)
+            with gzip.GzipFile(fileobj=reader, mode="rb") as f:
+                for line in f:
+                    if line.strip():
+                        yield _parse_record(line)
+            while reader.read(1 << 20):
+                pass
+    except (OSError, EOFError, zlib.error, orjson.JSONDecodeError, KeyError, ValueError) as e:
+        raise ArchiveIntegrityError(f"Archive {archive.path} is unreadable: {e}") from e
+    if reader.digest.hexdigest() != archive.sha256:
+        raise ArchiveIntegrityError(f"Archive {archive.path} does not match its recorded sha256")
+
+
+# ---------- ARCHIVAL ----------
+
+def _latest_verified_seq(db: Session) -> int:
+    checkpoint = db.execute(
+        select(models.AuditCheckpoint).order_by(models.AuditCheckpoint.chain_seq.desc()).limit(1)
+    ).scalar_one_or_none()
+    if checkpoint is None or not verify_checkpoint_signature(checkpoint.chain_seq, checkpoint.last_hash,
+                                                             checkpoint.signature):
+        return 0
+    return checkpoint.chain_seq
+
+
+def _write_archive(db: Session, start: datetime, end: datetime, path: Path) -> Tuple[int, int, Optional[int], Optional[int], str]:
+    """
+    Ayın satırlarını chain_seq sırasıyla gzip NDJSON'a yazar.
+
+    Returns:
+        (satır sayısı, en büyük id, ilk chain_seq, son chain_seq, dosyanın sha256'sı)
+    """
+    columns = crud.LOG_EXPORT_COLUMNS
+    id_idx, seq_idx = columns.index("id"), columns.index("chain_seq")
+    stmt = (
+        crud.build_log_export_stmt(start=start, end=end)
+        .order_by(None)
+        .order_by(models.DecisionLog.chain_seq, models.DecisionLog.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    stats = {"rows": 0, "max_id": 0, "first_seq": None, "last_seq": None}
+
+    def batches():
+        for partition in db.execute(stmt).partitions():
+            stats["rows"] += len(partition)
+            stats["max_id"] = max(stats["max_id"], max(row[id_idx] for row in partition))
+            seqs = [row[seq_idx] for row in partition if row[seq_idx] is not None]
+            if seqs:
+                # Satırlar chain_seq sırasıyla geliyor
+                stats["first_seq"] = seqs[0] if stats["first_seq"] is None else stats["first_seq"]
+                stats["last_seq"] = seqs[-1]
+            yield partition
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp_path, "wb") as f:
+        for chunk in ndjson_chunks(batches(), columns):
+            f.write(chunk)
+
+    digest = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    os.replace(tmp_path, path)
+
+    return stats["rows"], stats["max_id"], stats["first_seq"], stats["last_seq"], digest.hexdigest()
+
+
+def archive_old_logs(db: Session, retention_days: int = LOG_RETENTION_DAYS) -> List[dict]:
+    """
+    Saklama süresini aşmış ayları en eskiden başlayarak arşivler. Zincirli satırları son imzalı
+    checkpoint'ten sonraya uzanan bir ay arşivlenmez (önce doğrulama çalışmalıdır) ve daha yeni
+    aylara geçilmez. Her ay kendi transaction'ında işlenir.
+
+    Job her worker'da çalışır. Aynı ayı iki worker'ın arşivlemesini iki önlem engeller: ayın ilk
+    satırı dosya yazılmadan önce kilitlenir (SELECT ... FOR UPDATE; ikinci worker ilkinin commit'ini
+    bekler ve ayı boş bulur) ve silme tam olarak dosyaya yazılan satır sayısını silmelidir. Satır
+    kilidi olmayan veritabanlarında (SQLite) yarışı ikinci önlem yakalar: kaybeden worker dosyasını
+    siler, transaction'ı geri alır ve durur.
+
+    Returns:
+        Arşivlenen her ay için {"period_start", "rows", "path"}
+    """
+    cutoff = month_start(datetime.utcnow() - timedelta(days=retention_days))
+    verified_seq = _latest_verified_seq(db)
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+    archived = []
+    while True:
+        oldest = db.execute(
+            select(func.min(models.DecisionLog.created_at)).where(models.DecisionLog.created_at < cutoff)
+        ).scalar()
+        if oldest is None:
+            break
+
+        start = month_start(oldest)
+        end = next_month(start)
+        in_month = (models.DecisionLog.created_at >= start) & (models.DecisionLog.created_at < end)
+        max_seq = db.execute(select(func.max(models.DecisionLog.chain_seq)).where(in_month)).scalar()
+        if max_seq is not None and max_seq > verified_seq:
+            break
+
+        first_id = db.execute(
+            select(models.DecisionLog.id).where(in_month)
+            .order_by(models.DecisionLog.id).limit(1).with_for_update()
+        ).scalar()
+        if first_id is None:
+            # Kilit beklenirken ay başka bir worker tarafından arşivlendi
+            db.rollback()
+            continue
+
+        path = ARCHIVE_DIR / f"decision_logs_{start:%Y-%m}_{datetime.utcnow():%Y%m%dT%H%M%S%f}.ndjson.gz"
+        try:
+            rows, max_id, first_seq, last_seq, sha256 = _write_archive(db, start, end, path)
+            deleted = db.execute(delete(models.DecisionLog).where(in_month, models.DecisionLog.id <= max_id)).rowcount
+            if rows == 0 or deleted != rows:
+                # Satırlar arada başka bir worker tarafından arşivlendi; bu dosya çift kayıt olurdu
+                db.rollback()
+                path.unlink(missing_ok=True)
+                break
+            db.add(models.DecisionLogArchive(
+                period_start=start, period_end=end, row_count=rows,
+                first_chain_seq=first_seq, last_chain_seq=last_seq,
+                path=str(path), sha256=sha256,
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            path.unlink(missing_ok=True)
+            raise
+
+        archived.append({"period_start": start, "rows": rows, "path": str(path)})
+    return archived
+
+
+# ---------- READ-THROUGH ----------
+
+def archived_chain_max_seq(db: Session) -> int:
+    return db.execute(select(func.max(models.DecisionLogArchive.last_chain_seq))).scalar() or 0
+
+
+def iter_archived_chain_rows(db: Session, from_seq: int = 0) -> Iterator[tuple]:
+    """
+    Arşivdeki zincirli satırlar, chain_seq sırasıyla crud.CHAIN_VERIFY_COLUMNS tuple'ları olarak.
+    Her dosya sha256'sıyla doğrulanır (bkz. iter_archive_records).
+    """
+    archives = db.execute(
+        select(models.DecisionLogArchive)
+        .where(models.DecisionLogArchive.last_chain_seq > from_seq)
+        .order_by(models.DecisionLogArchive.first_chain_seq)
+    ).scalars().all()
+
+    def rows(archive):
+        for record in iter_archive_records(archive):
+            if record["chain_seq"] is not None and record["chain_seq"] > from_seq:
+                yield tuple(record[c] for c in crud.CHAIN_VERIFY_COLUMNS)
+
+    return heapq.merge(*(rows(a) for a in archives), key=lambda row: row[1])
+
+
+def _matches(record: dict, cursor_key: Optional[tuple], event_type: Optional[str], decision_id: Optional[int],
+             actor_user_id: Optional[int], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    created_at = record["created_at"]
+    return (
+        (cursor_key is None or (created_at, record["id"]) < cursor_key)
+        and (not event_type or record["event_type"] == event_type)
+        and (decision_id is None or record["decision_id"] == decision_id)
+        and (actor_user_id is None or record["actor_user_id"] == actor_user_id)
+        and (start is None or created_at >= start)
+        and (end is None or created_at < end)
+    )
+
+
+def _record_key(record: dict) -> tuple:
+    return record["created_at"], record["id"]
+
+
+def _verified_archive_records(archive: models.DecisionLogArchive) -> Optional[Tuple[List[tuple], List[dict]]]:
+    """
+    Arşivin doğrulanmış kayıtları, (created_at, id) artan sırada: (anahtarlar, kayıtlar).
+    Dosya bir kez açılıp sha256'sıyla doğrulanır, sonuç (yol, sha256, boyut, mtime) anahtarıyla
+    cache'lenir; aynı ayın sonraki sayfaları dosyayı yeniden okumaz. Dosya değişirse stat anahtarı
+    değişir ve yeniden doğrulanır. Cache sınırını aşan aylar için None (çağıran akış halinde tarar).
+
+    Raises:
+        ArchiveIntegrityError: Dosya okunamıyorsa veya sha256 uyuşmuyorsa
+    """
+    if archive.row_count > ARCHIVE_CACHE_MAX_ROWS:
+        return None
+    try:
+        st = os.stat(archive.path)
+    except OSError as e:
+        raise ArchiveIntegrityError(f"Archive {archive.path} is unreadable: {e}") from e
+
+    cache_key = (archive.path, archive.sha256, st.st_size, st.st_mtime_ns)
+    cached = _verified_archives.get(cache_key)
+    if cached is None:
+        records = sorted(iter_archive_records(archive), key=_record_key)
+        cached = ([_record_key(r) for r in records], records)
+        _verified_archives.set(cache_key, cached)
+    return cached
+
+
+def purge_archive_cache() -> int:
+    """Doğrulanmış arşiv içerikleri cache'ini temizler."""
+    return _verified_archives.purge()
+
+
+def _archive_page_records(archive: models.DecisionLogArchive, limit: int, cursor_key: Optional[tuple],
+                          **filters) -> List[dict]:
+    """Arşivde filtrelere uyan, cursor'dan eski en yeni limit + 1 kayıt (yeniden eskiye)."""
+    verified = _verified_archive_records(archive)
+    if verified is None:
+        matching = (r for r in iter_archive_records(archive) if _matches(r, cursor_key, **filters))
+        return heapq.nlargest(limit + 1, matching, key=_record_key)
+
+    keys, records = verified
+    # Cursor'dan eski kayıtlara ikili arama ile atlanır, oradan geriye doğru yürünür
+    position = len(keys) if cursor_key is None else bisect.bisect_left(keys, cursor_key)
+    page = []
+    for index in range(position - 1, -1, -1):
+        if _matches(records[index], None, **filters):
+            page.append(records[index])
+            if len(page) > limit:
+                break
+    return page
+
+
+def list_decision_logs(db: Session, limit: int, cursor: Optional[str] = None,
+                       event_type: Optional[str] = None, decision_id: Optional[int] = None,
+                       actor_user_id: Optional[int] = None,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    crud.list_decision_logs ile aynı sayfalama, arşivlenmiş aylar dahil.
+
+    Sıcak tablodan limit + 1 satır alınır; sayfa dolmadıysa veya arşivde daha yeni satır olabilecekse
+    aralıkla kesişen arşiv dosyaları yeniden eskiye taranır. Her dosyadan en fazla limit + 1 satır
+    alınır; dosya içerikleri ilk okumada doğrulanıp cache'lenir (bkz. _verified_archive_records).
+
+    Raises:
+        ValueError: Cursor bozuksa
+        ArchiveIntegrityError: Taranan bir arşiv dosyası sha256 doğrulamasından geçmezse
+    """
+    filters = dict(event_type=event_type, decision_id=decision_id, actor_user_id=actor_user_id, start=start, end=end)
+    rows = list(db.execute(crud.build_log_list_stmt(limit, cursor, **filters)).scalars().all())
+
+    cursor_key = crud.decode_cursor(cursor) if cursor else None
+
+    archive_stmt = select(models.DecisionLogArchive).order_by(models.DecisionLogArchive.period_start.desc())
+    if cursor_key is not None:
+        archive_stmt = archive_stmt.where(models.DecisionLogArchive.period_start <= cursor_key[0])
+    if end is not None:
+        archive_stmt = archive_stmt.where(models.DecisionLogArchive.period_start < end)
+    if start is not None:
+        archive_stmt = archive_stmt.where(models.DecisionLogArchive.period_end > start)
+
+    key = lambda log: (log.created_at, log.id)
+    for archive in db.execute(archive_stmt).scalars():
+        if len(rows) > limit and min(key(r) for r in rows)[0] >= archive.period_end:
+            break  # Bu ve daha eski arşivlerdeki tüm satırlar sayfadakilerden eski
+        matching = [
+            models.DecisionLog(**record)
+            for record in _archive_page_records(archive, limit, cursor_key, **filters)
+        ]
+        rows = heapq.nlargest(limit + 1, rows + matching, key=key)
+
+    rows.sort(key=key, reverse=True)
+    return crud.split_page(rows, limit)
@@ -1,17 +1,30 @@
-from datetime import timedelta
-from typing import List, Optional
+import os
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+import orjson
+
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Body, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from . import models, schemas, crud
-from .database import engine, Base, get_db, SessionLocal
-from .security import verify_password, create_access_token
+from .database import engine, get_db, SessionLocal, ensure_schema, get_async_db, dispose_async_engine
+from .security import (
+    verify_and_update_password, create_access_token, PasswordHasherBusy, start_password_hashing,
+    shutdown_password_hashing,
+)
+from .security import ACCESS_TOKEN_EXPIRE_MINUTES, decode_access_token, get_cached_principal, cache_principal, invalidate_principal
 from .security import get_current_user, require_roles  # get_current_user swagger oauth için gerekli
-from .security import generate_hash, encrypt_data
-from .ethics import evaluate_ethics
+from .ingest_queue import IngestQueue, QueueFullError, KIND_DECISION, KIND_ETHICS
+from .jobs import JobScheduler, PeriodicJob
+from . import export, log_archive
+from utils import telemetry
+from utils.rate_limiter import Quota, RateLimiter, RateLimitMiddleware, MemoryRateLimitBackend, SQLiteRateLimitBackend
+from config import Config
 
 
 app = FastAPI(
@@ -20,27 +33,151 @@ app = FastAPI(
     version="1.0.0",
 )
 
+
+def _rate_limit_key(scope) -> str:
+    """Kimliği doğrulanmış istekler kullanıcıya, diğerleri istemci IP'sine göre sınırlanır."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                payload = decode_access_token(token.strip())  # doğrulanmış token cache'inden
+                if payload and payload.get("id") is not None:
+                    return f"user:{payload['id']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+# Tüm worker process'ler aynı SQLite dosyası üzerinden tek bir limit uygular.
+# CORS'tan önce eklenir ki 429 yanıtları da CORS başlıklarını alsın.
+rate_limiter = RateLimiter(
+    Config.RATE_LIMIT_MAX_REQUESTS,
+    Config.RATE_LIMIT_WINDOW,
+    SQLiteRateLimitBackend(Config.RATE_LIMIT_DB_PATH) if Config.RATE_LIMIT_DB_PATH else MemoryRateLimitBackend(),
+)
+# Okuma (dashboard polling) ve ingest istekleri kendi kotalarını kullanır; sıkı varsayılan limit
+# auth/login ve diğer yazma uçlarında kalır.
+RATE_LIMIT_QUOTAS = (
+    Quota("ingest", Config.RATE_LIMIT_INGEST_MAX, Config.RATE_LIMIT_INGEST_WINDOW,
+          prefixes=("/decisions", "/logs", "/ethics/evaluate"), methods=frozenset({"POST"})),
+    Quota("read", Config.RATE_LIMIT_READ_MAX, Config.RATE_LIMIT_READ_WINDOW,
+          prefixes=("/",), methods=frozenset({"GET", "HEAD"})),
+)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, key_func=_rate_limit_key, quotas=RATE_LIMIT_QUOTAS)
+
 app.add_middleware(  # frontend ile iletişim için gerekli
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # cursor sayfalama
+)
+
+# Route bazlı gecikme/durum kodu ve istek başına SQL metrikleri (/metrics)
+app.add_middleware(telemetry.MetricsMiddleware)
+telemetry.instrument_sqlalchemy()
+
+
+# Opt-in write-behind ingestion (?async_mode=true)
+ingest_queue = IngestQueue(SessionLocal)
+telemetry.REGISTRY.gauge("ingest_queue_depth", "Decisions waiting in the write-behind queue", ingest_queue.depth)
+telemetry.REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out of the sync pool",
+                         lambda: engine.pool.checkedout())
+
+# Arka plan işleri (sayaç reconcile vb.)
+STATS_RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))  # saniye, 0 = kapalı
+BLIND_INDEX_BACKFILL_INTERVAL = int(os.getenv("BLIND_INDEX_BACKFILL_INTERVAL", "300"))
+AUDIT_VERIFY_INTERVAL = int(os.getenv("AUDIT_VERIFY_INTERVAL", "3600"))
+LOG_ARCHIVE_INTERVAL = int(os.getenv("LOG_ARCHIVE_INTERVAL", "86400"))
+REFRESH_TOKEN_PURGE_INTERVAL = int(os.getenv("REFRESH_TOKEN_PURGE_INTERVAL", "86400"))
+
+
+def _verify_audit_chain(db: Session):
+    result = crud.verify_audit_chain(db)
+    if not result["valid"]:
+        print(f"🚨 Audit log chain verification failed: {result['error']} (log id: {result['failed_log_id']})")
+    return result
+
+
+scheduler = JobScheduler()
+label_count_reconciler = scheduler.add(
+    PeriodicJob("reconcile-label-counts", STATS_RECONCILE_INTERVAL, crud.reconcile_label_counts, SessionLocal)
+)
+rollup_reconciler = scheduler.add(
+    PeriodicJob("reconcile-rollups", STATS_RECONCILE_INTERVAL, crud.reconcile_rollups, SessionLocal)
 )
+scheduler.add(
+    PeriodicJob("backfill-blind-index", BLIND_INDEX_BACKFILL_INTERVAL, crud.backfill_blind_index, SessionLocal,
+                run_at_start=True)
+)
+scheduler.add(PeriodicJob("verify-audit-chain", AUDIT_VERIFY_INTERVAL, _verify_audit_chain, SessionLocal))
+scheduler.add(PeriodicJob("archive-decision-logs", LOG_ARCHIVE_INTERVAL, log_archive.archive_old_logs, SessionLocal))
+scheduler.add(PeriodicJob("purge-refresh-tokens", REFRESH_TOKEN_PURGE_INTERVAL, crud.purge_expired_refresh_tokens,
+                          SessionLocal))
 
 
 # ✅ Tabloları her server açılışında garanti oluştur
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    # Hash ve fairness havuzları arka plan thread'leri başlamadan ve ilk istek gelmeden kurulur
+    start_password_hashing()
+    start_fairness_pool(FAIRNESS_STREAMING_WORKERS)
+
+    # Yeni tablolar + mevcut tablolara eklenen kolon/index'ler
+    ensure_schema(engine)
     
     # Generate demo data if database is empty
     generate_demo_data()
 
+    # Sayaç tablosu yeni eklendiyse / sapma varsa mevcut kararlardan doldur
+    try:
+        label_count_reconciler.run_once()
+    except Exception as e:
+        print(f"⚠️ Label count reconciliation skipped: {e}")
+
+    # Rollup tablosu boşsa (veya grup anahtarları eski düz metin biçimindeyse) mevcut kararlardan bir kez oluştur
+    db = SessionLocal()
+    try:
+        if not crud.rollups_initialized(db):
+            print(f"✅ Rebuilt rollups from {crud.rebuild_rollups(db)} existing decisions")
+    except Exception as e:
+        print(f"⚠️ Rollup rebuild skipped: {e}")
+    finally:
+        db.close()
+
+    ingest_queue.start()
+    scheduler.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Kuyrukta bekleyen kararları yazmadan kapanma
+    await run_in_threadpool(ingest_queue.stop)
+    await run_in_threadpool(scheduler.stop)
+    await dispose_async_engine()
+    shutdown_password_hashing()
+    shutdown_fairness_pool()
+
+
+def _enqueue(kind: str, decision: schemas.AIDecisionCreate, user_payload: dict) -> JSONResponse:
+    try:
+        ticket_id = ingest_queue.submit(kind, decision, actor=user_payload)
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(e)},
+            headers={"Retry-After": "1"},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"ticket_id": ticket_id, "status": "queued"},
+    )
+
 
 def generate_demo_data():
     """Generate sample data for dashboard demonstration"""
-    from .security import hash_password, encrypt_data, generate_hash
+    from .security import hash_password
     import random
     
     db = SessionLocal()
@@ -69,34 +206,30 @@ def generate_demo_data():
             labels = ["APPROVED", "REJECTED", "APPROVED", "BIASED", "APPROVED", "REJECTED", "RISKY"]
             attributes = ["male", "female", "male", "female", "male", "female", "male"]
             
-            for i in range(7 - decision_count):
-                score = round(random.uniform(0.3, 0.95), 2)
-                label = labels[i % len(labels)]
-                attr = attributes[i % len(attributes)]
-                
-                decision = models.AIDecision(
-                    owner_id=demo_user.id,
-                    decision_label=label,
-                    score=score,
-                    sensitive_attribute=encrypt_data(attr)
+            demo_decisions = [
+                schemas.AIDecisionCreate(
+                    decision_label=labels[i % len(labels)],
+                    score=round(random.uniform(0.3, 0.95), 2),
+                    sensitive_attribute=attributes[i % len(attributes)],
                 )
-                db.add(decision)
-                db.commit()
-                db.refresh(decision)
-                
-                # Create log entry
-                log_message = f"DEMO: Auto-generated decision {label} with score {score}"
-                log_hash = generate_hash(log_message + str(decision.id))
-                
-                log = models.DecisionLog(
-                    decision_id=decision.id,
-                    actor_user_id=demo_user.id,
-                    event_type="DEMO_DATA",
-                    message=log_message,
-                    hash=log_hash
-                )
-                db.add(log)
-                db.commit()
+                for i in range(7 - decision_count)
+            ]
+
+            # Kararlar ve logları tek transaction'da (sayaçlar da aynı yoldan, zincir başından sonra güncellenir)
+            with crud.deferred_aggregates(db):
+                ids, rows = crud.insert_ai_decisions(db, demo_decisions, demo_user.id)
+
+                crud.append_decision_logs(db, [
+                    {
+                        "decision_id": decision_id,
+                        "actor_user_id": demo_user.id,
+                        "event_type": "DEMO_DATA",
+                        "message": f"DEMO: Auto-generated decision {row['decision_label']} with score {row['score']}",
+                        "created_at": row["created_at"],
+                    }
+                    for decision_id, row in zip(ids, rows)
+                ])
+            db.commit()
             
             print(f"✅ Generated {7 - decision_count} demo AI decisions")
     
@@ -110,17 +243,29 @@ def generate_demo_data():
 # --------- HEALTH CHECK ---------
 
 @app.get("/health", tags=["system"])
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of the in-process metrics registry."""
+    return PlainTextResponse(telemetry.REGISTRY.render(), media_type=telemetry.CONTENT_TYPE)
+
+
 # --------- REQUEST BOYUTU KONTROL MIDDLEWARE ---------
 
 MAX_CONTENT_LENGTH = 1024 * 1024  # 1 MB
 
+# Gövdeyi parça parça okuyan (tamamını belleğe almayan) route'lar limitten muaf
+STREAMING_PATHS = {"/decisions/stream"}
+
 
 @app.middleware("http")
 async def validate_request_size(request: Request, call_next):
+    if request.url.path in STREAMING_PATHS:
+        return await call_next(request)
+
     if int(request.headers.get("content-length") or 0) > MAX_CONTENT_LENGTH:
         return JSONResponse(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
@@ -143,11 +288,22 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
             detail="Username or email already exists.",
         )
 
-    return crud.create_user(db, user)
+    try:
+        return crud.create_user(db, user)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
 
 @app.get("/users/me", response_model=schemas.UserRead, tags=["users"])
-def read_users_me(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    return crud.get_user(db, current_user["id"])
+async def read_users_me(current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Served from the short-TTL principal cache; role changes invalidate the entry."""
+    principal = get_cached_principal(current_user["id"])
+    if principal is None:
+        user = await db.get(models.User, current_user["id"])
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = schemas.UserRead.model_validate(user)
+        cache_principal(user.id, principal)
+    return principal
 
 
 @app.patch("/users/{user_id}/role", tags=["admin"])
@@ -163,6 +319,7 @@ def update_user_role(user_id: int,
     try:
         user.role = role_data.role
         db.commit()
+        invalidate_principal(user_id)
         return {"status": "success", "new_role": user.role}
     except Exception as e:
         db.rollback()
@@ -173,33 +330,84 @@ def update_user_role(user_id: int,
 
 from fastapi.security import OAuth2PasswordRequestForm
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many concurrent password operations, retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.post("/auth/login", response_model=schemas.TokenResponse, tags=["auth"])
-def login(data: schemas.LoginRequest = None, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(data: schemas.LoginRequest = None, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """
+    Password verification runs on the bounded hashing process pool; when the pool
+    is saturated the request fails fast with 429 instead of queueing.
+    Hashes created with fewer than PASSWORD_HASH_ROUNDS rounds are upgraded here.
+    """
     # Support both JSON body and form data (for Swagger OAuth2)
     username = form_data.username if form_data else data.username
     password = form_data.password if form_data else data.password
     
-    user = (
-        db.query(models.User)
-        .filter(models.User.email == username)
-        .first()
-    )
+    user = await db.run_sync(crud.get_user_by_login, username)
 
     if not user:
-        user = db.query(models.User).filter(models.User.username == username).first()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid username or password",
+        )
+
+    try:
+        valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
 
-    if not user or not verify_password(password, user.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
 
+    if new_hash:
+        user.password_hash = new_hash
+    refresh_token, _ = await db.run_sync(crud.issue_refresh_token, user.id)
+    await db.commit()
+
+    return _token_response(user, refresh_token)
+
+
+def _token_response(user: models.User, refresh_token: str) -> dict:
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role, "id": user.id},
-        expires_delta=timedelta(minutes=30),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
 
-    return {"access_token": access_token, "token_type": "bearer"}
+
+@app.post("/auth/refresh", response_model=schemas.TokenResponse, tags=["auth"])
+async def refresh_access_token(body: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token.
+    Only a hash lookup and an HMAC signature; no password verification.
+    Each refresh token is single-use: presenting a used one revokes the whole session family.
+    """
+    try:
+        user, refresh_token = await db.run_sync(crud.rotate_refresh_token, body.refresh_token)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    return _token_response(user, refresh_token)
+
+
+@app.post("/auth/logout", tags=["auth"])
+async def logout(body: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Revokes the refresh token's session family. Access tokens expire on their own."""
+    await db.run_sync(crud.revoke_refresh_token, body.refresh_token)
+    return {"status": "success"}
 
 
 # --------- AI DECISIONS ---------
@@ -211,25 +419,225 @@ def login(data: schemas.LoginRequest = None, form_data: OAuth2PasswordRequestFor
 )
 def create_decision(
     decision: schemas.AIDecisionCreate,
+    async_mode: bool = False,
     db: Session = Depends(get_db),
     user_payload=Depends(require_roles(["admin", "analyst"])),
 ):
+    if async_mode:
+        return _enqueue(KIND_DECISION, decision, user_payload)
 
     return crud.create_ai_decision(db, decision, owner_id=user_payload["id"])
 
 
+@app.post(
+    "/decisions/batch",
+    response_model=schemas.AIDecisionBatchResponse,
+    tags=["decisions"],
+)
+def create_decisions_batch(
+    items: List[Any] = Body(...),
+    db: Session = Depends(get_db),
+    user_payload=Depends(require_roles(["admin", "analyst"])),
+):
+    """
+    Bulk ingestion: validates every item independently and inserts the valid ones
+    in a single transaction. Invalid items are reported per index and skipped.
+    """
+    valid, errors = crud.validate_ai_decisions(items)
+
+    try:
+        new_ids = crud.create_ai_decisions_bulk(
+            db, [decision for _, decision in valid], owner_id=user_payload["id"]
+        )
+    except Exception as e:
+        print(f"Error during batch insert: {e}")
+        raise HTTPException(status_code=500, detail="Database error during batch insert")
+
+    ids: List[Optional[int]] = [None] * len(items)
+    for (index, _), new_id in zip(valid, new_ids):
+        ids[index] = new_id
+
+    return {
+        "inserted": len(new_ids),
+        "rejected": len(errors),
+        "ids": ids,
+        "errors": errors,
+    }
+
+
+MAX_PAGE_SIZE = 500
+
+
+@app.get(
+    "/decisions",
+    response_model=List[schemas.AIDecisionRead],
+    tags=["decisions"],
+)
+async def list_decisions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    decision_label: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    min_score: Optional[float] = Query(None, ge=0.0, le=1.0),
+    max_score: Optional[float] = Query(None, ge=0.0, le=1.0),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user_payload=Depends(require_roles(["admin", "analyst", "viewer"])),
+):
+    """
+    Lists decisions newest first with keyset pagination on (created_at, id).
+    Pass the X-Next-Cursor response header as `cursor` to get the next page;
+    the header is absent on the last page.
+    """
+    try:
+        items, next_cursor = await db.run_sync(
+            crud.list_ai_decisions, limit, cursor, decrypt=False,
+            decision_label=decision_label, owner_id=owner_id,
+            min_score=min_score, max_score=max_score, start=start, end=end,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Fernet çözme CPU'ya bağlı: event loop'u bloklamamak için thread pool'da
+    items = await run_in_threadpool(crud.decrypt_detached_decisions, items)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
 @app.get(
     "/decisions/{decision_id}",
     response_model=schemas.AIDecisionRead,
     tags=["decisions"],
 )
-def read_decision(decision_id: int, db: Session = Depends(get_db), user_payload=Depends(require_roles(["admin", "analyst", "viewer"]))):
-    db_decision = crud.get_ai_decision(db, decision_id)
+async def read_decision(decision_id: int, db: AsyncSession = Depends(get_async_db), user_payload=Depends(require_roles(["admin", "analyst", "viewer"]))):
+    db_decision = await db.run_sync(crud.get_ai_decision, decision_id, False)
     if not db_decision:
         raise HTTPException(status_code=404, detail="Decision not found")
+    await run_in_threadpool(crud.decrypt_detached_decisions, [db_decision])
     return db_decision
 
 
+NDJSON_CHUNK_SIZE = 500              # Her INSERT transaction'ı en fazla bu kadar satır
+NDJSON_MAX_LINE_BYTES = 64 * 1024    # Tek bir satır için üst sınır
+NDJSON_MAX_REPORTED_ERRORS = 1000    # Yanıttaki hata listesi sınırı (sayaçlar sınırsız)
+
+
+def _insert_decision_chunk(decisions: List[schemas.AIDecisionCreate], owner_id: int) -> List[int]:
+    db = SessionLocal()
+    try:
+        return crud.create_ai_decisions_bulk(db, decisions, owner_id=owner_id)
+    finally:
+        db.close()
+
+
+@app.post(
+    "/decisions/stream",
+    response_model=schemas.NDJSONIngestSummary,
+    tags=["decisions"],
+)
+async def ingest_decisions_ndjson(
+    request: Request,
+    user_payload=Depends(require_roles(["admin", "analyst"])),
+):
+    """
+    Streaming ingestion of newline-delimited JSON decisions (one object per line).
+    The body is consumed incrementally and inserted in chunks of NDJSON_CHUNK_SIZE,
+    so memory stays bounded regardless of upload size. Not subject to MAX_CONTENT_LENGTH.
+    """
+    summary = {"accepted": 0, "rejected": 0, "errors": [], "errors_truncated": False}
+    pending: List[tuple] = []  # (line_no, parsed object)
+
+    def reject(line_no: int, errors: list):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < NDJSON_MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_no, "errors": errors})
+        else:
+            summary["errors_truncated"] = True
+
+    def parse_line(line_no: int, raw: bytes):
+        # Sınır her satırda kontrol edilir: tek bir chunk içinde tamamen gelen uzun satır da reddedilir
+        if len(raw) > NDJSON_MAX_LINE_BYTES:
+            reject(line_no, [{"loc": [], "msg": "Line too long"}])
+            return
+        if not raw.strip():
+            return
+        try:
+            pending.append((line_no, orjson.loads(raw)))
+        except orjson.JSONDecodeError:
+            reject(line_no, [{"loc": [], "msg": "Invalid JSON"}])
+
+    async def flush():
+        if not pending:
+            return
+        line_numbers = [line_no for line_no, _ in pending]
+        valid, errors = crud.validate_ai_decisions([obj for _, obj in pending])
+        pending.clear()
+
+        for err in errors:
+            reject(line_numbers[err["index"]], err["errors"])
+
+        if valid:
+            try:
+                new_ids = await run_in_threadpool(
+                    _insert_decision_chunk, [d for _, d in valid], user_payload["id"]
+                )
+            except Exception as e:
+                print(f"Error during NDJSON ingestion: {e}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Database error after {summary['accepted']} accepted decisions",
+                )
+            summary["accepted"] += len(new_ids)
+
+    buffer = b""
+    line_no = 0
+    oversized = False  # Şu an sınırı aşan bir satırın devamını atlıyoruz
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for raw in lines:
+            line_no += 1
+            if oversized:
+                oversized = False
+                reject(line_no, [{"loc": [], "msg": "Line too long"}])
+                continue
+            parse_line(line_no, raw)
+
+        if len(buffer) > NDJSON_MAX_LINE_BYTES:
+            buffer = b""
+            oversized = True
+
+        if len(pending) >= NDJSON_CHUNK_SIZE:
+            await flush()
+
+    if oversized:
+        reject(line_no + 1, [{"loc": [], "msg": "Line too long"}])
+    elif buffer:
+        parse_line(line_no + 1, buffer)
+    await flush()
+
+    return summary
+
+
+# --------- ASYNC INGESTION TICKETS ---------
+
+@app.get(
+    "/ingest/tickets/{ticket_id}",
+    response_model=schemas.IngestTicketStatus,
+    tags=["decisions"],
+)
+async def read_ingest_ticket(ticket_id: str, user_payload=Depends(require_roles(["admin", "analyst"]))):
+    ticket = ingest_queue.status(ticket_id)
+    if not ticket or (ticket["owner_id"] != user_payload["id"] and user_payload.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return {"ticket_id": ticket_id, **ticket}
+
+
 # --------- DECISION LOGS ---------
 
 @app.post(
@@ -250,23 +658,10 @@ def create_log(
                 detail="Decision does not exist.",
             )
 
-    log_hash = generate_hash(log.message + str(user_payload["id"]))
-
-    db_log = models.DecisionLog(
-        decision_id=log.decision_id,
-        actor_user_id=user_payload["id"], # Logu yazan adminin ID'si
-        event_type=log.event_type,        # "SYSTEM", "WARNING" vb.
-        message=log.message,
-        hash=log_hash,
-    )
-    
     try:
-        db.add(db_log)
-        db.commit()
-        db.refresh(db_log)
-        return db_log
+        # Logu yazan adminin ID'si ile hash zincirine eklenir
+        return crud.create_decision_log(db, log, user_payload["id"])
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail="Error creating log")
 
 
@@ -274,86 +669,183 @@ def create_log(
 
 @app.post(
     "/ethics/evaluate",
+    response_model=schemas.EthicsEvaluationResult,
     tags=["ethics"],
 )
 def evaluate_decision_ethics(
     decision_in: schemas.AIDecisionCreate,
+    async_mode: bool = False,
     db: Session = Depends(get_db),
     user_payload=Depends(require_roles(["admin", "analyst"])),
 ):
-
-    status_label, explanation = evaluate_ethics(
-        decision_in.decision_label,
-        decision_in.score,
-        decision_in.sensitive_attribute,
-    )
+    if async_mode:
+        return _enqueue(KIND_ETHICS, decision_in, user_payload)
 
     try:
-        # 1. Kararı Kaydet (Hassas Veriyi Şifrele)
-        encrypted_attr = encrypt_data(decision_in.sensitive_attribute)
-        
-        db_decision = models.AIDecision(
-            owner_id=user_payload["id"],
-            decision_label=status_label,
-            score=decision_in.score,
-            sensitive_attribute=encrypted_attr  # Şifreli kaydet
-        )
-        db.add(db_decision)
-        db.commit()
-        db.refresh(db_decision)
-
-        log_message = f"ETHICS EVALUATION: User {user_payload['sub']} processed decision. Result: {status_label}. Reason: {explanation}"
-      
-        log_hash = generate_hash(log_message + str(db_decision.id) + str(user_payload["id"]))
-
-        db_log = models.DecisionLog(
-            decision_id=db_decision.id,
-            actor_user_id=user_payload["id"],
-            event_type="ETHICS_EVALUATION",
-            message=log_message,
-            hash=log_hash,
-        )
+        # Karar + ETHICS_EVALUATION logu tek transaction'da yazılır (hassas veri şifrelenir)
+        return crud.create_ethics_evaluations(db, [decision_in], actor=user_payload)[0]
 
-        db.add(db_log)
-        db.commit()
+    except Exception as e:
+        print(f"Error during ethics evaluation: {e}")
+        raise HTTPException(status_code=500, detail="System error during evaluation")
 
-        return {
-            "decision_id": db_decision.id,
-            "ethics_status": status_label,
-            "explanation": explanation,
-            "log_hash": log_hash,
-        }
 
+@app.post(
+    "/ethics/evaluate/batch",
+    response_model=List[schemas.EthicsEvaluationResult],
+    tags=["ethics"],
+)
+def evaluate_decision_ethics_batch(
+    decisions_in: List[schemas.AIDecisionCreate],
+    db: Session = Depends(get_db),
+    user_payload=Depends(require_roles(["admin", "analyst"])),
+):
+    """
+    Batched ethics evaluation: rules are applied to the whole array at once and all
+    decisions plus their ETHICS_EVALUATION logs are written in one transaction.
+    Results are returned in input order.
+    """
+    try:
+        return crud.create_ethics_evaluations(db, decisions_in, actor=user_payload)
     except Exception as e:
-        db.rollback()  # Bir hata olursa yapılanları geri al
-        print(f"Error during ethics evaluation: {e}")
+        print(f"Error during batch ethics evaluation: {e}")
         raise HTTPException(status_code=500, detail="System error during evaluation")
 
 # --------- ADMIN AUDIT LOGS ---------
 
 @app.get("/admin/logs", response_model=List[schemas.DecisionLogRead], tags=["admin"])
 def read_audit_logs(
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     event_type: Optional[str] = None,
+    decision_id: Optional[int] = None,
+    actor_user_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user=Depends(require_roles(["admin"])) # Sadece ADMIN
 ):
-    query = db.query(models.DecisionLog)
-    if event_type:
-        query = query.filter(models.DecisionLog.event_type == event_type)
-    
-    return query.order_by(models.DecisionLog.created_at.desc()).limit(limit).all()
+    """
+    Audit logs newest first with keyset pagination on (created_at, id).
+    The next page's cursor is returned in the X-Next-Cursor header.
+    Archived months are read transparently from their archive files.
+    """
+    try:
+        logs, next_cursor = log_archive.list_decision_logs(
+            db, limit, cursor,
+            event_type=event_type, decision_id=decision_id, actor_user_id=actor_user_id,
+            start=start, end=end,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except log_archive.ArchiveIntegrityError as e:
+        print(f"Audit log archive integrity failure: {e}")
+        raise HTTPException(status_code=500, detail="Audit log archive failed its integrity check")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+def _export_response(db: Session, user_payload: dict, dataset: str, fmt: str, stmt, columns,
+                     decrypt: bool = False) -> StreamingResponse:
+    try:
+        export.require_format(fmt)
+    except export.ExportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Export'un kendisi de audit zincirine yazılır
+    crud.append_decision_logs(db, [{
+        "decision_id": None,
+        "actor_user_id": user_payload["id"],
+        "event_type": "EXPORT",
+        "message": f"EXPORT: User {user_payload['sub']} exported {dataset} as {fmt} (decrypted: {decrypt})",
+    }])
+    db.commit()
+
+    media_type, extension = export.FORMATS[fmt]
+    filename = f"{dataset}_{datetime.utcnow():%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        export.stream_export(fmt, SessionLocal, stmt, columns, decrypt=decrypt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/admin/export/decisions", tags=["admin"])
+def export_decisions(
+    format: str = "ndjson",
+    decrypt: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin"]))
+):
+    """
+    Streams the full ai_decisions history (ndjson, csv or parquet) from a server-side
+    cursor. Sensitive attributes stay encrypted unless `decrypt=true`.
+    """
+    stmt = crud.build_decision_export_stmt(start=start, end=end)
+    return _export_response(db, current_user, "ai_decisions", format, stmt, crud.DECISION_EXPORT_COLUMNS,
+                            decrypt=decrypt)
+
+
+@app.get("/admin/export/logs", tags=["admin"])
+def export_logs(
+    format: str = "ndjson",
+    event_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin"]))
+):
+    """Streams decision_logs (including hash chain columns) as ndjson, csv or parquet."""
+    stmt = crud.build_log_export_stmt(start=start, end=end, event_type=event_type)
+    return _export_response(db, current_user, "decision_logs", format, stmt, crud.LOG_EXPORT_COLUMNS)
+
+
+@app.post("/admin/logs/archive", tags=["admin"])
+def archive_audit_logs(
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin"]))
+):
+    """
+    Moves months older than LOG_RETENTION_DAYS that are covered by a signed checkpoint
+    into compressed archive files. Also runs every LOG_ARCHIVE_INTERVAL seconds.
+    """
+    try:
+        archived = log_archive.archive_old_logs(db)
+    except Exception as e:
+        print(f"Error during log archival: {e}")
+        raise HTTPException(status_code=500, detail="Error during log archival")
+    return {"status": "success", "archived": archived}
+
+
+@app.post("/admin/audit/verify", response_model=schemas.AuditVerifyResult, tags=["admin"])
+def verify_audit_logs(
+    full: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin"]))
+):
+    """
+    Verifies the audit log hash chain from the last signed checkpoint (or from the
+    start with `full=true`) and records a new checkpoint when the chain is intact.
+    """
+    return crud.verify_audit_chain(db, full=full)
 
 
 # --------- DASHBOARD STATS (Frontend Integration) ---------
 
 @app.get("/stats/dashboard", response_model=schemas.DashboardStats, tags=["dashboard"])
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user) # Login olan herkes görebilir
 ):
-    total = db.query(models.AIDecision).count()
-    biased = db.query(models.AIDecision).filter(models.AIDecision.decision_label == "BIASED").count()
+    # Artımlı sayaç tablosundan okunur (ai_decisions üzerinde COUNT(*) yok)
+    label_counts = await db.run_sync(crud.get_label_counts)
+    total = sum(label_counts.values())
+    biased = label_counts.get("BIASED", 0)
     
     # Adalet skoru hesabı (1.0 = Mükemmel, 0.0 = Çok Kötü)
     fairness = 1.0
@@ -368,6 +860,79 @@ def get_dashboard_stats(
     }
 
 
+@app.get("/stats/groups", response_model=schemas.GroupStatsResponse, tags=["dashboard"])
+async def get_group_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_roles(["admin", "analyst"]))
+):
+    """
+    Per-sensitive-group decision counts and approval rates over all stored decisions.
+    Aggregated in the database with GROUP BY on the blind index; the encrypted
+    attribute is only decrypted once per group to label it.
+    """
+    groups = await db.run_sync(crud.get_group_label_counts, False)
+    groups = await run_in_threadpool(crud.decrypt_group_counts, groups)
+    for group in groups:
+        group["approval_rate"] = round(group["labels"].get("APPROVED", 0) / group["decisions"], 4)
+
+    rates = [g["approval_rate"] for g in groups]
+    dp = (max(rates) - min(rates)) if len(rates) >= 2 else 0.0
+    return {
+        "groups": groups,
+        "demographic_parity_difference": round(dp, 4),
+        "risk_level": FairnessEvaluator()._calculate_risk(dp),
+    }
+
+
+TIMESERIES_DEFAULT_RANGE = {"hour": timedelta(hours=48), "day": timedelta(days=90)}
+
+
+@app.get("/stats/timeseries", response_model=schemas.TimeseriesResponse, tags=["dashboard"])
+async def get_stats_timeseries(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Decision trends per hour/day bucket: counts per label and sensitive group,
+    average score and score histogram. Served from the rollup table only.
+    """
+    if granularity not in TIMESERIES_DEFAULT_RANGE:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+
+    end = end or datetime.utcnow()
+    start = start or end - TIMESERIES_DEFAULT_RANGE[granularity]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "buckets": await db.run_sync(crud.get_rollup_timeseries, granularity, start, end),
+    }
+
+
+@app.post("/admin/stats/reconcile", tags=["admin"])
+def reconcile_dashboard_stats(
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin"]))
+):
+    """
+    Recomputes the label counters and the hourly/daily rollups from ai_decisions.
+    Returns the corrected label drift and the number of rollup rows fixed.
+    """
+    try:
+        drift = crud.reconcile_label_counts(db)
+        rollup_rows_fixed = crud.reconcile_rollups(db)
+    except Exception as e:
+        print(f"Error during stats reconciliation: {e}")
+        raise HTTPException(status_code=500, detail="Database error during reconciliation")
+    return {"status": "success", "drift": drift, "rollup_rows_fixed": rollup_rows_fixed}
+
+
 # --------- AI ANALYSIS ENDPOINTS ---------
 
 import pandas as pd
@@ -379,10 +944,15 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from services.fairness_evaluator import FairnessEvaluator
+from services.fairness_evaluator import (
+    FairnessEvaluator, start_process_pool as start_fairness_pool, shutdown_process_pool as shutdown_fairness_pool,
+)
 from services.explainer import FairnessExplainer
 from services.model_trainer import ModelTrainer
 from services.decision_explainer import DecisionExplainer
+from services.result_cache import DatasetResultCache
+from services.dataset_store import DatasetStore
+from .monitoring import fairness_monitor
 
 # Initialize AI services (lazy load)
 _fairness_evaluator = None
@@ -393,6 +963,49 @@ _trained_model = None
 _feature_names = None
 _training_data = None
 
+# Dataset fingerprint (path, size, mtime, sha256) -> evaluation sonucu
+_fairness_cache = DatasetResultCache(max_entries=int(os.getenv("FAIRNESS_CACHE_SIZE", "32")))
+
+# Kayıtlı CSV'ler bir kez kolon bazlı binary formata (.npy, memory-mapped) dönüştürülür
+DATASETS = {
+    "balanced": project_root / "datasets" / "dummy.csv",
+    "biased": project_root / "datasets" / "biased.csv",
+}
+FAIRNESS_COLUMNS = ["gender", "approved"]
+
+_dataset_store = DatasetStore()
+for _name, _path in DATASETS.items():
+    _dataset_store.register(_name, _path)
+
+
+# Bu boyutun üzerindeki CSV'ler belleğe alınmadan, chunk'lar halinde değerlendirilir
+FAIRNESS_STREAMING_THRESHOLD = int(os.getenv("FAIRNESS_STREAMING_THRESHOLD_MB", "256")) * 1024 * 1024
+FAIRNESS_STREAMING_CHUNKSIZE = int(os.getenv("FAIRNESS_STREAMING_CHUNKSIZE", "500000"))
+FAIRNESS_STREAMING_WORKERS = int(os.getenv("FAIRNESS_STREAMING_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _compute_dataset_evaluation(dataset_name: str, evaluator: FairnessEvaluator) -> dict:
+    dataset_path = DATASETS[dataset_name]
+    if dataset_path.stat().st_size > FAIRNESS_STREAMING_THRESHOLD:
+        return evaluator.evaluate_file(
+            dataset_path,
+            chunksize=FAIRNESS_STREAMING_CHUNKSIZE,
+            workers=FAIRNESS_STREAMING_WORKERS,
+        )
+    return evaluator.evaluate(_dataset_store.load(dataset_name, columns=FAIRNESS_COLUMNS))
+
+
+def evaluate_dataset(dataset_name: str, evaluator: FairnessEvaluator) -> dict:
+    """
+    Cached fairness evaluation of a registered dataset. Re-evaluates only when the
+    file changes; concurrent identical requests share a single computation.
+    """
+    return _fairness_cache.get_or_compute(
+        DATASETS[dataset_name],
+        lambda: _compute_dataset_evaluation(dataset_name, evaluator),
+        namespace="fairness",
+    )
+
 
 def get_ai_services():
     """Lazy initialization of AI services"""
@@ -407,11 +1020,9 @@ def get_ai_services():
         
         # Train model on startup for decision explanations
         try:
-            dataset_path = project_root / "datasets" / "dummy.csv"
-            if dataset_path.exists():
-                df = pd.read_csv(dataset_path)
-                _trained_model, _feature_names, _training_data = _model_trainer.train(
-                    df, target_col="approved", drop_cols=["gender", "approved"]
+            if DATASETS["balanced"].exists():
+                _trained_model, _feature_names, _training_data = _model_trainer.train_from_store(
+                    _dataset_store, "balanced", target_col="approved", drop_cols=["gender", "approved"]
                 )
         except Exception as e:
             print(f"Warning: Could not train model: {e}")
@@ -444,20 +1055,16 @@ def analyze_fairness(
     
     # Determine dataset path
     dataset_name = request.dataset_name
-    if dataset_name == "biased":
-        dataset_path = project_root / "datasets" / "biased.csv"
-    else:
-        dataset_path = project_root / "datasets" / "dummy.csv"
+    if dataset_name != "biased":
         dataset_name = "balanced"
+    dataset_path = DATASETS[dataset_name]
     
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_name}")
     
     try:
-        df = pd.read_csv(dataset_path)
-        
-        # Run fairness evaluation
-        evaluation = services["evaluator"].evaluate(df)
+        # Run fairness evaluation (cached per dataset version)
+        evaluation = evaluate_dataset(dataset_name, services["evaluator"])
         
         # Generate explanation
         explanation = services["explainer"].generate_explanation(evaluation, dataset_name)
@@ -531,12 +1138,9 @@ def get_ai_metrics(current_user=Depends(get_current_user)):
     try:
         results = []
         
-        for dataset_name in ["dummy.csv", "biased.csv"]:
-            dataset_path = project_root / "datasets" / dataset_name
+        for dataset_name, dataset_path in DATASETS.items():
             if dataset_path.exists():
-                df = pd.read_csv(dataset_path)
-                evaluation = services["evaluator"].evaluate(df)
-                results.append(evaluation)
+                results.append(evaluate_dataset(dataset_name, services["evaluator"]))
         
         if not results:
             return {
@@ -569,3 +1173,29 @@ def get_ai_metrics(current_user=Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Metrics calculation failed: {str(e)}")
 
+
+
+@app.post("/admin/cache/invalidate", tags=["admin"])
+def invalidate_fairness_cache(
+    dataset_name: Optional[str] = None,
+    current_user=Depends(require_roles(["admin"]))
+):
+    """
+    Drops cached fairness results for one dataset file (e.g. "biased.csv") or all datasets.
+    """
+    if dataset_name is None:
+        removed = _fairness_cache.invalidate()
+    else:
+        removed = _fairness_cache.invalidate(project_root / "datasets" / Path(dataset_name).name)
+    return {"status": "success", "removed": removed}
+
+
+# --------- LIVE FAIRNESS MONITOR ---------
+
+@app.get("/monitor/fairness", response_model=schemas.FairnessMonitorResponse, tags=["dashboard"])
+async def get_live_fairness(current_user=Depends(require_roles(["admin", "analyst"]))):
+    """
+    Demographic parity over live decisions in a sliding time window and a sliding
+    count window. Maintained incrementally at ingest; no table scan.
+    """
+    return fairness_monitor.snapshot()
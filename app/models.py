@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Float, Text, PrimaryKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -29,11 +29,21 @@ class AIDecision(Base):
     decision_label = Column(String(50), nullable=False)
     score = Column(Float, nullable=False)
     sensitive_attribute = Column(Text, nullable=True)
+    # Şifreli değerin HMAC blind index'i (GROUP BY / eşitlik sorguları için)
+    sensitive_attribute_bidx = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     owner = relationship("User", back_populates="decisions")
     logs = relationship("DecisionLog", back_populates="decision")
 
+    __table_args__ = (
+        Index("ix_ai_decisions_bidx_label", "sensitive_attribute_bidx", "decision_label"),
+        # Keyset sayfalama (created_at, id) + filtreler
+        Index("ix_ai_decisions_created_id", "created_at", "id"),
+        Index("ix_ai_decisions_label_created_id", "decision_label", "created_at", "id"),
+        Index("ix_ai_decisions_owner_created_id", "owner_id", "created_at", "id"),
+    )
+
 
 class DecisionLog(Base):
     __tablename__ = "decision_logs"
@@ -44,7 +54,126 @@ class DecisionLog(Base):
     event_type = Column(String(50), nullable=False, default="SYSTEM")
     message = Column(Text, nullable=False)
     hash = Column(String(64), nullable=False)
+    # Hash zinciri: önceki halkanın hash'i ve zincirdeki sıra (zincir öncesi eski kayıtlarda NULL)
+    prev_hash = Column(String(64), nullable=True)
+    chain_seq = Column(BigInteger, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     decision = relationship("AIDecision", back_populates="logs")
     actor = relationship("User", back_populates="audit_logs")
+
+    __table_args__ = (
+        # /admin/logs keyset sayfalama (created_at, id) + filtreler
+        Index("ix_decision_logs_created_id", "created_at", "id"),
+        Index("ix_decision_logs_event_created_id", "event_type", "created_at", "id"),
+        Index("ix_decision_logs_decision_created_id", "decision_id", "created_at", "id"),
+        Index("ix_decision_logs_actor_created_id", "actor_user_id", "created_at", "id"),
+        Index("ux_decision_logs_chain_seq", "chain_seq", unique=True),
+    )
+
+
+class DecisionLogArchive(Base):
+    """
+    decision_logs için aylık mantıksal partition manifest'i. Saklama süresini aşan bir ayın
+    satırları sıkıştırılmış NDJSON dosyasına taşınır ve sıcak tablodan silinir.
+    """
+    __tablename__ = "decision_log_archives"
+
+    id = Column(Integer, primary_key=True)
+    period_start = Column(DateTime, nullable=False, index=True)
+    period_end = Column(DateTime, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    first_chain_seq = Column(BigInteger, nullable=True)
+    last_chain_seq = Column(BigInteger, nullable=True)
+    path = Column(String(500), nullable=False, unique=True)
+    sha256 = Column(String(64), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RefreshToken(Base):
+    """
+    Rotasyonlu refresh token'lar. Her kullanımda token iptal edilip aynı ailede yenisi verilir;
+    iptal edilmiş bir token tekrar gelirse (çalınma şüphesi) tüm aile iptal edilir.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class AuditChainHead(Base):
+    """
+    decision_logs hash zincirinin son halkası (tek satır). Log ekleyen her transaction bu satırı
+    güncelleyerek kilitler, böylece eşzamanlı yazarlar zinciri çatallayamaz. Aynı kilit log yazan
+    tüm transaction'ları commit'e kadar tek sıraya sokar (bkz. crud.append_decision_logs).
+    """
+    __tablename__ = "audit_chain_head"
+
+    id = Column(Integer, primary_key=True)
+    entry_count = Column(BigInteger, nullable=False, default=0)  # = son chain_seq
+    last_hash = Column(String(64), nullable=True)
+
+
+class AuditCheckpoint(Base):
+    """
+    Doğrulanmış zincir noktası (chain_seq, o satırın hash'i), HMAC ile imzalı.
+    Artımlı doğrulama son checkpoint'ten devam eder.
+    """
+    __tablename__ = "audit_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    chain_seq = Column(BigInteger, nullable=False, unique=True)
+    last_hash = Column(String(64), nullable=False)
+    signature = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DecisionLabelCount(Base):
+    """
+    decision_label başına karar sayacı. Her insert yolunda artırılır,
+    böylece dashboard COUNT(*) yapmadan okuyabilir. Periyodik reconcile ile düzeltilir.
+    """
+    __tablename__ = "decision_label_counts"
+
+    label = Column(String(50), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class SensitiveGroup(Base):
+    """
+    Hassas grup sözlüğü: blind index -> o grubun temsilci şifreli değeri (grubun ilk kaydından).
+    Grup ilk kez görüldüğünde aggregate'lerle aynı transaction'da eklenir; rollup okumaları
+    grup adını ai_decisions'a dokunmadan buradan çözer.
+    """
+    __tablename__ = "sensitive_groups"
+
+    bidx = Column(String(64), primary_key=True)
+    sample = Column(Text, nullable=False)  # Fernet ciphertext; düz metin tutulmaz
+
+
+class DecisionRollup(Base):
+    """
+    Saatlik / günlük zaman bucket'larında karar aggregate'leri.
+    dimension: "label" (decision_label), "group" (hassas grubun blind index'i; düz metin tutulmaz),
+    "score_bin" (0-9 skor histogramı)
+    Her insert yolunda artımlı güncellenir, periyodik reconcile ile düzeltilir;
+    /stats/timeseries yalnızca bu tablodan ve SensitiveGroup sözlüğünden okur (grup adları okuma anında çözülür).
+    """
+    __tablename__ = "decision_rollups"
+
+    granularity = Column(String(8), nullable=False)     # "hour" / "day"
+    bucket_start = Column(DateTime, nullable=False)
+    dimension = Column(String(16), nullable=False)
+    key = Column(String(64), nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("granularity", "bucket_start", "dimension", "key"),
+    )
@@ -0,0 +1,66 @@
+"""
+Canlı kararlar üzerinde online fairness izleme.
+
+Insert yolları kararları `session.info` içine iliştirir (crud.queue_fairness_events);
+transaction commit edildiğinde buradaki listener olayları FairnessMonitor'a aktarır.
+Bir pencere MEDIUM/HIGH riske geçtiğinde ALERT DecisionLog yazılır. Tablo yeniden taranmaz.
+"""
+import os
+
+from sqlalchemy import event
+
+from . import crud
+from .database import SessionLocal
+from services.fairness_monitor import FairnessMonitor
+
+
+fairness_monitor = FairnessMonitor(
+    window_seconds=int(os.getenv("FAIRNESS_MONITOR_WINDOW_SECONDS", "3600")),
+    window_count=int(os.getenv("FAIRNESS_MONITOR_WINDOW_COUNT", "1000")),
+    min_group_size=int(os.getenv("FAIRNESS_MONITOR_MIN_GROUP_SIZE", "30")),
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _feed_fairness_monitor(session):
+    events = session.info.pop(crud.FAIRNESS_EVENTS_KEY, None)
+    if not events:
+        return
+
+    alerts = fairness_monitor.observe_many(events)
+    if alerts:
+        _write_alerts(alerts)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_fairness_events(session, previous_transaction):
+    # Savepoint rollback'leri (sayaç upsert çakışması) olayları silmemeli
+    if not previous_transaction.nested:
+        session.info.pop(crud.FAIRNESS_EVENTS_KEY, None)
+
+
+def _alert_message(alert: dict) -> str:
+    if alert["window"] == "time":
+        scope = f"last {alert['window_seconds']}s"
+    else:
+        scope = f"last {alert['window_count']} decisions"
+    rates = ", ".join(f"{group}={rate:.2f}" for group, rate in sorted(alert["approval_rates"].items()))
+    return (
+        f"FAIRNESS ALERT: Demographic parity difference {alert['demographic_parity_difference']:.2f} "
+        f"({alert['risk_level']}) over {scope}. Approval rates: {rates}"
+    )
+
+
+def _write_alerts(alerts: list):
+    db = SessionLocal()
+    try:
+        crud.append_decision_logs(db, [
+            {"decision_id": None, "actor_user_id": None, "event_type": "ALERT", "message": _alert_message(alert)}
+            for alert in alerts
+        ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not write fairness alert: {e}")
+    finally:
+        db.close()
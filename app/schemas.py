@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 from pydantic import BaseModel, EmailStr, ConfigDict, constr, confloat
 
@@ -47,6 +47,47 @@ class AIDecisionRead(AIDecisionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AIDecisionBatchError(BaseModel):
+    index: int
+    errors: List[dict]
+
+
+class AIDecisionBatchResponse(BaseModel):
+    """ids[i] girdi listesindeki i. kaydın id'si (reddedilenler için None)"""
+    inserted: int
+    rejected: int
+    ids: List[Optional[int]]
+    errors: List[AIDecisionBatchError] = []
+
+
+class NDJSONLineError(BaseModel):
+    line: int
+    errors: List[dict]
+
+
+class NDJSONIngestSummary(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[NDJSONLineError] = []
+    errors_truncated: bool = False
+
+
+class IngestTicketStatus(BaseModel):
+    ticket_id: str
+    kind: str
+    status: str  # queued / committed / failed
+    result: Optional[dict] = None
+
+
+# ---------- ETHICS ----------
+
+class EthicsEvaluationResult(BaseModel):
+    decision_id: int
+    ethics_status: str
+    explanation: str
+    log_hash: str
+
+
 # ---------- DECISION LOG ----------
 
 class DecisionLogBase(BaseModel):
@@ -63,6 +104,8 @@ class DecisionLogRead(DecisionLogBase):
     decision_id: Optional[int]
     actor_user_id: Optional[int]
     hash: str
+    prev_hash: Optional[str] = None
+    chain_seq: Optional[int] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -78,6 +121,59 @@ class DashboardStats(BaseModel):
     fairness_score: float
     system_health: int
 
+class TimeseriesBucket(BaseModel):
+    bucket_start: datetime
+    total: int
+    score_avg: Optional[float] = None
+    labels: Dict[str, int] = {}
+    groups: Dict[str, int] = {}
+    score_histogram: List[int] = []  # 10 eşit genişlikte skor aralığı (0.0-0.1, ..., 0.9-1.0)
+
+
+class TimeseriesResponse(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    buckets: List[TimeseriesBucket]
+
+
+class FairnessWindow(BaseModel):
+    demographic_parity_difference: float
+    risk_level: str
+    approval_rates: Dict[str, float]
+    decisions: int
+    window_seconds: Optional[int] = None
+    window_count: Optional[int] = None
+
+
+class FairnessMonitorResponse(BaseModel):
+    time_window: FairnessWindow
+    count_window: FairnessWindow
+
+
+class GroupStats(BaseModel):
+    group: Optional[str]
+    decisions: int
+    labels: Dict[str, int]
+    approval_rate: float
+
+
+class GroupStatsResponse(BaseModel):
+    groups: List[GroupStats]
+    demographic_parity_difference: float
+    risk_level: str
+
+
+class AuditVerifyResult(BaseModel):
+    valid: bool
+    from_seq: int
+    to_seq: int
+    verified: int
+    checkpoint_seq: Optional[int] = None
+    failed_log_id: Optional[int] = None
+    error: Optional[str] = None
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -86,6 +182,12 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # access token ömrü (saniye)
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 # ---------- AI ANALYSIS ----------
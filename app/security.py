@@ -1,6 +1,15 @@
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
 import os
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -8,6 +17,9 @@ from passlib.context import CryptContext
 # Şifreleme Kütüphanesi
 from cryptography.fernet import Fernet
 
+from .cache import TTLCache
+from utils.telemetry import FUNCTION_DURATION, timed
+
 # =====================
 # CONFIG
 # =====================
@@ -15,6 +27,10 @@ from cryptography.fernet import Fernet
 SECRET_KEY = "CHANGE_THIS_SECRET_IN_PRODUCTION"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Yeni döndürülmüş bir refresh token bu süre içinde tekrar gelirse (örn. aynı anda yenileyen iki sekme)
+# hırsızlık sayılmaz, aileye yeni bir token verilir
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "10"))
 
 # Veri Şifreleme Anahtarı (Encryption Key)
 # Gerçek projede .env dosyasından okunmalı.
@@ -30,24 +46,162 @@ except Exception as e:
     print(f"Encryption Key Error: {e}. Generating a temporary one (Warning: Data persistence issues may occur).")
     cipher_suite = Fernet(Fernet.generate_key())
 
+# Blind index anahtarı: şifreli alanlar üzerinde eşitlik / GROUP BY için deterministik HMAC.
+# Şifreleme anahtarından ayrı tutulmalı.
+BLIND_INDEX_KEY = os.getenv("BLIND_INDEX_KEY", "blind_index_key_for_demo_purposes_only")
+
+# Audit log checkpoint imza anahtarı (HMAC)
+AUDIT_CHECKPOINT_KEY = os.getenv("AUDIT_CHECKPOINT_KEY", "audit_checkpoint_key_for_demo_purposes_only")
+
 # =====================
 # PASSWORD HASHING
 # =====================
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Hedef PBKDF2 tur sayısı; bunun altındaki hash'ler login sırasında otomatik yükseltilir
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+# Hash işlemleri ayrı process'lerde (GIL dışında) çalışır; 0 = aynı process'te, tek bir yardımcı thread'de
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Worker process'lerin başlatma yöntemi. fork kullanılmaz: çok thread'li bir process'i (uvicorn,
+# ingest kuyruğu, zamanlayıcı) fork etmek kilitleri kopyalar ve worker'ları kilitleyebilir.
+PASSWORD_HASH_START_METHOD = os.getenv(
+    "PASSWORD_HASH_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+# Aynı anda kabul edilen (çalışan + bekleyen) hash işi; aşılırsa PasswordHasherBusy
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(1, PASSWORD_HASH_WORKERS) * 4)))
+
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Hash havuzu dolu; istek beklemeden reddedilmeli (429)."""
+
+
+_hash_pool: Optional[Executor] = None
+_hash_pool_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_hash_pool() -> Executor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            if PASSWORD_HASH_WORKERS <= 0:
+                # Event loop'ta satır içi hash yerine tek bir yardımcı thread
+                _hash_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-hash")
+            else:
+                _hash_pool = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context(PASSWORD_HASH_START_METHOD),
+                )
+        return _hash_pool
+
+
+def _discard_hash_pool(pool: Executor):
+    """Bozulan (worker'ı ölen) havuzu bırakır; bir sonraki _get_hash_pool yenisini kurar."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is pool:
+            _hash_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start_password_hashing():
+    """Havuzu uygulama açılışında, istekler gelmeden önce kurar."""
+    _get_hash_pool()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _submit(pool: Executor, func, *args) -> Future:
+    """
+    İşi hash havuzuna gönderir. Havuz doluysa beklemek yerine hemen PasswordHasherBusy fırlatır,
+    böylece bir login fırtınası diğer endpoint'lerin thread'lerini tüketemez.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing capacity exhausted")
+    try:
+        future = pool.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
+def _run(func, *args):
+    """
+    Senkron çağıranlar için. Bir worker process ölürse (OOM killer vb.) havuz kalıcı olarak
+    BrokenProcessPool durumuna geçer; havuz yeniden kurulur ve iş bir kez daha denenir.
+    """
+    pool = _get_hash_pool()
+    try:
+        return _submit(pool, func, *args).result()
+    except BrokenProcessPool:
+        _discard_hash_pool(pool)
+        return _submit(_get_hash_pool(), func, *args).result()
+
+
+async def _run_async(func, *args):
+    """_run'ın event loop'u bloklamayan karşılığı."""
+    pool = _get_hash_pool()
+    try:
+        return await asyncio.wrap_future(_submit(pool, func, *args))
+    except BrokenProcessPool:
+        _discard_hash_pool(pool)
+        return await asyncio.wrap_future(_submit(_get_hash_pool(), func, *args))
+
+
+def shutdown_password_hashing():
+    global _hash_pool
+    with _hash_pool_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    """
+    Raises:
+        PasswordHasherBusy: Havuz doluysa
+    """
+    return _run(_hash, password)
 
 
+@timed("verify_password")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run(_verify_and_update, plain_password, hashed_password)[0]
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Async endpoint'ler için doğrulama: event loop bloklanmaz, thread tutulmaz.
+
+    Returns:
+        (doğru mu, yeni hash) - hash eski tur sayısıyla üretilmişse yeni hash, değilse None
+
+    Raises:
+        PasswordHasherBusy: Havuz doluysa
+    """
+    with FUNCTION_DURATION.time("verify_password"):
+        return await _run_async(_verify_and_update, plain_password, hashed_password)
 
 # =====================
 # DATA ENCRYPTION
 # =====================
 
+@timed("encrypt_data")
 def encrypt_data(data: str) -> str:
     """Hassas veriyi veritabanına kaydetmeden önce şifreler."""
     if not data:
@@ -70,6 +224,78 @@ def decrypt_data(token: str) -> str:
         return "[Encrypted Data]"
 
 
+def blind_index(data: Optional[str]) -> Optional[str]:
+    """
+    Hassas değerin anahtarlı HMAC-SHA256 blind index'i. Aynı değer her zaman aynı indeksi
+    verir (büyük/küçük harf ve baştaki/sondaki boşluklar normalize edilir), düz metin açığa çıkmaz.
+    """
+    if not data:
+        return None
+    normalized = data.strip().casefold().encode("utf-8")
+    return hmac.new(BLIND_INDEX_KEY.encode("utf-8"), normalized, hashlib.sha256).hexdigest()
+
+
+# Toplu şifre çözme: büyük sonuç kümeleri worker pool'a dağıtılır.
+# Çağrılar arası düz metin cache'i yoktur: Fernet her satırı farklı bir ciphertext'e şifreler
+# (rastgele IV), bu yüzden ciphertext anahtarlı bir cache yalnızca aynı satır tekrar okunduğunda
+# isabet eder; blind index anahtarı ise büyük/küçük harf varyantlarını karıştırır.
+DECRYPT_WORKERS = int(os.getenv("DECRYPT_WORKERS", str(min(8, os.cpu_count() or 1))))
+DECRYPT_PARALLEL_THRESHOLD = int(os.getenv("DECRYPT_PARALLEL_THRESHOLD", "256"))
+
+_decrypt_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_decrypt_pool() -> ThreadPoolExecutor:
+    global _decrypt_pool
+    if _decrypt_pool is None:
+        _decrypt_pool = ThreadPoolExecutor(max_workers=DECRYPT_WORKERS, thread_name_prefix="decrypt")
+    return _decrypt_pool
+
+
+def decrypt_many(tokens: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Birden fazla şifreli değeri çözer (sıra korunur).
+
+    Aynı çağrı içinde tekrar eden ciphertext'ler (örn. aynı satırın birden fazla kez listelenmesi
+    veya grup sözlüğü örnekleri) yalnızca bir kez çözülür. Tekilleştirme anahtarı ciphertext'in
+    kendisidir; blind index kullanılamaz, çünkü normalize edilmiş (casefold) metinden üretildiği
+    için farklı düz metinler ("Male" / "male") aynı indekse düşer. Çözülecek farklı değer sayısı
+    eşiği aşarsa işlem thread pool'a dağıtılır.
+    """
+    results: List[Optional[str]] = [None] * len(tokens)
+    pending: dict = {}  # ciphertext -> [positions]
+
+    for i, token in enumerate(tokens):
+        if token:
+            pending.setdefault(token, []).append(i)
+
+    if not pending:
+        return results
+
+    to_decrypt = list(pending)
+    if len(to_decrypt) >= DECRYPT_PARALLEL_THRESHOLD and DECRYPT_WORKERS > 1:
+        plains = list(_get_decrypt_pool().map(decrypt_data, to_decrypt, chunksize=64))
+    else:
+        plains = [decrypt_data(token) for token in to_decrypt]
+
+    for token, plain in zip(to_decrypt, plains):
+        for i in pending[token]:
+            results[i] = plain
+
+    return results
+
+
+def set_encryption_key(key: str):
+    """Şifreleme anahtarını değiştirir."""
+    global cipher_suite
+    cipher_suite = Fernet(key)
+
+
+def encrypt_many(values: List[Optional[str]]) -> List[Optional[str]]:
+    """Toplu kayıt için birden fazla değeri aynı cipher ile şifreler (sıra korunur)."""
+    return [encrypt_data(value) for value in values]
+
+
 # =====================
 # JWT TOKEN
 # =====================
@@ -88,21 +314,72 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
     return encoded_jwt
 
+
+def generate_refresh_token() -> str:
+    """Opak, 256 bit rastgele refresh token (JWT değil; yalnızca hash'i saklanır)."""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+# Doğrulanmış token payload'ları: aynı token'la gelen sonraki istekler imza doğrulamasını atlar.
+# Girdi en geç token'ın exp anında düşer; başarısız doğrulamalar cache'lenmez.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+_token_cache = TTLCache(max_entries=TOKEN_CACHE_SIZE, ttl_seconds=TOKEN_CACHE_TTL)
+
+
 def decode_access_token(token: str):
+    cached = _token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    ttl = TOKEN_CACHE_TTL if exp is None else min(TOKEN_CACHE_TTL, exp - time.time())
+    _token_cache.set(token, payload, ttl_seconds=ttl)
+    return dict(payload)
+
+
+def purge_token_cache() -> int:
+    """Doğrulanmış token cache'ini temizler (SECRET_KEY değişiminde zorunlu)."""
+    return _token_cache.purge()
+
+
+# Kısa ömürlü kullanıcı (principal) cache'i: /users/me gibi okumalar her istekte DB'ye gitmez.
+# Rol değişikliğinde invalidate_principal ile düşürülmeli.
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+
+_principal_cache = TTLCache(max_entries=PRINCIPAL_CACHE_SIZE, ttl_seconds=PRINCIPAL_CACHE_TTL)
+
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_cached_principal(user_id: int):
+    return _principal_cache.get(user_id)
+
+
+def cache_principal(user_id: int, principal):
+    _principal_cache.set(user_id, principal)
+
+
+def invalidate_principal(user_id: int):
+    _principal_cache.pop(user_id)
+
+
+# async: token doğrulaması event loop'ta yapılır, her istek için thread pool'a gidilmez
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_access_token(token)
 
     if payload is None:
@@ -114,7 +391,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     return payload
 
 def require_roles(allowed_roles: List[str]):
-    def role_checker(user_payload: dict = Depends(get_current_user)):
+    async def role_checker(user_payload: dict = Depends(get_current_user)):
         user_role = user_payload.get("role")
 
         if user_role not in allowed_roles:
@@ -126,8 +403,42 @@ def require_roles(allowed_roles: List[str]):
 
     return role_checker
 
-import hashlib
-
 
 def generate_hash(content: str) -> str:
     return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+# =====================
+# AUDIT HASH CHAIN
+# =====================
+
+# Zincirin ilk halkasının prev_hash değeri
+GENESIS_HASH = "0" * 64
+
+
+def chain_log_hash(prev_hash: str, chain_seq: int, event_type: str, decision_id: Optional[int],
+                   actor_user_id: Optional[int], created_at: datetime, message: str) -> str:
+    """
+    Audit log satırının zincirli hash'i. Bir önceki satırın hash'i ve sıra numarası da girdiye
+    dahildir; satır silmek, araya eklemek veya değiştirmek sonraki tüm hash'leri geçersiz kılar.
+    """
+    content = "|".join((
+        prev_hash,
+        str(chain_seq),
+        event_type,
+        "" if decision_id is None else str(decision_id),
+        "" if actor_user_id is None else str(actor_user_id),
+        created_at.isoformat(),
+        message,
+    ))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def sign_checkpoint(chain_seq: int, last_hash: str) -> str:
+    """Checkpoint'i (sıra numarası + o noktadaki zincir hash'i) HMAC-SHA256 ile imzalar."""
+    payload = f"{chain_seq}|{last_hash}".encode("utf-8")
+    return hmac.new(AUDIT_CHECKPOINT_KEY.encode("utf-8"), payload, hashlib.sha256).hexdigest()
+
+
+def verify_checkpoint_signature(chain_seq: int, last_hash: str, signature: str) -> bool:
+    return hmac.compare_digest(sign_checkpoint(chain_seq, last_hash), signature)
@@ -17,6 +17,13 @@ class Config:
     # Rate Limiting
     RATE_LIMIT_MAX_REQUESTS = int(os.getenv('RATE_LIMIT_MAX', '100'))
     RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', '3600'))
+    # Separate budgets so dashboard polling and ingestion never exhaust the auth limit above
+    RATE_LIMIT_READ_MAX = int(os.getenv('RATE_LIMIT_READ_MAX', '600'))
+    RATE_LIMIT_READ_WINDOW = int(os.getenv('RATE_LIMIT_READ_WINDOW', '60'))
+    RATE_LIMIT_INGEST_MAX = int(os.getenv('RATE_LIMIT_INGEST_MAX', '1200'))
+    RATE_LIMIT_INGEST_WINDOW = int(os.getenv('RATE_LIMIT_INGEST_WINDOW', '60'))
+    # Shared by all worker processes on the host; empty = per-process in-memory state
+    RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', str(Path(__file__).parent / 'outputs' / 'rate_limits.sqlite3'))
     
     # Paths
     BASE_DIR = Path(__file__).parent
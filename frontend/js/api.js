@@ -8,6 +8,10 @@
 // API Base URL - Backend adresi
 const API_BASE_URL = 'http://localhost:8000';
 
+// 429 (rate limit) sonrası yeniden deneme
+const MAX_RATE_LIMIT_RETRIES = 2;
+const MAX_RETRY_AFTER_SECONDS = 300;
+
 /**
  * API Client Class
  * JWT token yönetimi ve HTTP istekleri için helper sınıf
@@ -15,6 +19,7 @@ const API_BASE_URL = 'http://localhost:8000';
 class APIClient {
     constructor(baseURL = API_BASE_URL) {
         this.baseURL = baseURL;
+        this.backoffUntil = 0;  // 429 sonrası Retry-After bitene kadar istek gönderilmez (ms)
     }
 
     /**
@@ -32,10 +37,119 @@ class APIClient {
     }
 
     /**
-     * JWT token'ı temizle
+     * Refresh token (tek kullanımlık, her yenilemede değişir)
+     */
+    getRefreshToken() {
+        return localStorage.getItem('refresh_token');
+    }
+
+    setRefreshToken(token) {
+        if (token) localStorage.setItem('refresh_token', token);
+    }
+
+    /**
+     * JWT ve refresh token'ı temizle
      */
     clearToken() {
         localStorage.removeItem('jwt_token');
+        localStorage.removeItem('refresh_token');
+    }
+
+    /**
+     * Access token'ı /auth/refresh ile yenile (şifre doğrulaması yok).
+     * Aynı sekmede aynı anda 401 alan istekler tek bir yenileme çağrısını paylaşır.
+     * Sekmeler arası (localStorage ortak) yenilemeler navigator.locks ile sıraya girer: kilidi
+     * ikinci alan sekme, token'ın başka bir sekme tarafından zaten yenilendiğini görür ve onu kullanır.
+     * Refresh token tek kullanımlık olduğu için aynı token'ın ikinci kez gönderilmesi oturumu iptal ettirebilir.
+     * @returns {Promise<boolean>}
+     */
+    refreshAccessToken() {
+        if (!this.refreshPromise) {
+            const staleAccessToken = this.getToken();
+            const refresh = () => this.performRefresh(staleAccessToken);
+            const pending = navigator.locks
+                ? navigator.locks.request('dem-token-refresh', refresh)
+                : refresh();
+            this.refreshPromise = pending.finally(() => {
+                this.refreshPromise = null;
+            });
+        }
+        return this.refreshPromise;
+    }
+
+    async performRefresh(staleAccessToken) {
+        // Kilidi beklerken başka bir sekme yenilediyse yeni token'ı kullan
+        const currentAccessToken = this.getToken();
+        if (currentAccessToken && currentAccessToken !== staleAccessToken) return true;
+
+        const refreshToken = this.getRefreshToken();
+        if (!refreshToken) return false;
+
+        const response = await fetch(`${this.baseURL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        if (!response.ok) return false;
+
+        const data = await response.json();
+        this.setToken(data.access_token);
+        this.setRefreshToken(data.refresh_token);
+        return true;
+    }
+
+    /**
+     * Rate limit aşıldıysa (429) Retry-After süresi dolmamış mı?
+     * Periyodik yenilemeler bu sürede atlanır.
+     */
+    isBackingOff() {
+        return Date.now() < this.backoffUntil;
+    }
+
+    /**
+     * 429 yanıtının Retry-After başlığını (saniye) bekleme süresine çevir ve kaydet
+     */
+    recordRateLimit(response) {
+        const seconds = parseInt(response.headers.get('Retry-After'), 10);
+        const delay = Math.min(Number.isFinite(seconds) && seconds > 0 ? seconds : 1, MAX_RETRY_AFTER_SECONDS) * 1000;
+        this.backoffUntil = Math.max(this.backoffUntil, Date.now() + delay);
+    }
+
+    /**
+     * fetch + 401'de bir kez token yenileyip tekrar deneme.
+     * 429'da Retry-After kadar bekleyip en fazla MAX_RATE_LIMIT_RETRIES kez yeniden dener;
+     * bekleme süresi tüm istekler için geçerlidir.
+     */
+    async fetchWithAuth(url, options = {}) {
+        const send = async () => {
+            for (let attempt = 0; ; attempt++) {
+                const wait = this.backoffUntil - Date.now();
+                if (wait > 0) await new Promise((resolve) => setTimeout(resolve, wait));
+
+                const response = await fetch(url, {
+                    ...options,
+                    headers: {
+                        ...this.getHeaders(options.auth !== false),
+                        ...options.headers,
+                    },
+                });
+                if (response.status !== 429 || attempt >= MAX_RATE_LIMIT_RETRIES) return response;
+                this.recordRateLimit(response);
+            }
+        };
+
+        let response = await send();
+        if (response.status === 401 && options.auth !== false && await this.refreshAccessToken()) {
+            response = await send();
+        }
+
+        // Token geçersiz veya süresi dolmuş, yenilenemedi
+        if (response.status === 401) {
+            this.clearToken();
+            window.location.href = '/frontend/index.html';
+            throw new Error('Unauthorized');
+        }
+        return response;
     }
 
     /**
@@ -66,20 +180,7 @@ class APIClient {
         const url = `${this.baseURL}${endpoint}`;
 
         try {
-            const response = await fetch(url, {
-                ...options,
-                headers: {
-                    ...this.getHeaders(options.auth !== false),
-                    ...options.headers,
-                },
-            });
-
-            // Token geçersiz veya süresi dolmuş
-            if (response.status === 401) {
-                this.clearToken();
-                window.location.href = '/frontend/index.html';
-                throw new Error('Unauthorized');
-            }
+            const response = await this.fetchWithAuth(url, options);
 
             // Response'u parse et
             const data = await response.json();
@@ -95,6 +196,26 @@ class APIClient {
         }
     }
 
+    /**
+     * Cursor sayfalı GET request
+     * Backend sonraki sayfanın cursor'ını X-Next-Cursor header'ında döndürür.
+     * @returns {Promise<{data: any, nextCursor: string|null}>}
+     */
+    async getPage(endpoint) {
+        const url = `${this.baseURL}${endpoint}`;
+        const response = await this.fetchWithAuth(url, { method: 'GET' });
+
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.detail || 'API request failed');
+        }
+
+        return {
+            data,
+            nextCursor: response.headers.get('X-Next-Cursor'),
+        };
+    }
+
     /**
      * GET request
      */
@@ -154,7 +275,7 @@ const api = new APIClient();
  * Login - Kullanıcı girişi
  * @param {string} username - email veya username
  * @param {string} password 
- * @returns {Promise<object>} - { access_token, token_type }
+ * @returns {Promise<object>} - { access_token, token_type, refresh_token }
  */
 async function loginUser(username, password) {
     try {
@@ -186,8 +307,9 @@ async function loginUser(username, password) {
             throw new Error(errorMessage);
         }
 
-        // Token'ı kaydet
+        // Token'ları kaydet
         api.setToken(data.access_token);
+        api.setRefreshToken(data.refresh_token);
 
         // user bilgisini almak için /users/me çağır
         const userResponse = await fetch(`${API_BASE_URL}/users/me`, {
@@ -209,6 +331,19 @@ async function loginUser(username, password) {
  * Logout - Kullanıcı çıkışı
  */
 async function logoutUser() {
+    const refreshToken = api.getRefreshToken();
+    if (refreshToken) {
+        try {
+            // Oturum ailesini sunucuda iptal et
+            await fetch(`${API_BASE_URL}/auth/logout`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ refresh_token: refreshToken }),
+            });
+        } catch (error) {
+            console.error('Logout error:', error);
+        }
+    }
     api.clearToken();
     return { success: true };
 }
@@ -245,24 +380,34 @@ async function getDashboardStats() {
 }
 
 /**
- * AI kararlarını getir
+ * AI kararlarını getir (en yeniden eskiye, cursor sayfalama)
  * @param {number} limit 
- * @param {number} offset 
- * @returns {Promise<Array>}
+ * @param {string|null} cursor - Önceki çağrının nextCursor değeri
+ * @returns {Promise<object>} - { decisions, nextCursor }
  */
-async function getDecisions(limit = 10, offset = 0) {
+async function getDecisions(limit = 10, cursor = null) {
     try {
-        // Get decisions from the database
-        const response = await api.get(`/decisions?limit=${limit}&offset=${offset}`);
+        let query = `limit=${limit}`;
+        if (cursor) query += `&cursor=${encodeURIComponent(cursor)}`;
+
+        const { data, nextCursor } = await api.getPage(`/decisions?${query}`);
         return {
-            decisions: response || [],
-            total: response ? response.length : 0
+            decisions: (data || []).map(decision => ({
+                id: decision.id,
+                timestamp: decision.created_at,
+                model: `#${decision.owner_id}`,
+                result: decision.decision_label,
+                biasRisk: decision.decision_label === 'BIASED' ? 'high' : decision.decision_label === 'RISKY' ? 'medium' : 'low',
+                status: decision.decision_label.toLowerCase(),
+                score: decision.score
+            })),
+            nextCursor
         };
     } catch (error) {
         console.error('Get decisions error:', error);
         return {
             decisions: [],
-            total: 0
+            nextCursor: null
         };
     }
 }
@@ -322,18 +467,35 @@ async function getFairnessMetrics() {
 // ============================================
 
 /**
- * Sistem loglarını getir
- * @param {object} filters - { startDate, endDate, logLevel, search, page, pageSize }
- * @returns {Promise<object>}
+ * 'YYYY-MM-DD' tarihinden sonraki günün 'YYYY-MM-DD' değeri.
+ * Backend bitişi hariç tutar (created_at < end); seçilen günün tamamı için ertesi gece yarısı gönderilir.
+ * @param {string} date
+ * @returns {string}
+ */
+function nextDay(date) {
+    const d = new Date(`${date}T00:00:00Z`);
+    d.setUTCDate(d.getUTCDate() + 1);
+    return d.toISOString().slice(0, 10);
+}
+
+/**
+ * Sistem loglarını getir (en yeniden eskiye, cursor sayfalama)
+ * @param {object} filters - { startDate, endDate, logLevel, decisionId, actorUserId, cursor, pageSize }
+ * @returns {Promise<object>} - { logs, nextCursor }
  */
 async function getLogs(filters = {}) {
     try {
-        let query = `limit=${filters.pageSize || 100}`;
-        if (filters.logLevel) query += `&event_type=${filters.logLevel}`;
-
-        const logs = await api.get(`/admin/logs?${query}`);
+        let query = `limit=${filters.pageSize || 20}`;
+        if (filters.logLevel) query += `&event_type=${encodeURIComponent(filters.logLevel)}`;
+        if (filters.decisionId) query += `&decision_id=${filters.decisionId}`;
+        if (filters.actorUserId) query += `&actor_user_id=${filters.actorUserId}`;
+        if (filters.startDate) query += `&start=${filters.startDate}T00:00:00`;
+        if (filters.endDate) query += `&end=${nextDay(filters.endDate)}T00:00:00`;
+        if (filters.cursor) query += `&cursor=${encodeURIComponent(filters.cursor)}`;
+
+        const { data, nextCursor } = await api.getPage(`/admin/logs?${query}`);
         return {
-            logs: logs.map(log => ({
+            logs: data.map(log => ({
                 id: log.id,
                 timestamp: log.created_at,
                 level: log.event_type,
@@ -341,13 +503,11 @@ async function getLogs(filters = {}) {
                 message: log.message,
                 hash: log.hash
             })),
-            total: logs.length,
-            page: 1,
-            totalPages: 1
+            nextCursor
         };
     } catch (error) {
         console.error('Get logs error:', error);
-        return { logs: [], total: 0, page: 1, totalPages: 1 };
+        return { logs: [], nextCursor: null };
     }
 }
 
@@ -58,7 +58,7 @@ async function loadDashboardStats() {
 async function loadRecentDecisions() {
     try {
         // TODO: Backend API call
-        const data = await getDecisions(10, 0);
+        const data = await getDecisions(10);
 
         const tableBody = document.getElementById('decisionsTableBody');
         if (!tableBody) return;
@@ -114,26 +114,33 @@ async function initializeAdminPanel() {
 
 /**
  * Load system logs
+ *
+ * Backend cursor sayfalama kullanır: her sayfanın başlangıç cursor'ı bir yığında tutulur,
+ * "Önceki" yığından geri alır, "Sonraki" backend'in verdiği nextCursor ile ilerler.
  */
-let currentLogsPage = 1;
 const logsPageSize = 20;
+let logsFilters = {};
+let logsCursorStack = [null];
+let logsNextCursor = null;
 
-async function loadLogs(filters = {}) {
+async function loadLogs() {
     try {
-        // TODO: Backend API call
         const data = await getLogs({
-            ...filters,
-            page: currentLogsPage,
+            ...logsFilters,
+            cursor: logsCursorStack[logsCursorStack.length - 1],
             pageSize: logsPageSize
         });
+        logsNextCursor = data.nextCursor;
 
-        updateElement('totalLogs', data.total);
-        updateElement('currentPage', data.page);
-        updateElement('totalPages', data.totalPages);
+        updateElement('totalLogs', data.logs.length);
+        updateElement('currentPage', logsCursorStack.length);
 
         const tableBody = document.getElementById('logsTableBody');
         if (!tableBody) return;
 
+        // Update pagination buttons
+        updatePaginationButtons();
+
         if (data.logs.length === 0) {
             tableBody.innerHTML = `
                 <tr class="border-b border-white/5">
@@ -158,9 +165,6 @@ async function loadLogs(filters = {}) {
             </tr>
         `).join('');
 
-        // Update pagination buttons
-        updatePaginationButtons(data.page, data.totalPages);
-
     } catch (error) {
         console.error('Error loading logs:', error);
     }
@@ -236,35 +240,38 @@ function applyFilters() {
     if (logLevel) filters.logLevel = logLevel;
     if (searchQuery) filters.search = searchQuery;
 
-    currentLogsPage = 1;
-    loadLogs(filters);
+    logsFilters = filters;
+    logsCursorStack = [null];
+    loadLogs();
 }
 
 /**
  * Pagination functions
  */
 function previousPage() {
-    if (currentLogsPage > 1) {
-        currentLogsPage--;
+    if (logsCursorStack.length > 1) {
+        logsCursorStack.pop();
         loadLogs();
     }
 }
 
 function nextPage() {
-    currentLogsPage++;
-    loadLogs();
+    if (logsNextCursor) {
+        logsCursorStack.push(logsNextCursor);
+        loadLogs();
+    }
 }
 
-function updatePaginationButtons(currentPage, totalPages) {
+function updatePaginationButtons() {
     const prevButton = document.getElementById('prevButton');
     const nextButton = document.getElementById('nextButton');
 
     if (prevButton) {
-        prevButton.disabled = currentPage <= 1;
+        prevButton.disabled = logsCursorStack.length <= 1;
     }
 
     if (nextButton) {
-        nextButton.disabled = currentPage >= totalPages;
+        nextButton.disabled = !logsNextCursor;
     }
 }
 
@@ -296,6 +303,9 @@ function setupAutoRefresh() {
     setInterval(async () => {
         const currentPage = window.location.pathname;
 
+        // Rate limit'e takıldıysak Retry-After dolana kadar bu turu atla
+        if (api.isBackingOff()) return;
+
         if (currentPage.includes('dashboard.html')) {
             await loadDashboardStats();
             await refreshCharts();
@@ -1,10 +1,16 @@
-from fairlearn.metrics import demographic_parity_difference
+from metrics.group_confusion import GroupConfusion
 
-def calc_demographic_parity(df):
+
+def calc_demographic_parity(df, fast: bool = True):
     y_true = df["approved"]
     y_pred = df["approved"]
     sensitive = df["gender"]
 
+    if fast:
+        return GroupConfusion.from_arrays(y_true, y_pred, sensitive).demographic_parity_difference()
+
+    from fairlearn.metrics import demographic_parity_difference
+
     try:
         # Eski imza (senin sürümün)
         dp = demographic_parity_difference(
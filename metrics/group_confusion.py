@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+
+class GroupConfusion:
+    """
+    Per-group binary confusion counts, computed in a single pass with np.bincount.
+
+    counts[g] = [tn, fp, fn, tp] for group g. Instances are mergeable, so partial
+    counts from chunks or worker processes can be combined with `merge`.
+    """
+
+    def __init__(self, groups: list, counts: np.ndarray):
+        self.groups = list(groups)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(len(self.groups), 4)
+
+    @classmethod
+    def empty(cls) -> "GroupConfusion":
+        return cls([], np.zeros((0, 4), dtype=np.int64))
+
+    @classmethod
+    def from_arrays(cls, y_true, y_pred, sensitive) -> "GroupConfusion":
+        """
+        Builds counts from label arrays and a sensitive feature.
+
+        Args:
+            y_true: Ground truth labels (1 = positive).
+            y_pred: Predicted labels (1 = positive).
+            sensitive: Group membership (any hashable values or a categorical Series).
+        """
+        codes, groups = _encode_groups(sensitive)
+        y_true = np.asarray(y_true) == 1
+        y_pred = np.asarray(y_pred) == 1
+
+        valid = codes >= 0
+        if not valid.all():
+            codes, y_true, y_pred = codes[valid], y_true[valid], y_pred[valid]
+
+        # cell index: group * 4 + true * 2 + pred  ->  [tn, fp, fn, tp]
+        index = codes.astype(np.int64) * 4 + y_true.astype(np.int64) * 2 + y_pred.astype(np.int64)
+        counts = np.bincount(index, minlength=len(groups) * 4)
+        return cls(groups, counts)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, target_col: str = "approved",
+                   pred_col: str = "approved", sensitive_col: str = "gender") -> "GroupConfusion":
+        return cls.from_arrays(df[target_col], df[pred_col], df[sensitive_col])
+
+    def merge(self, other: "GroupConfusion") -> "GroupConfusion":
+        """Returns a new instance with the counts of both, aligned by group value."""
+        groups = list(self.groups)
+        position = {g: i for i, g in enumerate(groups)}
+        for g in other.groups:
+            if g not in position:
+                position[g] = len(groups)
+                groups.append(g)
+
+        counts = np.zeros((len(groups), 4), dtype=np.int64)
+        counts[[position[g] for g in self.groups]] += self.counts
+        counts[[position[g] for g in other.groups]] += other.counts
+        return GroupConfusion(groups, counts)
+
+    # ---------- per-group rates ----------
+
+    def _present(self) -> np.ndarray:
+        return self.counts[self.counts.sum(axis=1) > 0]
+
+    def selection_rates(self) -> dict:
+        return self._rates(lambda c: (c[:, 1] + c[:, 3], c.sum(axis=1)))
+
+    def true_positive_rates(self) -> dict:
+        return self._rates(lambda c: (c[:, 3], c[:, 2] + c[:, 3]))
+
+    def false_positive_rates(self) -> dict:
+        return self._rates(lambda c: (c[:, 1], c[:, 0] + c[:, 1]))
+
+    def _rates(self, parts) -> dict:
+        mask = self.counts.sum(axis=1) > 0
+        num, den = parts(self.counts[mask])
+        rates = _safe_divide(num, den)
+        return {g: float(r) for g, r in zip(np.asarray(self.groups, dtype=object)[mask], rates)}
+
+    # ---------- disparity metrics ----------
+
+    def demographic_parity_difference(self) -> float:
+        """max - min selection rate across groups."""
+        c = self._present()
+        return _spread(_safe_divide(c[:, 1] + c[:, 3], c.sum(axis=1)))
+
+    def equalized_odds_difference(self) -> float:
+        """Larger of the TPR spread and the FPR spread across groups."""
+        c = self._present()
+        tpr = _safe_divide(c[:, 3], c[:, 2] + c[:, 3])
+        fpr = _safe_divide(c[:, 1], c[:, 0] + c[:, 1])
+        return max(_spread(tpr), _spread(fpr))
+
+
+def _encode_groups(sensitive):
+    if isinstance(sensitive, pd.Series) and isinstance(sensitive.dtype, pd.CategoricalDtype):
+        return sensitive.cat.codes.to_numpy(), list(sensitive.cat.categories)
+    if isinstance(sensitive, pd.Categorical):
+        return np.asarray(sensitive.codes), list(sensitive.categories)
+    codes, uniques = pd.factorize(np.asarray(sensitive, dtype=object))
+    return codes, list(uniques)
+
+
+def _safe_divide(num, den) -> np.ndarray:
+    # Payda 0 ise oran 0 kabul edilir (sklearn confusion_matrix normalize davranışı)
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def _spread(values: np.ndarray) -> float:
+    if values.size == 0:
+        return 0.0
+    return float(values.max() - values.min())
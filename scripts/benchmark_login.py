@@ -0,0 +1,70 @@
+"""
+Parola doğrulama (login'in CPU maliyeti) için throughput ölçümü.
+
+    python scripts/benchmark_login.py                      # PASSWORD_HASH_WORKERS process
+    python scripts/benchmark_login.py --logins 2000 --concurrency 64
+    python scripts/benchmark_login.py --rounds 100000      # farklı tur sayısını dene
+
+Login başına maliyet neredeyse tamamen PBKDF2 olduğundan sonuç, aynı ayarlarla
+/auth/login'in ulaşabileceği üst sınırdır. Saniyedeki login ve çekirdek başına login yazdırılır.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark password verification throughput")
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight verifications")
+    parser.add_argument("--rounds", type=int, help="override PASSWORD_HASH_ROUNDS")
+    parser.add_argument("--workers", type=int, help="override PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+
+    # security modülü ayarları import sırasında okur
+    if args.rounds:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(args.concurrency))
+
+    from app import security
+
+    stored_hash = security.hash_password("benchmark-password")
+    rejected = 0
+
+    async def worker(count: int):
+        nonlocal rejected
+        for _ in range(count):
+            try:
+                valid, _ = await security.verify_and_update_password("benchmark-password", stored_hash)
+                assert valid
+            except security.PasswordHasherBusy:
+                rejected += 1
+
+    async def run():
+        per_worker, extra = divmod(args.logins, args.concurrency)
+        await asyncio.gather(*(worker(per_worker + (i < extra)) for i in range(args.concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    security.shutdown_password_hashing()
+
+    cores = max(1, security.PASSWORD_HASH_WORKERS)
+    completed = args.logins - rejected
+    print(f"rounds:           {security.PASSWORD_HASH_ROUNDS}")
+    print(f"worker processes: {security.PASSWORD_HASH_WORKERS}")
+    print(f"logins:           {completed} ok, {rejected} rejected (429) in {elapsed:.2f}s")
+    print(f"logins/sec:       {completed / elapsed:.1f}")
+    print(f"logins/sec/core:  {completed / elapsed / cores:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Audit log hash zincirini komut satırından doğrular.
+
+    python scripts/verify_audit_log.py           # son imzalı checkpoint'ten itibaren
+    python scripts/verify_audit_log.py --full    # zincirin başından
+
+Zincir sağlamsa yeni bir checkpoint yazılır; bozuksa çıkış kodu 1'dir.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import crud
+from app.database import SessionLocal, ensure_schema
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify the decision_logs hash chain")
+    parser.add_argument("--full", action="store_true", help="verify from the first entry instead of the last checkpoint")
+    parser.add_argument("--batch-size", type=int, default=crud.AUDIT_VERIFY_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ensure_schema()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = crud.verify_audit_chain(db, full=args.full, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    print(json.dumps(result, indent=2))
+    print(f"{result['verified']} entries in {elapsed:.2f}s", file=sys.stderr)
+    return 0 if result["valid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
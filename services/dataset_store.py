@@ -0,0 +1,189 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+
+class DatasetStore:
+    """
+    Columnar binary store for registered CSV datasets.
+
+    Each dataset is converted once into a directory of memory-mapped `.npy` files
+    (one per column) with compact dtypes:
+      - sensitive / text columns -> categorical codes (int8/int16) + category list
+      - label columns            -> int8
+      - numeric features         -> float32
+    Loads read only the requested columns. The conversion is redone automatically
+    when the source CSV changes (size or mtime).
+    """
+
+    SENSITIVE_COLUMNS = ("gender",)
+    LABEL_COLUMNS = ("approved",)
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else Config.OUTPUT_DIR / "dataset_store"
+        self._sources: Dict[str, Path] = {}
+        self._meta: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: Path) -> None:
+        """Registers a CSV file under a dataset name."""
+        self._sources[name] = Path(source)
+
+    def source_path(self, name: str) -> Path:
+        if name not in self._sources:
+            raise KeyError(f"Dataset not registered: {name}")
+        return self._sources[name]
+
+    def columns(self, name: str) -> List[str]:
+        """Column names of the dataset, in source order."""
+        return list(self._ensure_converted(name)["columns"])
+
+    def load(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Loads a dataset (or a subset of its columns) from the binary store.
+
+        Args:
+            name: Registered dataset name.
+            columns: Columns to read; all columns when None.
+
+        Returns:
+            DataFrame backed by memory-mapped arrays where possible.
+        """
+        meta = self._ensure_converted(name)
+        wanted = columns if columns is not None else list(meta["columns"])
+
+        missing = [c for c in wanted if c not in meta["columns"]]
+        if missing:
+            raise ValueError(f"Input dataset is missing required columns: {missing}")
+
+        data = {}
+        dataset_dir = self.root / name
+        for col in wanted:
+            info = meta["columns"][col]
+            values = np.load(dataset_dir / f"{col}.npy", mmap_mode="r")
+            if info["kind"] == "categorical":
+                data[col] = pd.Categorical.from_codes(values, categories=info["categories"])
+            else:
+                data[col] = values
+
+        return pd.DataFrame(data, columns=wanted, copy=False)
+
+    def convert(self, name: str) -> dict:
+        """
+        Converts the registered CSV into the columnar format (overwrites existing files).
+
+        Each conversion writes into its own temporary directory and renames it into place,
+        so concurrent conversions (other workers, other processes) never share files.
+
+        Raises:
+            ValueError: If a label column contains nulls or values other than 0/1.
+        """
+        source = self.source_path(name)
+        stat = source.stat()
+        df = pd.read_csv(source)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{name}.", suffix=".tmp", dir=self.root))
+        try:
+            meta = self._write_columns(df, source, stat, tmp_dir)
+            self._swap_into_place(tmp_dir, self.root / name)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return meta
+
+    def _write_columns(self, df: pd.DataFrame, source: Path, stat: os.stat_result, tmp_dir: Path) -> dict:
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            if col in self.SENSITIVE_COLUMNS or not pd.api.types.is_numeric_dtype(series):
+                categorical = pd.Categorical(series)
+                codes = categorical.codes.astype(self._code_dtype(len(categorical.categories)))
+                np.save(tmp_dir / f"{col}.npy", codes)
+                columns[col] = {
+                    "kind": "categorical",
+                    "dtype": str(codes.dtype),
+                    "categories": [str(c) for c in categorical.categories],
+                }
+            elif col in self.LABEL_COLUMNS:
+                self._validate_labels(col, series)
+                np.save(tmp_dir / f"{col}.npy", series.to_numpy(dtype=np.int8))
+                columns[col] = {"kind": "label", "dtype": "int8"}
+            else:
+                np.save(tmp_dir / f"{col}.npy", series.to_numpy(dtype=np.float32))
+                columns[col] = {"kind": "feature", "dtype": "float32"}
+
+        meta = {
+            "source": str(source.resolve()),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "rows": len(df),
+            "columns": columns,
+        }
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump(meta, f)
+        return meta
+
+    def _swap_into_place(self, tmp_dir: Path, dataset_dir: Path) -> None:
+        """
+        Renames a finished conversion to `dataset_dir`. A directory cannot be renamed over a
+        non-empty one, so the old version is first renamed aside and removed afterwards.
+        If a concurrent conversion lands first, its (equivalent) result is kept.
+        """
+        old_dir = None
+        if dataset_dir.exists():
+            old_dir = Path(tempfile.mkdtemp(prefix=f".{dataset_dir.name}.", suffix=".old", dir=self.root))
+            try:
+                os.replace(dataset_dir, old_dir)
+            except FileNotFoundError:
+                pass  # Already moved aside by a concurrent conversion
+        try:
+            os.replace(tmp_dir, dataset_dir)
+        except OSError:
+            if not (dataset_dir / "meta.json").exists():
+                raise
+        finally:
+            if old_dir is not None:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def _validate_labels(cls, col: str, series: pd.Series) -> None:
+        """Labels are stored as int8; a plain cast would turn NaN or 2.7 into silent garbage."""
+        if series.isna().any():
+            raise ValueError(f"Label column '{col}' contains null values.")
+        if not series.isin([0, 1]).all():
+            raise ValueError(f"Label column '{col}' must contain only 0/1 values.")
+
+    def _ensure_converted(self, name: str) -> dict:
+        source = self.source_path(name)
+        stat = source.stat()
+
+        with self._lock:
+            meta = self._meta.get(name)
+            if meta is None:
+                meta_path = self.root / name / "meta.json"
+                if meta_path.exists():
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+
+            if meta is None or meta["source_size"] != stat.st_size or meta["source_mtime_ns"] != stat.st_mtime_ns:
+                meta = self.convert(name)
+
+            self._meta[name] = meta
+            return meta
+
+    @staticmethod
+    def _code_dtype(n_categories: int):
+        if n_categories < np.iinfo(np.int8).max:
+            return np.int8
+        if n_categories < np.iinfo(np.int16).max:
+            return np.int16
+        return np.int32
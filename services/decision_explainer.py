@@ -3,11 +3,14 @@ import lime.lime_tabular
 import numpy as np
 import pandas as pd
 
+from utils.telemetry import timed
+
 class DecisionExplainer:
     """
     Service for generating local explanations using LIME (Local Interpretable Model-agnostic Explanations).
     """
 
+    @timed("explain_decision")
     def explain_decision(self, model, feature_names, instance_row: pd.Series, training_data: pd.DataFrame) -> dict:
         """
         Generates a LIME explanation for a single prediction.
@@ -1,19 +1,67 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 import pandas as pd
 from metrics.demographic_parity import calc_demographic_parity
 from metrics.equalized_odds import calc_equalized_odds
-from utils.validators import validate_fairness_input
+from metrics.group_confusion import GroupConfusion
+from utils.validators import validate_fairness_input, filter_sensitive_names
+from utils.telemetry import timed
+
+FAIRNESS_COLUMNS = ["gender", "approved"]
+
+# Never fork: the API process runs threads (uvicorn, ingest queue, scheduler) whose locks
+# a forked child would inherit.
+FAIRNESS_POOL_START_METHOD = os.getenv(
+    "FAIRNESS_POOL_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def start_process_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Creates the long-lived pool used by evaluate_file(workers > 1). Call once at startup;
+    later calls return the existing pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and workers > 1:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(FAIRNESS_POOL_START_METHOD),
+            )
+        return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 class FairnessEvaluator:
     """
     Unified service for calculating fairness metrics and assessing risk.
     """
     
-    def evaluate(self, df: pd.DataFrame) -> dict:
+    @timed("fairness_evaluate")
+    def evaluate(self, df: pd.DataFrame, fast: bool = True) -> dict:
         """
         Evaluates fairness metrics for the given dataset.
         
         Args:
             df: Pandas DataFrame containing 'gender' and 'approved' columns.
+            fast: Use the in-project NumPy kernels (single pass over the data).
+                  False falls back to fairlearn.
             
         Returns:
             A dictionary containing metrics and risk assessments.
@@ -21,10 +69,61 @@ class FairnessEvaluator:
         # 1. Secure Input Validation
         validate_fairness_input(df)
         
-        # 2. Calculate Metrics using existing logic
-        dp_diff = float(calc_demographic_parity(df))
-        eo_diff = float(calc_equalized_odds(df))
-        
+        # 2. Calculate Metrics
+        if fast:
+            return self.evaluate_counts(GroupConfusion.from_frame(df))
+
+        dp_diff = float(calc_demographic_parity(df, fast=False))
+        eo_diff = float(calc_equalized_odds(df, fast=False))
+        return self._build_result(dp_diff, eo_diff)
+
+    def evaluate_file(self, path, chunksize: int = 500_000, workers: int = 1) -> dict:
+        """
+        Out-of-core evaluation of a CSV file. The file is parsed in chunks of
+        `chunksize` rows and only per-group confusion counts are kept, so peak memory
+        is bounded by the chunk size. With workers > 1 the file is split into
+        line-aligned byte ranges that are parsed and counted in parallel processes,
+        then merged. The processes come from the shared pool (start_process_pool);
+        if none was started, one is created on first use and kept.
+
+        Note: byte-range splitting assumes no quoted newlines inside fields.
+
+        Args:
+            path: CSV file containing 'gender' and 'approved' columns.
+            chunksize: Rows per parsed chunk.
+            workers: Number of processes (1 = in-process).
+
+        Returns:
+            Same structure as evaluate().
+        """
+        path = str(path)
+        columns = pd.read_csv(path, nrows=0).columns.tolist()
+        missing = [col for col in FAIRNESS_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"Input dataset is missing required columns: {filter_sensitive_names(missing)}")
+
+        ranges = _split_line_ranges(path, max(1, workers))
+        if len(ranges) == 1:
+            confusion = _count_range(path, *ranges[0], columns, chunksize)
+        else:
+            pool = start_process_pool(len(ranges))
+            futures = [pool.submit(_count_range, path, start, end, columns, chunksize) for start, end in ranges]
+            confusion = GroupConfusion.empty()
+            for future in futures:
+                confusion = confusion.merge(future.result())
+
+        return self.evaluate_counts(confusion)
+
+    def evaluate_counts(self, confusion: GroupConfusion) -> dict:
+        """
+        Builds the evaluation output from precomputed per-group confusion counts.
+        """
+        return self._build_result(
+            confusion.demographic_parity_difference(),
+            confusion.equalized_odds_difference(),
+        )
+
+    def _build_result(self, dp_diff: float, eo_diff: float) -> dict:
         # 3. Calculate Risk Levels
         dp_risk = self._calculate_risk(dp_diff)
         eo_risk = self._calculate_risk(eo_diff)
@@ -67,3 +166,67 @@ class FairnessEvaluator:
         elif "MEDIUM" in risks:
             return "MEDIUM"
         return "LOW"
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of `length` bytes of an open binary file, from its current position."""
+
+    def __init__(self, f, length: int):
+        self._f = f
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        n = self._f.readinto(view)
+        self._remaining -= n
+        return n
+
+
+def _split_line_ranges(path: str, parts: int) -> list:
+    """Splits the data section (after the header) into up to `parts` line-aligned byte ranges."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        data_start = f.tell()
+
+        bounds = [data_start]
+        step = (size - data_start) // parts
+        for i in range(1, parts):
+            f.seek(max(data_start + i * step, bounds[-1]))
+            f.readline()
+            offset = f.tell()
+            if offset >= size:
+                break
+            if offset > bounds[-1]:
+                bounds.append(offset)
+        bounds.append(size)
+
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start] or [(data_start, data_start)]
+
+
+def _count_range(path: str, start: int, end: int, columns: list, chunksize: int) -> GroupConfusion:
+    """Parses one byte range chunk by chunk and accumulates per-group confusion counts."""
+    confusion = GroupConfusion.empty()
+    if end <= start:
+        return confusion
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        reader = pd.read_csv(
+            io.BufferedReader(_RangeReader(f, end - start)),
+            header=None,
+            names=columns,
+            usecols=FAIRNESS_COLUMNS,
+            dtype={"gender": "category"},
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            validate_fairness_input(chunk)
+            confusion = confusion.merge(GroupConfusion.from_frame(chunk))
+
+    return confusion
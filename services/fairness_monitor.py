@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.fairness_evaluator import FairnessEvaluator
+
+RISK_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+
+
+class _GroupCounts:
+    """Per-group [decisions, approvals] with O(1) add/remove."""
+
+    def __init__(self):
+        self.counts: Dict[str, List[int]] = {}
+
+    def add(self, group: str, approved: int, n: int = 1):
+        entry = self.counts.setdefault(group, [0, 0])
+        entry[0] += n
+        entry[1] += approved
+
+    def remove(self, group: str, approved: int, n: int = 1):
+        entry = self.counts[group]
+        entry[0] -= n
+        entry[1] -= approved
+        if entry[0] <= 0:
+            del self.counts[group]
+
+    def rates(self, min_group_size: int) -> Dict[str, float]:
+        return {g: a / n for g, (n, a) in self.counts.items() if n >= min_group_size}
+
+
+class FairnessMonitor:
+    """
+    Online demographic parity monitor over live decisions.
+
+    Keeps per-group approval counts in two sliding windows:
+      - time window: the last `window_seconds`, kept as a ring of `buckets` sub-buckets
+        (expiry is bucket-granular, memory is bounded by buckets x groups)
+      - count window: the last `window_count` decisions
+    Each observation costs O(1) (plus O(groups) to recompute the parity difference).
+    Risk levels use FairnessEvaluator._calculate_risk thresholds.
+    """
+
+    def __init__(self, window_seconds: int = 3600, window_count: int = 1000,
+                 min_group_size: int = 30, buckets: int = 60):
+        self.window_seconds = window_seconds
+        self.window_count = window_count
+        self.min_group_size = min_group_size
+        self._evaluator = FairnessEvaluator()
+        self._lock = threading.Lock()
+
+        # time window
+        self._bucket_seconds = max(window_seconds / buckets, 1e-9)
+        self._buckets: deque = deque()  # (bucket_index, _GroupCounts)
+        self._time_counts = _GroupCounts()
+
+        # count window
+        self._recent: deque = deque()  # (group, approved)
+        self._count_counts = _GroupCounts()
+
+        self._risk = {"time": "LOW", "count": "LOW"}
+
+    def observe(self, group: Optional[str], approved: bool, timestamp: Optional[float] = None) -> List[dict]:
+        """Records a single decision. Returns alerts for windows whose risk increased."""
+        return self.observe_many([(group, approved, timestamp)])
+
+    def observe_many(self, events: Iterable[Tuple[Optional[str], bool, Optional[float]]]) -> List[dict]:
+        """
+        Records decisions as (group, approved, unix_timestamp) tuples.
+        Decisions without a group are ignored.
+
+        Returns:
+            Alerts for windows that moved into a higher MEDIUM or HIGH risk level.
+        """
+        with self._lock:
+            now = time.time()
+            for group, approved, timestamp in events:
+                if not group:
+                    continue
+                self._add_timed(group, int(bool(approved)), timestamp or now)
+                self._add_counted(group, int(bool(approved)))
+
+            self._expire(now)
+            return self._check_transitions()
+
+    def snapshot(self) -> dict:
+        """Current demographic parity and risk level for both windows."""
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "time_window": self._window_state("time"),
+                "count_window": self._window_state("count"),
+            }
+
+    # ---------- windows ----------
+
+    def _add_timed(self, group: str, approved: int, timestamp: float):
+        index = int(timestamp // self._bucket_seconds)
+        if self._buckets and self._buckets[-1][0] == index:
+            bucket = self._buckets[-1][1]
+        elif not self._buckets or index > self._buckets[-1][0]:
+            bucket = _GroupCounts()
+            self._buckets.append((index, bucket))
+        else:
+            # Geç gelen (out-of-order) olay: en yeni bucket'a yazılır
+            bucket = self._buckets[-1][1]
+        bucket.add(group, approved)
+        self._time_counts.add(group, approved)
+
+    def _add_counted(self, group: str, approved: int):
+        self._recent.append((group, approved))
+        self._count_counts.add(group, approved)
+        if len(self._recent) > self.window_count:
+            old_group, old_approved = self._recent.popleft()
+            self._count_counts.remove(old_group, old_approved)
+
+    def _expire(self, now: float):
+        oldest = int((now - self.window_seconds) // self._bucket_seconds)
+        while self._buckets and self._buckets[0][0] <= oldest:
+            _, bucket = self._buckets.popleft()
+            for group, (n, approved) in bucket.counts.items():
+                self._time_counts.remove(group, approved, n)
+
+    # ---------- risk ----------
+
+    def _window_state(self, window: str) -> dict:
+        counts = self._time_counts if window == "time" else self._count_counts
+        rates = counts.rates(self.min_group_size)
+        dp = (max(rates.values()) - min(rates.values())) if len(rates) >= 2 else 0.0
+        state = {
+            "demographic_parity_difference": round(dp, 4),
+            "risk_level": self._evaluator._calculate_risk(dp),
+            "approval_rates": {g: round(r, 4) for g, r in rates.items()},
+            "decisions": sum(n for n, _ in counts.counts.values()),
+        }
+        if window == "time":
+            state["window_seconds"] = self.window_seconds
+        else:
+            state["window_count"] = self.window_count
+        return state
+
+    def _check_transitions(self) -> List[dict]:
+        alerts = []
+        for window in ("time", "count"):
+            state = self._window_state(window)
+            previous = self._risk[window]
+            current = state["risk_level"]
+            self._risk[window] = current
+            if RISK_ORDER[current] > RISK_ORDER[previous] and current in ("MEDIUM", "HIGH"):
+                alerts.append({"window": window, **state})
+        return alerts
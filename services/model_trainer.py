@@ -4,12 +4,15 @@ from sklearn.preprocessing import StandardScaler
 import pandas as pd
 import numpy as np
 
+from utils.telemetry import timed
+
 class ModelTrainer:
     """
     Trains a baseline model (Logistic Regression) on non-sensitive features
     to demonstrate explainability (LIME).
     """
 
+    @timed("model_train")
     def train(self, df: pd.DataFrame, target_col: str, drop_cols: list) -> tuple:
         """
         Trains a logistic regression model.
@@ -42,3 +45,21 @@ class ModelTrainer:
         model.fit(X_train, y_train)
 
         return model, feature_names, X_train
+
+    def train_from_store(self, store, dataset_name: str, target_col: str, drop_cols: list) -> tuple:
+        """
+        Trains on a dataset from the columnar DatasetStore, reading only the
+        feature and target columns (dropped columns are never loaded).
+
+        Args:
+            store: DatasetStore with the dataset registered.
+            dataset_name: Registered dataset name (e.g. 'balanced').
+            target_col: Name of the target column.
+            drop_cols: Columns to exclude from features.
+
+        Returns:
+            (trained_model, feature_names, X_train_original)
+        """
+        feature_cols = [c for c in store.columns(dataset_name) if c not in drop_cols and c != target_col]
+        df = store.load(dataset_name, columns=feature_cols + [target_col])
+        return self.train(df, target_col=target_col, drop_cols=drop_cols)
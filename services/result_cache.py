@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class DatasetResultCache:
+    """
+    LRU cache for results computed from a dataset file (e.g. fairness evaluation).
+
+    Entries are keyed on the dataset fingerprint (resolved path, size, mtime and
+    SHA-256 of the content), so any change to the file yields a new key. Concurrent
+    requests for the same key are coalesced: only the first caller computes, the
+    others wait for its result (single-flight).
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self._inflight: dict = {}
+        # (path, size, mtime_ns) -> sha256, so the content is only re-hashed when stat changes
+        self._digests: dict = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, path) -> tuple:
+        """
+        Returns (resolved_path, size, mtime_ns, sha256) for the dataset file.
+        """
+        resolved = str(Path(path).resolve())
+        st = os.stat(resolved)
+        stat_key = (resolved, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = self._hash_file(resolved)
+            with self._lock:
+                # Keep only the latest digest per path
+                for key in [k for k in self._digests if k[0] == resolved]:
+                    del self._digests[key]
+                self._digests[stat_key] = digest
+
+        return stat_key + (digest,)
+
+    def get_or_compute(self, path, compute: Callable[[], object], namespace: str = "default"):
+        """
+        Returns the cached result for the dataset at `path`, computing it with
+        `compute()` on a miss. Identical concurrent misses share one computation.
+
+        Args:
+            path: Dataset file path.
+            compute: Zero-argument callable producing the result.
+            namespace: Separates different computations over the same file.
+        """
+        key = (namespace,) + self.fingerprint(path)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+
+        return result
+
+    def invalidate(self, path: Optional[str] = None) -> int:
+        """
+        Drops cached results for `path`, or everything when no path is given.
+
+        Returns:
+            Number of removed entries.
+        """
+        with self._lock:
+            if path is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._digests.clear()
+                return removed
+
+            resolved = str(Path(path).resolve())
+            keys = [k for k in self._entries if k[1] == resolved]
+            for key in keys:
+                del self._entries[key]
+            for key in [k for k in self._digests if k[0] == resolved]:
+                del self._digests[key]
+            return len(keys)
+
+    @staticmethod
+    def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
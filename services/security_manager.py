@@ -1,13 +1,124 @@
+import atexit
 import hashlib
 import jwt
 import logging
+import queue
 import re
 import html
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import os
 
+from config import Config
+from utils.rate_limiter import MemoryRateLimitBackend, RateLimiter, SQLiteRateLimitBackend
+from utils.telemetry import REGISTRY
+
+AUDIT_LOG_FILE = os.getenv('AUDIT_LOG_FILE', 'logs/security_audit.log')
+AUDIT_LOG_MAX_BYTES = int(os.getenv('AUDIT_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+AUDIT_LOG_BACKUP_COUNT = int(os.getenv('AUDIT_LOG_BACKUP_COUNT', '5'))
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', '10000'))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', '256'))
+AUDIT_LOG_BUFFER_SIZE = int(os.getenv('AUDIT_LOG_BUFFER_SIZE', '1000'))
+
+AUDIT_RECORDS_DROPPED = REGISTRY.counter(
+    "security_audit_records_dropped_total", "Audit log records dropped because the writer queue was full"
+)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped and counted."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            AUDIT_RECORDS_DROPPED.inc()
+
+
+class _BatchingRotatingFileHandler(RotatingFileHandler):
+    """Size-rotated file handler that flushes once per batch instead of once per record."""
+
+    _batching = False
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        self.acquire()
+        try:
+            self._batching = True
+            for record in records:
+                self.emit(record)
+        finally:
+            self._batching = False
+            try:
+                self.flush()
+            finally:
+                self.release()
+
+    def flush(self):
+        if not self._batching:
+            super().flush()
+
+
+class _AuditLogWriter(threading.Thread):
+    """Background thread draining the audit queue into the file in batches."""
+
+    _STOP = object()
+
+    def __init__(self, records: queue.Queue, handler: _BatchingRotatingFileHandler):
+        super().__init__(name="security-audit-writer", daemon=True)
+        self.records = records
+        self.handler = handler
+
+    def run(self):
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < AUDIT_LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is self._STOP for record in batch)
+            self.handler.emit_batch([record for record in batch if record is not self._STOP])
+            if stop:
+                return
+
+    def stop(self):
+        # Blocking put: the sentinel must not be dropped, and pending records are written first
+        self.records.put(self._STOP)
+        self.join(timeout=5)
+        self.handler.close()
+
+
+_audit_logger_lock = threading.Lock()
+
+
+def _get_audit_logger() -> logging.Logger:
+    """
+    Returns the module logger wired to the background writer (set up once per process).
+    Request threads only enqueue records; file I/O and rotation happen on the writer thread.
+    """
+    logger = logging.getLogger(__name__)
+    with _audit_logger_lock:
+        if not any(isinstance(h, _DroppingQueueHandler) for h in logger.handlers):
+            Path(AUDIT_LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = _BatchingRotatingFileHandler(
+                AUDIT_LOG_FILE, maxBytes=AUDIT_LOG_MAX_BYTES, backupCount=AUDIT_LOG_BACKUP_COUNT, delay=True
+            )
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+            records: queue.Queue = queue.Queue(maxsize=AUDIT_LOG_QUEUE_SIZE)
+            writer = _AuditLogWriter(records, file_handler)
+            writer.start()
+            atexit.register(writer.stop)
+
+            logger.addHandler(_DroppingQueueHandler(records))
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
 
 class SecurityException(Exception):
     """Custom exception for security violations."""
@@ -17,20 +128,25 @@ class SecurityException(Exception):
 class SecurityManager:
     """13 Security Rules Implementation"""
     
+    # Keys share the API's rate limit file; the prefix keeps them apart from its user:/ip: keys
+    RATE_LIMIT_KEY_PREFIX = "security-manager:"
+
     def __init__(self, secret_key: str = None):
         # Environment variable'dan secret key al
         self.secret_key = secret_key or os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-me')
-        self.rate_limit_store: Dict[str, list] = {}
-        self.audit_log = []
-        
-        # Configure secure logging
-        Path('logs').mkdir(exist_ok=True)
-        logging.basicConfig(
-            filename='logs/security_audit.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        # Sliding-window counter: O(1) per call, idle users are evicted. The SQLite file is shared
+        # by every worker process, so the limit holds across workers (in-memory if no path is set).
+        self.rate_limiter = RateLimiter(
+            limit=100,
+            window=3600,
+            backend=(SQLiteRateLimitBackend(Config.RATE_LIMIT_DB_PATH) if Config.RATE_LIMIT_DB_PATH
+                     else MemoryRateLimitBackend()),
         )
-        self.logger = logging.getLogger(__name__)
+        # Ring buffer: memory stays flat, get_audit_logs returns the most recent entries
+        self.audit_log: deque = deque(maxlen=AUDIT_LOG_BUFFER_SIZE)
+        
+        # Configure secure logging (non-blocking, batched and size-rotated)
+        self.logger = _get_audit_logger()
 
     def generate_token(self, user_id: str, role: str = "user") -> str:
         """
@@ -70,7 +186,8 @@ class SecurityManager:
         """
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
-            self.logger.info(f"Token validated for user: {payload.get('user_id')}")
+            # Hot path: DEBUG and lazily formatted, so it costs nothing at the default INFO level
+            self.logger.debug("Token validated for user: %s", payload.get('user_id'))
             return payload
         except jwt.ExpiredSignatureError:
             self.logger.warning("Token validation failed: Token expired")
@@ -134,27 +251,12 @@ class SecurityManager:
         Raises:
             SecurityException: If rate limit exceeded
         """
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=window_seconds)
-        
-        # Initialize user's request history if not exists
-        if user_id not in self.rate_limit_store:
-            self.rate_limit_store[user_id] = []
-        
-        # Clean old entries outside the window
-        self.rate_limit_store[user_id] = [
-            ts for ts in self.rate_limit_store[user_id] 
-            if ts > window_start
-        ]
-        
-        # Check if limit exceeded
-        if len(self.rate_limit_store[user_id]) >= max_requests:
+        allowed, _ = self.rate_limiter.hit(f"{self.RATE_LIMIT_KEY_PREFIX}{user_id}",
+                                           limit=max_requests, window=window_seconds)
+        if not allowed:
             self.logger.warning(f"Rate limit exceeded for user: {user_id}")
             raise SecurityException(f"Rate limit exceeded. Max {max_requests} requests per {window_seconds} seconds.")
         
-        # Record this request
-        self.rate_limit_store[user_id].append(now)
-        
         return True
 
     def log_audit_event(self, event_type: str, user_id: str, details: str) -> Dict[str, Any]:
@@ -192,4 +294,5 @@ class SecurityManager:
         Returns:
             List of audit log entries
         """
-        return self.audit_log[-limit:]
\ No newline at end of file
+        # copy() is atomic, iterating the live deque could race with concurrent appends
+        return list(self.audit_log.copy())[-limit:]
\ No newline at end of file
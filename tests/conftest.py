@@ -0,0 +1,65 @@
+# tests/conftest.py
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Uygulama modülleri ayarları import sırasında okur: test veritabanı ve çıktı dosyaları geçici dizinde
+_TMP_DIR = Path(tempfile.mkdtemp(prefix="dem-tests-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR / 'test.db'}")
+os.environ.setdefault("RATE_LIMIT_DB_PATH", str(_TMP_DIR / "rate_limits.sqlite3"))
+os.environ.setdefault("AUDIT_LOG_FILE", str(_TMP_DIR / "security_audit.log"))
+os.environ.setdefault("LOG_ARCHIVE_DIR", str(_TMP_DIR / "log_archive"))
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "1000")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+# Rate limit testleri kendi limitlerini kurar; diğer testler limite takılmasın
+os.environ.setdefault("RATE_LIMIT_MAX", "1000000")
+
+
+@pytest.fixture
+def db():
+    """Boş şemalı sync session; her test temiz tablolarla başlar."""
+    from app import models  # noqa: F401  (tabloları metadata'ya kaydeder)
+    from app.database import Base, SessionLocal, engine, ensure_schema
+
+    Base.metadata.drop_all(bind=engine)
+    ensure_schema(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """Startup/shutdown olaylarıyla birlikte çalışan API istemcisi."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user(username, role="viewer", password="secret123") -> models.User"""
+    from app import crud, schemas
+
+    def _make(username: str, role: str = "viewer", password: str = "secret123"):
+        return crud.create_user(db, schemas.UserCreate(
+            username=username, email=f"{username}@example.com", password=password, role=role,
+        ))
+
+    return _make
+
+
+def login(client, username: str, password: str = "secret123") -> dict:
+    response = client.post("/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def auth_header(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
@@ -0,0 +1,64 @@
+# tests/test_audit_chain.py
+from app import crud, models
+
+
+def _append(db, count, start=0):
+    crud.append_decision_logs(db, [
+        {"event_type": "NOTE", "message": f"entry {start + i}"} for i in range(count)
+    ])
+    db.commit()
+
+
+def test_verify_writes_checkpoint_and_resumes_from_it(db):
+    """Test incremental verification starts at the last checkpoint instead of the genesis"""
+    _append(db, 5)
+    first = crud.verify_audit_chain(db)
+    assert first["valid"] and first["from_seq"] == 0 and first["checkpoint_seq"] == 5
+
+    _append(db, 3, start=5)
+    second = crud.verify_audit_chain(db)
+    assert second["valid"]
+    assert (second["from_seq"], second["to_seq"], second["verified"]) == (5, 8, 3)
+
+    # Rows behind the checkpoint are not re-read incrementally; a full pass still checks them
+    db.query(models.DecisionLog).filter_by(chain_seq=2).update({"message": "edited"})
+    db.commit()
+    assert crud.verify_audit_chain(db)["valid"]
+    full = crud.verify_audit_chain(db, full=True)
+    assert not full["valid"] and "chain_seq 2" in full["error"]
+
+
+def test_verify_detects_modified_row(db):
+    """Test editing a logged message breaks the content hash"""
+    _append(db, 4)
+    db.query(models.DecisionLog).filter_by(chain_seq=3).update({"message": "rewritten"})
+    db.commit()
+
+    result = crud.verify_audit_chain(db)
+    assert not result["valid"]
+    assert result["error"] == "Content hash mismatch at chain_seq 3"
+    assert result["checkpoint_seq"] is None
+
+
+def test_verify_detects_deleted_tail(db):
+    """Test deleting the newest entries is caught through the chain head"""
+    _append(db, 4)
+    db.query(models.DecisionLog).filter(models.DecisionLog.chain_seq > 2).delete()
+    db.commit()
+
+    result = crud.verify_audit_chain(db)
+    assert not result["valid"]
+    assert result["error"] == "Chain head expects 4 entries, found 2"
+
+
+def test_verify_rejects_forged_checkpoint(db):
+    """Test a checkpoint without a valid HMAC signature fails verification"""
+    _append(db, 4)
+    db.query(models.DecisionLog).filter_by(chain_seq=4).update({"message": "rewritten"})
+    # An attacker without the checkpoint key cannot sign a checkpoint that skips the edited row
+    db.add(models.AuditCheckpoint(chain_seq=4, last_hash="f" * 64, signature="0" * 64))
+    db.commit()
+
+    result = crud.verify_audit_chain(db)
+    assert not result["valid"]
+    assert result["error"] == "Checkpoint at chain_seq 4 has an invalid signature"
@@ -0,0 +1,194 @@
+# tests/test_auth.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import pytest
+from passlib.hash import pbkdf2_sha256
+
+from app import crud, models, security
+from app.cache import TTLCache
+from app.database import SessionLocal
+from tests.conftest import auth_header, login
+
+
+def test_refresh_rotates_token(client, make_user):
+    """Test /auth/refresh returns a new token pair and consumes the old refresh token"""
+    make_user("alice")
+    tokens = login(client, "alice")
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/users/me", headers=auth_header(rotated)).json()["username"] == "alice"
+
+    # The rotated token keeps working
+    assert client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 200
+
+
+def test_reuse_after_grace_revokes_family(db, make_user):
+    """Test replaying a rotated token outside the grace window revokes the whole session"""
+    user = make_user("bob")
+    token, _ = crud.issue_refresh_token(db, user.id)
+    db.commit()
+    _, child = crud.rotate_refresh_token(db, token)
+
+    db.query(models.RefreshToken).filter(models.RefreshToken.replaced_by_id.is_not(None)).update(
+        {"revoked_at": datetime.utcnow() - timedelta(minutes=5)}
+    )
+    db.commit()
+
+    with pytest.raises(ValueError, match="reuse"):
+        crud.rotate_refresh_token(db, token)
+    with pytest.raises(ValueError):
+        crud.rotate_refresh_token(db, child)
+    assert db.query(models.RefreshToken).filter(models.RefreshToken.revoked_at.is_(None)).count() == 0
+
+
+def test_concurrent_refresh_within_grace(db, make_user):
+    """Test two tabs refreshing with the same token both succeed without revoking the session"""
+    user = make_user("carol")
+    token, _ = crud.issue_refresh_token(db, user.id)
+    db.commit()
+
+    results, errors = [], []
+
+    def refresh():
+        session = SessionLocal()
+        try:
+            results.append(crud.rotate_refresh_token(session, token)[1])
+        except ValueError as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=refresh) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(set(results)) == 2
+    session = SessionLocal()
+    try:
+        for new_token in results:
+            crud.rotate_refresh_token(session, new_token)
+    finally:
+        session.close()
+
+
+def test_expired_refresh_token_rejected(db, make_user):
+    """Test an expired refresh token cannot be rotated"""
+    user = make_user("dave")
+    token, row = crud.issue_refresh_token(db, user.id)
+    row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    with pytest.raises(ValueError, match="expired"):
+        crud.rotate_refresh_token(db, token)
+
+
+def test_logout_revokes_family(client, make_user):
+    """Test /auth/logout invalidates every refresh token of the session"""
+    make_user("erin")
+    tokens = login(client, "erin")
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    assert client.post("/auth/logout", json={"refresh_token": rotated["refresh_token"]}).status_code == 200
+    response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_login_returns_429_when_hashing_is_saturated(client, make_user, monkeypatch):
+    """Test login fails fast with 429 instead of queueing when no hash slot is free"""
+    make_user("frank")
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(security, "_hash_slots", slots)
+
+    response = client.post("/auth/login", data={"username": "frank", "password": "secret123"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_weak_password_hash(client, db, make_user):
+    """Test a hash below PASSWORD_HASH_ROUNDS is upgraded on successful login"""
+    user = make_user("grace")
+    user.password_hash = pbkdf2_sha256.using(rounds=security.PASSWORD_HASH_ROUNDS // 2).hash("secret123")
+    db.commit()
+
+    login(client, "grace")
+    db.refresh(user)
+    assert f"${security.PASSWORD_HASH_ROUNDS}$" in user.password_hash
+    assert security.verify_password("secret123", user.password_hash)
+
+
+class BrokenPool(ThreadPoolExecutor):
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+
+def test_broken_hash_pool_is_rebuilt(client, make_user, monkeypatch):
+    """Test a dead hashing pool is replaced and the job retried once"""
+    make_user("heidi")
+    broken = BrokenPool()
+    monkeypatch.setattr(security, "_hash_pool", broken)
+    login(client, "heidi")
+    assert security._hash_pool is not broken
+
+    monkeypatch.setattr(security, "_hash_pool", BrokenPool())
+    assert security.verify_password("x", security.hash_password("x"))
+
+
+def test_cached_token_not_served_after_expiry():
+    """Test a verified token stays cached only until its exp claim"""
+    token = security.create_access_token({"sub": "ivan", "id": 42}, expires_delta=timedelta(seconds=1))
+    assert security.decode_access_token(token)["sub"] == "ivan"
+    assert security._token_cache.get(token) is not None
+
+    exp = security.decode_access_token(token)["exp"]
+    time.sleep(max(exp - time.time(), 0) + 0.05)
+    assert security._token_cache.get(token) is None
+    # python-jose compares exp in whole seconds; past that second the token is rejected
+    time.sleep(max(exp + 1 - time.time(), 0) + 0.05)
+    assert security.decode_access_token(token) is None
+    assert security._token_cache.get(token) is None
+
+    expired = security.create_access_token({"sub": "ivan", "id": 42}, expires_delta=timedelta(seconds=-1))
+    assert security.decode_access_token(expired) is None
+    assert security._token_cache.get(expired) is None
+
+
+def test_auth_caches_stay_bounded(monkeypatch):
+    """Test the token and principal caches never grow past their size limit"""
+    monkeypatch.setattr(security, "_token_cache", TTLCache(max_entries=3, ttl_seconds=60))
+    monkeypatch.setattr(security, "_principal_cache", TTLCache(max_entries=3, ttl_seconds=60))
+
+    tokens = [security.create_access_token({"sub": f"user{i}", "id": i}) for i in range(10)]
+    for i, token in enumerate(tokens):
+        assert security.decode_access_token(token)["id"] == i
+        security.cache_principal(i, {"id": i})
+    assert len(security._token_cache) == 3
+    assert len(security._principal_cache) == 3
+    # Least recently used entries went first
+    assert security.get_cached_principal(0) is None and security.get_cached_principal(9) == {"id": 9}
+
+
+def test_role_change_invalidates_cached_principal(client, make_user):
+    """Test /users/me does not serve a cached principal after the user's role changes"""
+    make_user("judy", role="admin")
+    user = make_user("kim")
+    admin = auth_header(login(client, "judy"))
+    headers = auth_header(login(client, "kim"))
+
+    assert client.get("/users/me", headers=headers).json()["role"] == "viewer"
+    assert security.get_cached_principal(user.id) is not None
+
+    response = client.patch(f"/users/{user.id}/role", json={"role": "analyst"}, headers=admin)
+    assert response.status_code == 200
+    assert security.get_cached_principal(user.id) is None
+    assert client.get("/users/me", headers=headers).json()["role"] == "analyst"
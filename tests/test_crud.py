@@ -0,0 +1,175 @@
+# tests/test_crud.py
+from app import crud, models, schemas
+from app.security import blind_index
+
+
+def _decisions(*groups):
+    return [
+        schemas.AIDecisionCreate(decision_label="APPROVED", score=0.8, sensitive_attribute=group)
+        for group in groups
+    ]
+
+
+def _user(db):
+    user = models.User(username="tester", email="tester@example.com", password_hash="x", role="admin")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_rollup_groups_keyed_by_blind_index(db):
+    """Test rollups never store sensitive values in the clear and resolve labels at read time"""
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female", "female", "male"), user.id)
+
+    group_keys = {r.key for r in db.query(models.DecisionRollup).filter_by(dimension="group")}
+    assert group_keys == {blind_index("female"), blind_index("male")}
+
+    bucket = db.query(models.DecisionRollup).filter_by(granularity="day").first().bucket_start
+    series = crud.get_rollup_timeseries(db, "day", bucket, bucket.replace(year=bucket.year + 1))
+    assert series[0]["groups"] == {"female": 2, "male": 1}
+
+
+def test_reconcile_rollups_fixes_drift(db):
+    """Test reconcile corrects drifted, missing and stale rollup rows"""
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female", "male"), user.id)
+    assert crud.reconcile_rollups(db) == 0
+
+    db.query(models.DecisionRollup).filter_by(dimension="label").update({"count": 99})
+    db.query(models.DecisionRollup).filter_by(dimension="score_bin", granularity="hour").delete()
+    first = db.query(models.DecisionRollup).first()
+    db.add(models.DecisionRollup(granularity="day", bucket_start=first.bucket_start.replace(year=2000),
+                                 dimension="label", key="APPROVED", count=5, score_sum=4.0))
+    db.commit()
+
+    assert crud.reconcile_rollups(db) == 4
+    assert crud.reconcile_rollups(db) == 0
+    labels = db.query(models.DecisionRollup).filter_by(dimension="label").all()
+    assert sorted(r.count for r in labels) == [2, 2]
+
+
+def test_listed_decisions_decrypt_their_own_ciphertext(db):
+    """Test rows sharing a blind index are not served each other's plaintext"""
+    user = _user(db)
+    ids = crud.create_ai_decisions_bulk(db, _decisions("Male", "male"), user.id)
+    decisions, _ = crud.list_ai_decisions(db, limit=10)
+    assert {d.id: d.sensitive_attribute for d in decisions} == {ids[0]: "Male", ids[1]: "male"}
+
+    db.query(models.AIDecision).filter_by(id=ids[1]).update({"sensitive_attribute": "corrupted-token"})
+    db.commit()
+    assert crud.get_ai_decision(db, ids[1]).sensitive_attribute == "[Encrypted Data]"
+
+
+def test_group_labels_come_from_group_dictionary(db):
+    """Test group names resolve from sensitive_groups without scanning ai_decisions"""
+    from sqlalchemy import event
+
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female", "male"), user.id)
+    crud.create_ai_decision(db, _decisions("nonbinary")[0], user.id)
+    assert {g.bidx for g in db.query(models.SensitiveGroup)} == {
+        blind_index("female"), blind_index("male"), blind_index("nonbinary")
+    }
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, sql, *args: statements.append(sql)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        bucket = db.query(models.DecisionRollup).filter_by(granularity="day").first().bucket_start
+        series = crud.get_rollup_timeseries(db, "day", bucket, bucket.replace(year=bucket.year + 1))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert series[0]["groups"] == {"female": 1, "male": 1, "nonbinary": 1}
+    assert not [sql for sql in statements if "ai_decisions" in sql]
+
+
+def test_rebuild_backfills_group_dictionary(db):
+    """Test a missing dictionary entry forces a rollup rebuild that restores it"""
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female"), user.id)
+    db.query(models.SensitiveGroup).delete()
+    db.commit()
+
+    assert not crud.rollups_initialized(db)
+    crud.rebuild_rollups(db)
+    assert crud.rollups_initialized(db)
+    assert [g["group"] for g in crud.get_group_label_counts(db)] == ["female"]
+
+
+def _insert_concurrently(label):
+    """Inserts one decision from another session and thread; returns the thread after join"""
+    import threading
+
+    from app.database import SessionLocal
+
+    def insert():
+        session = SessionLocal()
+        try:
+            user_id = session.query(models.User.id).scalar()
+            crud.create_ai_decision(session, schemas.AIDecisionCreate(
+                decision_label=label, score=0.5, sensitive_attribute="female"), user_id)
+        finally:
+            session.close()
+
+    thread = threading.Thread(target=insert)
+    thread.start()
+    thread.join(timeout=10)
+    return thread
+
+
+def test_reconcile_rollups_does_not_block_or_lose_concurrent_insert(db, monkeypatch):
+    """Test an insert committed between the reconcile snapshot and its apply phase is kept"""
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female", "male"), user.id)
+    db.query(models.DecisionRollup).filter_by(dimension="label").update({"count": 99})
+    db.commit()
+
+    snapshot = crud._rollup_snapshot
+    inserted = []
+
+    def racing_snapshot(session, batch_size):
+        result = snapshot(session, batch_size)
+        inserted.append(_insert_concurrently("APPROVED"))
+        return result
+
+    monkeypatch.setattr(crud, "_rollup_snapshot", racing_snapshot)
+    crud.reconcile_rollups(db)
+    assert not inserted[0].is_alive()
+
+    monkeypatch.setattr(crud, "_rollup_snapshot", snapshot)
+    crud.reconcile_rollups(db)
+    assert crud.reconcile_rollups(db) == 0
+    db.expire_all()
+    labels = db.query(models.DecisionRollup).filter_by(dimension="label", key="APPROVED").all()
+    assert [r.count for r in labels] == [3, 3]
+
+
+def test_reconcile_label_counts_does_not_block_or_lose_concurrent_insert(db, monkeypatch):
+    """Test label reconcile fixes drift without overwriting a counter bumped during the scan"""
+    user = _user(db)
+    crud.create_ai_decisions_bulk(db, _decisions("female", "male"), user.id)
+    crud.create_ai_decision(db, schemas.AIDecisionCreate(
+        decision_label="REJECTED", score=0.2, sensitive_attribute="male"), user.id)
+    db.query(models.DecisionLabelCount).update({"count": 50})
+    db.commit()
+
+    snapshot = crud._label_count_snapshot
+    inserted = []
+
+    def racing_snapshot(session):
+        result = snapshot(session)
+        inserted.append(_insert_concurrently("APPROVED"))
+        return result
+
+    monkeypatch.setattr(crud, "_label_count_snapshot", racing_snapshot)
+    # REJECTED is fixed; APPROVED changed after the snapshot, so it is left for the next run
+    assert crud.reconcile_label_counts(db) == {"REJECTED": -49}
+    assert not inserted[0].is_alive()
+
+    monkeypatch.setattr(crud, "_label_count_snapshot", snapshot)
+    assert crud.reconcile_label_counts(db) == {"APPROVED": -48}
+    db.expire_all()
+    assert {r.label: r.count for r in db.query(models.DecisionLabelCount)} == {"APPROVED": 3, "REJECTED": 1}
@@ -0,0 +1,42 @@
+# tests/test_database.py
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import models  # noqa: F401  (registers the tables)
+from app.database import SchemaMigrationRequired, ensure_schema
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    ensure_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def _columns(engine, table):
+    return {col["name"]: col for col in inspect(engine).get_columns(table)}
+
+
+def test_missing_columns_are_added(engine):
+    """Test nullable columns and NOT NULL columns with a constant default are re-added"""
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO audit_chain_head (id, entry_count) VALUES (1, 7)"))
+        conn.execute(text("ALTER TABLE audit_chain_head DROP COLUMN entry_count"))
+        conn.execute(text("ALTER TABLE refresh_tokens DROP COLUMN revoked_at"))
+
+    ensure_schema(engine)
+
+    assert "revoked_at" in _columns(engine, "refresh_tokens")
+    assert not _columns(engine, "audit_chain_head")["entry_count"]["nullable"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT entry_count FROM audit_chain_head")).scalar() == 0
+
+
+def test_missing_not_null_column_without_default_fails_loudly(engine):
+    """Test a NOT NULL column that cannot be backfilled stops startup instead of being skipped"""
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE decision_log_archives DROP COLUMN sha256"))
+
+    with pytest.raises(SchemaMigrationRequired, match="decision_log_archives.sha256"):
+        ensure_schema(engine)
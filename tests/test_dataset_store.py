@@ -0,0 +1,58 @@
+# tests/test_dataset_store.py
+import threading
+
+import pandas as pd
+import pytest
+
+from services.dataset_store import DatasetStore
+
+
+def _store(tmp_path, csv: str):
+    source = tmp_path / "data.csv"
+    source.write_text(csv)
+    store = DatasetStore(root=tmp_path / "store")
+    store.register("data", source)
+    return store
+
+
+def test_concurrent_conversions_do_not_share_files(tmp_path):
+    """Test parallel conversions of one dataset each use their own temp dir and leave one result"""
+    rows = "\n".join(f"{'male' if i % 2 else 'female'},{i % 2},{i * 0.5}" for i in range(2000))
+    store = _store(tmp_path, "gender,approved,income\n" + rows + "\n")
+
+    errors = []
+
+    def convert():
+        try:
+            store.convert("data")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=convert) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert [p.name for p in (tmp_path / "store").iterdir()] == ["data"]
+    df = store.load("data")
+    assert len(df) == 2000 and df["approved"].sum() == 1000
+
+
+@pytest.mark.parametrize("labels, message", [("1\n\n0", "null"), ("1\n2\n0", "0/1"), ("1\n0.5\n0", "0/1")])
+def test_invalid_labels_are_rejected(tmp_path, labels, message):
+    """Test labels are validated before the int8 cast instead of being silently truncated"""
+    values = labels.split("\n")
+    csv = "gender,approved\n" + "\n".join(f"male,{v}" for v in values) + "\n"
+    store = _store(tmp_path, csv)
+
+    with pytest.raises(ValueError, match=message):
+        store.load("data")
+    assert not any((tmp_path / "store").iterdir())
+
+
+def test_binary_float_labels_are_accepted(tmp_path):
+    """Test 0.0/1.0 labels (e.g. written by pandas) still convert"""
+    store = _store(tmp_path, "gender,approved\nmale,1.0\nfemale,0.0\n")
+    assert pd.Series(store.load("data")["approved"]).tolist() == [1, 0]
@@ -0,0 +1,220 @@
+# tests/test_decisions_api.py
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app import crud, models, schemas
+from app.ingest_queue import STATUS_COMMITTED
+from tests.conftest import auth_header, login
+
+
+@pytest.fixture
+def decrypt_threads(monkeypatch):
+    """Records whether each decrypt_many call ran on the event loop"""
+    calls = []
+    original = crud.decrypt_many
+
+    def recording(tokens):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event-loop")
+        except RuntimeError:
+            calls.append("worker")
+        return original(tokens)
+
+    monkeypatch.setattr(crud, "decrypt_many", recording)
+    return calls
+
+
+@pytest.fixture
+def analyst(client, db, make_user):
+    user = make_user("analyst1", role="analyst")
+    crud.create_ai_decisions_bulk(db, [
+        schemas.AIDecisionCreate(decision_label=label, score=0.7, sensitive_attribute=group)
+        for label, group in [("APPROVED", "female"), ("REJECTED", "female"), ("APPROVED", "male")]
+    ], user.id)
+    return auth_header(login(client, "analyst1"))
+
+
+def test_list_and_read_decisions_decrypt_off_the_event_loop(client, analyst, decrypt_threads):
+    """Test /decisions and /decisions/{id} return plaintext decrypted in the thread pool"""
+    response = client.get("/decisions", params={"limit": 2}, headers=analyst)
+    assert response.status_code == 200
+    page = response.json()
+    assert [d["sensitive_attribute"] for d in page] == ["male", "female"]
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get(f"/decisions/{page[0]['id']}", headers=analyst)
+    assert response.status_code == 200
+    assert response.json()["sensitive_attribute"] == "male"
+    assert client.get("/decisions/999999", headers=analyst).status_code == 404
+
+    assert decrypt_threads and set(decrypt_threads) == {"worker"}
+
+
+def test_group_stats_decrypt_off_the_event_loop(client, db, analyst, decrypt_threads):
+    """Test /stats/groups labels groups with plaintext decrypted in the thread pool"""
+    response = client.get("/stats/groups", headers=analyst)
+    assert response.status_code == 200
+    assert decrypt_threads and set(decrypt_threads) == {"worker"}
+
+    # Startup also seeds demo decisions; compare against the synchronous aggregation
+    groups = {g["group"]: (g["decisions"], g["labels"]) for g in response.json()["groups"]}
+    expected = {g["group"]: (g["decisions"], g["labels"]) for g in crud.get_group_label_counts(db)}
+    assert groups == expected
+    assert {"female", "male"} <= set(groups)
+
+
+def test_ndjson_rejects_long_line_inside_one_chunk(client, analyst):
+    """Test NDJSON_MAX_LINE_BYTES applies to every line, not only to a line split across chunks"""
+    from app.main import NDJSON_MAX_LINE_BYTES
+
+    line = b'{"decision_label": "APPROVED", "score": 0.9, "sensitive_attribute": "female"}'
+    long_line = b'{"decision_label": "APPROVED", "score": 0.9, "sensitive_attribute": "' \
+        + b"x" * NDJSON_MAX_LINE_BYTES + b'"}'
+    response = client.post("/decisions/stream", content=b"\n".join([line, long_line, line]), headers=analyst)
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["accepted"], summary["rejected"]) == (2, 1)
+    assert summary["errors"] == [{"line": 2, "errors": [{"loc": [], "msg": "Line too long"}]}]
+
+
+def _wait_committed(client, ticket_id, headers, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ticket = client.get(f"/ingest/tickets/{ticket_id}", headers=headers).json()
+        if ticket["status"] == STATUS_COMMITTED:
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"ticket {ticket_id} not committed: {ticket}")
+
+
+def test_dashboard_counts_match_table_after_every_insert_path(client, db, make_user):
+    """Test /stats/dashboard equals COUNT(*) after batch, single and async inserts and after reconcile"""
+    make_user("admin1", role="admin")
+    headers = auth_header(login(client, "admin1"))
+
+    def assert_matches_table():
+        stats = client.get("/stats/dashboard", headers=headers).json()
+        db.expire_all()
+        assert stats["total_decisions"] == db.query(models.AIDecision).count()
+        assert stats["bias_count"] == db.query(models.AIDecision).filter_by(decision_label="BIASED").count()
+
+    item = {"decision_label": "BIASED", "score": 0.4, "sensitive_attribute": "female"}
+    assert client.post("/decisions/batch", json=[item, {"score": "bad"}, item], headers=headers).status_code == 200
+    assert_matches_table()
+
+    assert client.post("/decisions/", json=item, headers=headers).status_code == 200
+    assert_matches_table()
+
+    response = client.post("/decisions/", params={"async_mode": True}, json=item, headers=headers)
+    assert response.status_code == 202
+    _wait_committed(client, response.json()["ticket_id"], headers)
+    assert_matches_table()
+
+    db.query(models.DecisionLabelCount).filter_by(label="BIASED").update({"count": 1000})
+    db.commit()
+    response = client.post("/admin/stats/reconcile", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["drift"]["BIASED"] < 0
+    assert_matches_table()
+
+
+def test_batch_ids_align_with_input_positions(client, db, analyst):
+    """Test /decisions/batch returns ids by input index, None for rejected items, and per-item errors"""
+    items = [
+        {"decision_label": "APPROVED", "score": 0.9, "sensitive_attribute": "female"},
+        {"decision_label": "REJECTED", "score": "high", "sensitive_attribute": "male"},
+        {"decision_label": "REJECTED", "score": 0.1, "sensitive_attribute": "male"},
+        "not an object",
+        {"decision_label": "APPROVED", "score": 0.5, "sensitive_attribute": "nonbinary"},
+    ]
+    response = client.post("/decisions/batch", json=items, headers=analyst)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert (body["inserted"], body["rejected"]) == (3, 2)
+    ids = body["ids"]
+    assert len(ids) == len(items)
+    assert [i for i, new_id in enumerate(ids) if new_id is None] == [1, 3]
+    assert ids[0] < ids[2] < ids[4]
+
+    # Each id points at the decision built from the item at that position
+    for index in (0, 2, 4):
+        decision = client.get(f"/decisions/{ids[index]}", headers=analyst).json()
+        assert decision["decision_label"] == items[index]["decision_label"]
+        assert decision["sensitive_attribute"] == items[index]["sensitive_attribute"]
+
+    assert [e["index"] for e in body["errors"]] == [1, 3]
+    assert [e["loc"] for e in body["errors"][0]["errors"]] == [["score"]]
+    for error in body["errors"]:
+        assert error["errors"] and all(set(e) == {"loc", "msg"} for e in error["errors"])
+
+
+def _page_ids(client, url, headers, limit, **params):
+    """Follows X-Next-Cursor to the end; returns every id in order"""
+    ids, cursor = [], None
+    while True:
+        query = dict(params, limit=limit, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= limit
+        ids.extend(item["id"] for item in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"decision_label": "REJECTED"},
+    {"owner": True},
+    {"min_score": 0.3, "max_score": 0.6},
+    {"start": "2021-03-01T00:00:00", "end": "2021-03-03T00:00:00"},
+    {"start": "2021-03-02T12:00:00", "end": "2021-03-03T12:00:00"},  # start inclusive, end exclusive
+    {"decision_label": "APPROVED", "owner": True, "min_score": 0.2, "end": "2021-03-03T00:00:00"},
+])
+def test_decision_pages_have_no_duplicates_or_gaps(client, db, make_user, filters):
+    """Test paging /decisions with each filter returns exactly the matching rows, newest first"""
+    user = make_user("pager", role="analyst")
+    other = make_user("other-owner", role="analyst")
+    headers = auth_header(login(client, "pager"))
+
+    labels = ["APPROVED", "REJECTED", "APPROVED", "BIASED"]
+    for day, owner in [(1, user), (2, other), (3, user)]:
+        # One bulk insert per day: every row of the day shares created_at
+        ids = crud.create_ai_decisions_bulk(db, [
+            schemas.AIDecisionCreate(decision_label=labels[i % 4], score=round(0.1 * i, 1), sensitive_attribute="x")
+            for i in range(1, 8)
+        ], owner.id)
+        db.query(models.AIDecision).filter(models.AIDecision.id.in_(ids)).update(
+            {"created_at": datetime(2021, 3, day, 12)}, synchronize_session=False
+        )
+    db.commit()
+
+    params = {k: v for k, v in filters.items() if k != "owner"}
+    if filters.get("owner"):
+        params["owner_id"] = user.id
+
+    query = db.query(models.AIDecision)
+    if "decision_label" in params:
+        query = query.filter(models.AIDecision.decision_label == params["decision_label"])
+    if "owner_id" in params:
+        query = query.filter(models.AIDecision.owner_id == params["owner_id"])
+    if "min_score" in params:
+        query = query.filter(models.AIDecision.score >= params["min_score"])
+    if "max_score" in params:
+        query = query.filter(models.AIDecision.score <= params["max_score"])
+    if "start" in params:
+        query = query.filter(models.AIDecision.created_at >= datetime.fromisoformat(params["start"]))
+    if "end" in params:
+        query = query.filter(models.AIDecision.created_at < datetime.fromisoformat(params["end"]))
+    expected = [d.id for d in query.order_by(models.AIDecision.created_at.desc(), models.AIDecision.id.desc())]
+    assert expected
+
+    ids = _page_ids(client, "/decisions", headers, limit=2, **params)
+    assert ids == expected
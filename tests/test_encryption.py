@@ -0,0 +1,33 @@
+# tests/test_encryption.py
+from app import security
+from app.security import blind_index, decrypt_many, encrypt_data
+
+
+def test_decrypt_many_keeps_case_variants_apart():
+    """Test values sharing a blind index still decrypt to their own plaintext"""
+    values = ["Male", "male", " MALE ", "female", None]
+    assert blind_index("Male") == blind_index("male") == blind_index(" MALE ")
+
+    tokens = [encrypt_data(v) if v else None for v in values]
+    assert decrypt_many(tokens) == values
+    assert decrypt_many(list(reversed(tokens))) == list(reversed(values))
+
+
+def test_decrypt_many_never_substitutes_corrupted_tokens():
+    """Test a tampered ciphertext is reported as undecryptable, not as a cached neighbour"""
+    good = encrypt_data("female")
+    corrupted = good[:-8] + ("A" * 8 if not good.endswith("A" * 8) else "B" * 8)
+
+    assert decrypt_many([good]) == ["female"]
+    assert decrypt_many([good, corrupted]) == ["female", "[Encrypted Data]"]
+
+
+def test_decrypt_many_decrypts_repeated_ciphertext_once(monkeypatch):
+    """Test identical ciphertexts within one call are decrypted a single time"""
+    calls = []
+    original = security.decrypt_data
+    monkeypatch.setattr(security, "decrypt_data", lambda token: calls.append(token) or original(token))
+
+    token, other = encrypt_data("female"), encrypt_data("female")
+    assert decrypt_many([token, None, other, token, token]) == ["female", None, "female", "female", "female"]
+    assert sorted(calls) == sorted([token, other])
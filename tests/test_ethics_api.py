@@ -0,0 +1,80 @@
+# tests/test_ethics_api.py
+import random
+from datetime import datetime
+
+from app import crud, models
+from tests.conftest import auth_header, login
+
+FROZEN_NOW = datetime(2030, 1, 1, 9, 30)
+
+DECISIONS = [
+    {"decision_label": "APPROVED", "score": 0.92, "sensitive_attribute": "female"},
+    {"decision_label": "REJECTED", "score": 0.15, "sensitive_attribute": "male"},
+    {"decision_label": "APPROVED", "score": 0.55, "sensitive_attribute": "male"},
+    {"decision_label": "BIASED", "score": 0.40, "sensitive_attribute": "nonbinary"},
+    {"decision_label": "REJECTED", "score": 0.99, "sensitive_attribute": "female"},
+]
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return FROZEN_NOW
+
+
+def _run(db, make_user, send):
+    """Runs `send(client, headers)` on a fresh database; returns its results and the audit chain"""
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, engine, ensure_schema
+    from app.main import app
+
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+    ensure_schema(engine)
+    random.seed(0)  # demo data seeded at startup
+    with TestClient(app) as client:
+        make_user("ethicist", role="analyst")
+        results = send(client, auth_header(login(client, "ethicist")))
+    chain = [
+        (log.chain_seq, log.event_type, log.decision_id, log.message, log.prev_hash, log.hash)
+        for log in db.query(models.DecisionLog).order_by(models.DecisionLog.chain_seq)
+    ]
+    return results, chain
+
+
+def test_batch_equals_sequential_evaluations(db, make_user, monkeypatch):
+    """Test /ethics/evaluate/batch gives the same results and hash chain as one call per decision"""
+    monkeypatch.setattr(crud, "datetime", _FrozenDatetime)
+
+    def batch(client, headers):
+        response = client.post("/ethics/evaluate/batch", json=DECISIONS, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def sequential(client, headers):
+        results = []
+        for decision in DECISIONS:
+            response = client.post("/ethics/evaluate", json=decision, headers=headers)
+            assert response.status_code == 200
+            results.append(response.json())
+        return results
+
+    batch_results, batch_chain = _run(db, make_user, batch)
+    sequential_results, sequential_chain = _run(db, make_user, sequential)
+
+    assert len(batch_results) == len(DECISIONS)
+    assert batch_results == sequential_results
+    assert batch_chain == sequential_chain
+    evaluation_hashes = [row[5] for row in batch_chain if row[1] == "ETHICS_EVALUATION"]
+    assert evaluation_hashes == [r["log_hash"] for r in batch_results]
+
+
+def test_batch_rejects_invalid_item(client, make_user):
+    """Test an invalid item rejects the whole batch before anything is written"""
+    make_user("ethicist2", role="analyst")
+    headers = auth_header(login(client, "ethicist2"))
+
+    response = client.post("/ethics/evaluate/batch", json=[DECISIONS[0], {"score": 2}], headers=headers)
+    assert response.status_code == 422
+
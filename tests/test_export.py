@@ -0,0 +1,112 @@
+# tests/test_export.py
+import csv
+import io
+import sys
+from datetime import datetime
+
+import orjson
+import pytest
+
+from app import crud, models, schemas
+from tests.conftest import auth_header, login
+
+OLD = datetime(2020, 1, 15, 12, 0)
+
+
+@pytest.fixture
+def admin(client, db, make_user):
+    user = make_user("exporter", role="admin")
+    ids = crud.create_ai_decisions_bulk(db, [
+        schemas.AIDecisionCreate(decision_label=label, score=0.25, sensitive_attribute=group)
+        for label, group in [("APPROVED", "female"), ("REJECTED", "male"), ("APPROVED", "male")]
+    ], user.id)
+    db.query(models.AIDecision).filter(models.AIDecision.id.in_(ids[:2])).update(
+        {"created_at": OLD}, synchronize_session=False
+    )
+    db.commit()
+    return auth_header(login(client, "exporter"))
+
+
+def _ndjson(response):
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_ndjson_decisions_export_keeps_attributes_encrypted(client, db, admin):
+    """Test the NDJSON export returns every decision with ciphertext unless decrypt=true"""
+    response = client.get("/admin/export/decisions", headers=admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"].endswith('.ndjson"')
+
+    rows = _ndjson(response)
+    assert len(rows) == db.query(models.AIDecision).count()
+    assert list(rows[0]) == list(crud.DECISION_EXPORT_COLUMNS)
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+    assert not {"female", "male"} & {r["sensitive_attribute"] for r in rows}
+
+    decrypted = _ndjson(client.get("/admin/export/decisions", params={"decrypt": True}, headers=admin))
+    assert [r["id"] for r in decrypted] == [r["id"] for r in rows]
+    assert {"female", "male"} <= {r["sensitive_attribute"] for r in decrypted}
+
+
+def test_csv_decisions_export_applies_date_filters(client, admin):
+    """Test the CSV export writes one header and honours start (inclusive) and end (exclusive)"""
+    response = client.get("/admin/export/decisions", params={
+        "format": "csv", "decrypt": True, "end": "2020-01-15T12:00:01",
+    }, headers=admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    reader = list(csv.reader(io.StringIO(response.text)))
+    assert reader[0] == list(crud.DECISION_EXPORT_COLUMNS)
+    rows = [dict(zip(reader[0], row)) for row in reader[1:]]
+    assert sorted(r["sensitive_attribute"] for r in rows) == ["female", "male"]
+    assert {r["created_at"] for r in rows} == {OLD.isoformat()}
+
+    response = client.get("/admin/export/decisions", params={
+        "format": "csv", "start": OLD.isoformat(), "end": "2020-01-15T12:00:00",
+    }, headers=admin)
+    assert list(csv.reader(io.StringIO(response.text))) == [list(crud.DECISION_EXPORT_COLUMNS)]
+
+
+def test_logs_export_filters_by_event_type(client, db, admin):
+    """Test the log export includes chain columns and the event_type filter, and audits itself"""
+    client.get("/admin/export/decisions", headers=admin)
+    rows = _ndjson(client.get("/admin/export/logs", params={"event_type": "EXPORT"}, headers=admin))
+
+    db.expire_all()
+    exports = db.query(models.DecisionLog).filter_by(event_type="EXPORT").count()
+    # The export being streamed is logged before its rows are read
+    assert len(rows) == exports == 2
+    assert {r["event_type"] for r in rows} == {"EXPORT"}
+    assert all(r["hash"] and r["prev_hash"] for r in rows)
+
+
+def test_export_rejects_unknown_format_and_non_admins(client, make_user, admin):
+    """Test bad formats return 400 and only admins can export"""
+    response = client.get("/admin/export/decisions", params={"format": "xlsx"}, headers=admin)
+    assert response.status_code == 400
+
+    make_user("export-viewer")
+    viewer = auth_header(login(client, "export-viewer"))
+    assert client.get("/admin/export/decisions", headers=viewer).status_code == 403
+
+
+def test_parquet_without_pyarrow_returns_400(client, admin, monkeypatch):
+    """Test a Parquet request fails fast with 400 when pyarrow is not installed"""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)  # makes `import pyarrow` raise ImportError
+
+    response = client.get("/admin/export/decisions", params={"format": "parquet"}, headers=admin)
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
+
+
+def test_parquet_export_round_trips(client, db, admin):
+    """Test the Parquet export reads back with every decision"""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = client.get("/admin/export/decisions", params={"format": "parquet"}, headers=admin)
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == list(crud.DECISION_EXPORT_COLUMNS)
+    assert table.num_rows == db.query(models.AIDecision).count()
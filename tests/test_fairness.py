@@ -0,0 +1,123 @@
+# tests/test_fairness.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from metrics.group_confusion import GroupConfusion
+from services.fairness_evaluator import FairnessEvaluator
+
+
+def _random_frame(seed: int, size: int = 1000, groups=("male", "female", "other")):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "gender": rng.choice(groups, size),
+        "approved": rng.integers(0, 2, size),
+        "predicted": rng.integers(0, 2, size),
+    })
+
+
+def test_group_rates_known_values():
+    """Test per-group rates on a hand-computed example"""
+    confusion = GroupConfusion.from_arrays(
+        y_true=[1, 0, 1, 1, 0, 0],
+        y_pred=[1, 1, 0, 1, 0, 0],
+        sensitive=["a", "a", "a", "b", "b", "b"],
+    )
+    assert confusion.selection_rates() == pytest.approx({"a": 2 / 3, "b": 1 / 3})
+    assert confusion.true_positive_rates() == pytest.approx({"a": 0.5, "b": 1.0})
+    assert confusion.false_positive_rates() == pytest.approx({"a": 1.0, "b": 0.0})
+    assert confusion.demographic_parity_difference() == pytest.approx(1 / 3)
+    assert confusion.equalized_odds_difference() == pytest.approx(1.0)
+
+
+def test_merge_equals_single_pass():
+    """Test that merged chunk counts equal counts over the whole data"""
+    df = _random_frame(seed=1)
+    whole = GroupConfusion.from_frame(df, pred_col="predicted")
+
+    merged = GroupConfusion.from_frame(df.iloc[:300], pred_col="predicted")
+    for start in range(300, len(df), 250):
+        merged = merged.merge(GroupConfusion.from_frame(df.iloc[start:start + 250], pred_col="predicted"))
+
+    assert merged.selection_rates() == pytest.approx(whole.selection_rates())
+    assert merged.equalized_odds_difference() == pytest.approx(whole.equalized_odds_difference())
+
+
+def test_categorical_groups_match_object_groups():
+    """Test that categorical codes give the same result as string groups"""
+    df = _random_frame(seed=2)
+    as_category = df.assign(gender=df["gender"].astype("category"))
+
+    assert GroupConfusion.from_frame(as_category).demographic_parity_difference() == pytest.approx(
+        GroupConfusion.from_frame(df).demographic_parity_difference()
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_matches_fairlearn(seed):
+    """Test equivalence with fairlearn's demographic parity and equalized odds"""
+    metrics = pytest.importorskip("fairlearn.metrics")
+    df = _random_frame(seed)
+    confusion = GroupConfusion.from_frame(df, pred_col="predicted")
+
+    expected_dp = metrics.demographic_parity_difference(
+        df["approved"], df["predicted"], sensitive_features=df["gender"]
+    )
+    expected_eo = metrics.equalized_odds_difference(
+        df["approved"], df["predicted"], sensitive_features=df["gender"]
+    )
+
+    assert confusion.demographic_parity_difference() == pytest.approx(expected_dp)
+    assert confusion.equalized_odds_difference() == pytest.approx(expected_eo)
+
+
+@pytest.mark.parametrize("dataset", ["datasets/dummy.csv", "datasets/biased.csv"])
+def test_evaluator_fast_path_matches_fairlearn(dataset):
+    """Test that FairnessEvaluator gives the same output on both paths"""
+    pytest.importorskip("fairlearn")
+    df = pd.read_csv(dataset)
+    evaluator = FairnessEvaluator()
+
+    fast = evaluator.evaluate(df)
+    reference = evaluator.evaluate(df, fast=False)
+
+    assert fast["metrics"] == pytest.approx(reference["metrics"])
+    assert fast["risk_analysis"] == reference["risk_analysis"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("dataset", ["datasets/dummy.csv", "datasets/biased.csv"])
+def test_chunked_evaluation_matches_in_memory(dataset, workers):
+    """Test that out-of-core evaluation gives the same output as evaluate()"""
+    evaluator = FairnessEvaluator()
+
+    expected = evaluator.evaluate(pd.read_csv(dataset))
+    streamed = evaluator.evaluate_file(dataset, chunksize=37, workers=workers)
+
+    assert streamed["metrics"] == pytest.approx(expected["metrics"])
+    assert streamed["risk_analysis"] == expected["risk_analysis"]
+
+
+def test_chunked_evaluation_reuses_process_pool():
+    """Test parallel evaluations share one long-lived pool instead of spawning one per call"""
+    from services import fairness_evaluator
+
+    evaluator = FairnessEvaluator()
+    evaluator.evaluate_file("datasets/biased.csv", chunksize=37, workers=2)
+    pool = fairness_evaluator._pool
+    assert pool is not None
+    evaluator.evaluate_file("datasets/dummy.csv", chunksize=37, workers=2)
+    assert fairness_evaluator._pool is pool
+
+
+def test_chunked_evaluation_rejects_missing_columns(tmp_path):
+    """Test that missing columns are reported before any chunk is read"""
+    path = tmp_path / "bad.csv"
+    path.write_text("gender,income\nmale,100\n")
+
+    with pytest.raises(ValueError):
+        FairnessEvaluator().evaluate_file(path)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+# tests/test_fairness_monitor.py
+from datetime import datetime
+
+import pytest
+
+from app import crud, models, schemas
+from services import fairness_monitor as fairness_monitor_module
+from services.fairness_monitor import FairnessMonitor
+
+START = 1_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the monitor's wall clock; set clock.now to advance time"""
+    class Clock:
+        now = START
+
+        @classmethod
+        def time(cls):
+            return cls.now
+
+    monkeypatch.setattr(fairness_monitor_module, "time", Clock)
+    return Clock
+
+
+def _events(group, approved, count, timestamp=START):
+    return [(group, approved, timestamp)] * count
+
+
+def test_time_window_expires_old_buckets(clock):
+    """Test decisions leave the time window once their bucket is older than window_seconds"""
+    monitor = FairnessMonitor(window_seconds=100, window_count=1000, min_group_size=1, buckets=10)
+    monitor.observe_many(_events("a", True, 3) + _events("b", False, 2, START + 50))
+
+    clock.now = START + 60
+    assert monitor.snapshot()["time_window"]["decisions"] == 5
+
+    clock.now = START + 110
+    window = monitor.snapshot()["time_window"]
+    assert window["decisions"] == 2
+    assert window["approval_rates"] == {"b": 0.0}
+
+    clock.now = START + 160
+    assert monitor.snapshot()["time_window"]["decisions"] == 0
+    # The count window does not expire with time
+    assert monitor.snapshot()["count_window"]["decisions"] == 5
+
+
+def test_count_window_keeps_last_decisions(clock):
+    """Test the count window only reflects the last window_count decisions"""
+    monitor = FairnessMonitor(window_seconds=3600, window_count=4, min_group_size=1)
+    monitor.observe_many(_events("a", False, 3) + _events("a", True, 2) + _events("b", True, 2))
+
+    window = monitor.snapshot()["count_window"]
+    assert window["decisions"] == 4
+    assert window["approval_rates"] == {"a": 1.0, "b": 1.0}
+    assert monitor.snapshot()["time_window"]["decisions"] == 7
+
+
+def test_min_group_size_gates_parity(clock):
+    """Test groups below min_group_size are left out of the parity difference"""
+    monitor = FairnessMonitor(window_seconds=3600, window_count=1000, min_group_size=3)
+
+    assert monitor.observe_many(_events("a", True, 3) + _events("b", False, 2)) == []
+    window = monitor.snapshot()["time_window"]
+    assert window["approval_rates"] == {"a": 1.0}
+    assert (window["demographic_parity_difference"], window["risk_level"]) == (0.0, "LOW")
+
+    alerts = monitor.observe("b", False, START)
+    assert {a["window"] for a in alerts} == {"time", "count"}
+    assert all(a["risk_level"] == "HIGH" and a["demographic_parity_difference"] == 1.0 for a in alerts)
+
+
+def test_alerts_only_on_escalation(clock):
+    """Test an alert fires when a window's risk rises, not while it stays high"""
+    monitor = FairnessMonitor(window_seconds=100, window_count=1000, min_group_size=1, buckets=10)
+
+    assert len(monitor.observe_many(_events("a", True, 1) + _events("b", False, 1))) == 2
+    assert monitor.observe_many(_events("a", True, 1) + _events("b", False, 1)) == []
+
+    # Old decisions expire from the time window; fresh balanced data brings it back to LOW
+    clock.now = START + 200
+    assert monitor.observe_many(_events("a", True, 2, clock.now) + _events("b", True, 2, clock.now)) == []
+    assert monitor.snapshot()["time_window"]["risk_level"] == "LOW"
+    alerts = monitor.observe_many(_events("b", False, 1, clock.now))
+    assert [(a["window"], a["risk_level"]) for a in alerts] == [("time", "MEDIUM")]
+
+
+@pytest.fixture
+def live_monitor(monkeypatch):
+    """Swaps the app's monitor for one with a small group size; the count window never alerts"""
+    from app import monitoring
+
+    monitor = FairnessMonitor(window_seconds=3600, window_count=1, min_group_size=2)
+    monkeypatch.setattr(monitoring, "fairness_monitor", monitor)
+    return monitor
+
+
+def _insert(db, owner_id, *pairs):
+    crud.create_ai_decisions_bulk(db, [
+        schemas.AIDecisionCreate(decision_label=label, score=0.5, sensitive_attribute=group)
+        for group, label in pairs
+    ], owner_id)
+
+
+def test_committed_inserts_feed_monitor_and_alert_once(db, live_monitor):
+    """Test committed decisions reach the monitor and one ALERT log is written per escalation"""
+    user = models.User(username="monitor", email="monitor@example.com", password_hash="x", role="admin")
+    db.add(user)
+    db.commit()
+
+    _insert(db, user.id, ("female", "APPROVED"), ("female", "APPROVED"))
+    assert live_monitor.snapshot()["time_window"]["approval_rates"] == {"female": 1.0}
+
+    _insert(db, user.id, ("male", "REJECTED"), ("male", "REJECTED"))
+    _insert(db, user.id, ("male", "REJECTED"), ("female", "APPROVED"))
+    assert live_monitor.snapshot()["time_window"]["risk_level"] == "HIGH"
+
+    alerts = db.query(models.DecisionLog).filter_by(event_type="ALERT").all()
+    assert len(alerts) == 1
+    assert "(HIGH)" in alerts[0].message and "female=1.00, male=0.00" in alerts[0].message
+
+
+def test_rolled_back_decisions_do_not_reach_monitor(db, live_monitor):
+    """Test events queued in a rolled back transaction are discarded"""
+    db.add(models.User(username="rolled", email="rolled@example.com", password_hash="x", role="admin"))
+    db.flush()
+    crud.queue_fairness_events(db, ["female", "male"], ["APPROVED", "REJECTED"], datetime.utcnow())
+    db.rollback()
+    db.commit()
+    assert live_monitor.snapshot()["time_window"]["decisions"] == 0
@@ -0,0 +1,70 @@
+# tests/test_ingest_queue.py
+import pytest
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+from app.ingest_queue import (
+    IngestQueue, QueueFullError, KIND_DECISION, STATUS_COMMITTED, STATUS_FAILED,
+)
+
+ACTOR = {"id": 1, "sub": "tester"}
+
+
+def _decision(label="APPROVED"):
+    return schemas.AIDecisionCreate(decision_label=label, score=0.5, sensitive_attribute="female")
+
+
+def _queue(**kwargs):
+    return IngestQueue(SessionLocal, flush_interval=0.05, retry_backoff=0, **kwargs)
+
+
+def test_transient_flush_error_is_retried(db, monkeypatch):
+    """Test a batch that fails once is retried and committed, not marked failed"""
+    original = crud.insert_ai_decisions
+    calls = []
+
+    def flaky(db, decisions, owner_id, labels=None):
+        calls.append(len(decisions))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return original(db, decisions, owner_id, labels=labels)
+
+    monkeypatch.setattr(crud, "insert_ai_decisions", flaky)
+    ingest = _queue(flush_retries=2)
+    ingest.start()
+    tickets = [ingest.submit(KIND_DECISION, _decision(), ACTOR) for _ in range(3)]
+    ingest.stop()
+
+    assert [ingest.status(t)["status"] for t in tickets] == [STATUS_COMMITTED] * 3
+    assert db.query(models.AIDecision).count() == 3
+
+
+def test_bad_row_fails_alone(db, monkeypatch):
+    """Test a persistently failing batch falls back to per-item writes"""
+    original = crud.insert_ai_decisions
+
+    def reject_bad(db, decisions, owner_id, labels=None):
+        if any(d.decision_label == "BAD" for d in decisions):
+            raise ValueError("bad row")
+        return original(db, decisions, owner_id, labels=labels)
+
+    monkeypatch.setattr(crud, "insert_ai_decisions", reject_bad)
+    ingest = _queue(flush_retries=1)
+    ingest.start()
+    tickets = [ingest.submit(KIND_DECISION, _decision(label), ACTOR) for label in ("APPROVED", "BAD", "REJECTED")]
+    ingest.stop()
+
+    assert [ingest.status(t)["status"] for t in tickets] == [STATUS_COMMITTED, STATUS_FAILED, STATUS_COMMITTED]
+    assert crud.get_label_counts(db) == {"APPROVED": 1, "REJECTED": 1}
+
+
+def test_stop_drains_and_rejects_late_submits(db):
+    """Test every accepted ticket is flushed on stop and later submits are refused"""
+    ingest = _queue()
+    ingest.start()
+    tickets = [ingest.submit(KIND_DECISION, _decision(), ACTOR) for _ in range(20)]
+    ingest.stop()
+
+    assert all(ingest.status(t)["status"] == STATUS_COMMITTED for t in tickets)
+    with pytest.raises(QueueFullError):
+        ingest.submit(KIND_DECISION, _decision(), ACTOR)
@@ -0,0 +1,173 @@
+# tests/test_log_archive.py
+import gzip
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, log_archive, models
+from tests.conftest import auth_header, login
+
+OLD_MONTHS = [datetime(2020, 1, 10), datetime(2020, 1, 20), datetime(2020, 2, 5), datetime(2020, 2, 6)]
+
+
+@pytest.fixture
+def logs(db, tmp_path, monkeypatch):
+    """Four logs in two long-expired months, two recent ones, all covered by a checkpoint"""
+    monkeypatch.setattr(log_archive, "ARCHIVE_DIR", tmp_path)
+    recent = datetime.utcnow() - timedelta(hours=1)
+    crud.append_decision_logs(db, [
+        {"event_type": "NOTE", "message": f"entry {i}", "created_at": ts}
+        for i, ts in enumerate(OLD_MONTHS + [recent, recent + timedelta(minutes=1)])
+    ])
+    db.commit()
+    assert crud.verify_audit_chain(db)["valid"]
+    return db
+
+
+def _all_pages(db, limit):
+    seen, cursor = [], None
+    while True:
+        page, cursor = log_archive.list_decision_logs(db, limit, cursor)
+        seen.extend(log.chain_seq for log in page)
+        if not cursor:
+            return seen
+
+
+def test_archive_moves_old_months_and_reads_through(logs, tmp_path):
+    """Test expired months leave the hot table but stay readable and verifiable"""
+    archived = log_archive.archive_old_logs(logs)
+    assert [(a["period_start"], a["rows"]) for a in archived] == [(datetime(2020, 1, 1), 2), (datetime(2020, 2, 1), 2)]
+    assert logs.query(models.DecisionLog).count() == 2
+    assert len(list(tmp_path.glob("*.ndjson.gz"))) == 2
+
+    assert _all_pages(logs, limit=3) == [6, 5, 4, 3, 2, 1]
+    result = crud.verify_audit_chain(logs, full=True)
+    assert result["valid"] and result["to_seq"] == 6
+
+
+def test_tampered_archive_fails_sha256_check(logs):
+    """Test an archive file edited after the fact is rejected by reads and verification"""
+    log_archive.archive_old_logs(logs)
+    archive = logs.query(models.DecisionLogArchive).order_by(models.DecisionLogArchive.period_start).first()
+    with gzip.open(archive.path, "rb") as f:
+        content = f.read()
+    with gzip.open(archive.path, "wb") as f:
+        f.write(content.replace(b"entry 0", b"entry X"))
+
+    with pytest.raises(log_archive.ArchiveIntegrityError):
+        _all_pages(logs, limit=10)
+    assert not crud.verify_audit_chain(logs, full=True)["valid"]
+
+    # Same records, different bytes: the chain alone would still verify, the recorded digest does not
+    with gzip.open(archive.path, "wb", compresslevel=1) as f:
+        f.write(content)
+    result = crud.verify_audit_chain(logs, full=True)
+    assert not result["valid"] and "sha256" in result["error"]
+
+
+def test_concurrent_archivers_do_not_duplicate_months(logs, tmp_path, monkeypatch):
+    """Test a worker that loses the race discards its file instead of recording a duplicate"""
+    from app.database import SessionLocal
+
+    original = log_archive._write_archive
+    raced = []
+
+    def write_then_race(db, start, end, path):
+        result = original(db, start, end, path)
+        if not raced:
+            raced.append(True)
+            other = SessionLocal()
+            try:
+                log_archive.archive_old_logs(other)
+            finally:
+                other.close()
+        return result
+
+    monkeypatch.setattr(log_archive, "_write_archive", write_then_race)
+    assert log_archive.archive_old_logs(logs) == []
+
+    manifests = logs.query(models.DecisionLogArchive).all()
+    assert sorted(m.period_start for m in manifests) == [datetime(2020, 1, 1), datetime(2020, 2, 1)]
+    assert sorted(str(p) for p in tmp_path.glob("*.ndjson.gz")) == sorted(m.path for m in manifests)
+    assert crud.verify_audit_chain(logs, full=True)["valid"]
+
+
+def test_admin_logs_pages_tied_timestamps_and_exclusive_end(client, db, make_user, tmp_path, monkeypatch):
+    """Test /admin/logs pages through rows sharing created_at without duplicates or gaps"""
+    monkeypatch.setattr(log_archive, "ARCHIVE_DIR", tmp_path)
+    make_user("auditor", role="admin")
+    headers = auth_header(login(client, "auditor"))
+
+    day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    crud.append_decision_logs(db, [
+        {"event_type": "TIED" if i < 7 else "NEXT_DAY", "message": f"tied entry {i}",
+         "created_at": day + timedelta(hours=6) if i < 7 else day + timedelta(days=1)}
+        for i in range(9)
+    ])
+    db.commit()
+
+    def pages(**params):
+        ids, cursor = [], None
+        while True:
+            response = client.get("/admin/logs", params=dict(params, limit=3, **({"cursor": cursor} if cursor else {})),
+                                  headers=headers)
+            assert response.status_code == 200, response.text
+            ids.extend(log["id"] for log in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return ids
+
+    def expected(*conditions):
+        rows = db.query(models.DecisionLog).filter(*conditions)
+        return [log.id for log in rows.order_by(models.DecisionLog.created_at.desc(), models.DecisionLog.id.desc())]
+
+    tied = pages(event_type="TIED")
+    assert tied == expected(models.DecisionLog.event_type == "TIED")
+    assert len(tied) == len(set(tied)) == 7
+
+    assert pages() == expected()
+
+    # The end bound is exclusive: next midnight selects the whole day and nothing after it
+    next_midnight = (day + timedelta(days=1)).isoformat()
+    assert pages(start=day.isoformat(), end=next_midnight) == expected(
+        models.DecisionLog.created_at >= day, models.DecisionLog.created_at < day + timedelta(days=1)
+    ) == tied
+
+
+def test_archive_pages_verify_each_file_once(logs, monkeypatch):
+    """Test paging through archived months hashes each file once, and again only after it changes"""
+    log_archive.archive_old_logs(logs)
+    log_archive.purge_archive_cache()
+    original = log_archive.iter_archive_records
+    reads = []
+    monkeypatch.setattr(log_archive, "iter_archive_records", lambda archive: reads.append(archive.path) or original(archive))
+
+    assert _all_pages(logs, limit=1) == [6, 5, 4, 3, 2, 1]
+    assert _all_pages(logs, limit=2) == [6, 5, 4, 3, 2, 1]
+    assert len(reads) == len(set(reads)) == 2
+
+    # A file changed after it was cached is verified again (and fails)
+    archive = logs.query(models.DecisionLogArchive).order_by(models.DecisionLogArchive.period_start).first()
+    with gzip.open(archive.path, "rb") as f:
+        content = f.read()
+    with gzip.open(archive.path, "wb") as f:
+        f.write(content.replace(b"entry 0", b"entry X"))
+    stat = os.stat(archive.path)
+    os.utime(archive.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # a later edit
+    with pytest.raises(log_archive.ArchiveIntegrityError):
+        _all_pages(logs, limit=10)
+
+
+def test_large_archives_are_streamed_uncached(logs, monkeypatch):
+    """Test months above ARCHIVE_CACHE_MAX_ROWS are scanned per page instead of held in memory"""
+    log_archive.archive_old_logs(logs)
+    log_archive.purge_archive_cache()
+    monkeypatch.setattr(log_archive, "ARCHIVE_CACHE_MAX_ROWS", 1)
+    original = log_archive.iter_archive_records
+    reads = []
+    monkeypatch.setattr(log_archive, "iter_archive_records", lambda archive: reads.append(archive.path) or original(archive))
+
+    assert _all_pages(logs, limit=2) == [6, 5, 4, 3, 2, 1]
+    assert len(reads) > 2
+    assert len(log_archive._verified_archives) == 0
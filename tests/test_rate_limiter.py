@@ -0,0 +1,157 @@
+# tests/test_rate_limiter.py
+import pytest
+
+from utils.rate_limiter import MemoryRateLimitBackend, Quota, RateLimiter, SQLiteRateLimitBackend
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_sliding_window_weights_previous_window():
+    """Test previous window hits decay linearly instead of resetting at the boundary"""
+    clock = FakeClock()
+    limiter = RateLimiter(limit=10, window=60, clock=clock)
+
+    for _ in range(10):
+        assert limiter.hit("user")[0]
+    allowed, retry_after = limiter.hit("user")
+    assert not allowed and retry_after > 0
+
+    # Half-way into the next window, 10 * 0.5 = 5 hits still count
+    clock.now += 90
+    assert sum(limiter.hit("user")[0] for _ in range(10)) == 5
+
+
+def test_idle_keys_are_evicted():
+    """Test keys idle for two windows are dropped"""
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(evict_interval=0)
+    limiter = RateLimiter(limit=5, window=10, backend=backend, clock=clock)
+
+    for i in range(100):
+        limiter.hit(f"user-{i}")
+    assert len(backend) == 100
+
+    clock.now += 25
+    limiter.hit("active")
+    assert len(backend) == 1
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    """Test two limiters on the same SQLite file enforce one limit (as separate workers would)"""
+    clock = FakeClock()
+    path = tmp_path / "limits.sqlite3"
+    worker_a = RateLimiter(limit=4, window=60, backend=SQLiteRateLimitBackend(path), clock=clock)
+    worker_b = RateLimiter(limit=4, window=60, backend=SQLiteRateLimitBackend(path), clock=clock)
+
+    results = [limiter.hit("user")[0] for limiter in (worker_a, worker_b) * 3]
+    assert results == [True, True, True, True, False, False]
+
+    worker_a.backend.close()
+    worker_b.backend.close()
+
+
+def _limited_client(limit, quotas=()):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.main import _rate_limit_key
+    from utils.rate_limiter import RateLimitMiddleware
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    @app.post("/auth/login")
+    def auth_login():
+        return {"ok": True}
+
+    @app.post("/decisions/")
+    def create_decision():
+        return {"ok": True}
+
+    limiter = RateLimiter(limit=limit, window=60, clock=FakeClock())
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, key_func=_rate_limit_key, quotas=quotas)
+    return TestClient(app)
+
+
+def _bearer(user_id):
+    from app.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'user{user_id}', 'id': user_id})}"}
+
+
+def test_middleware_returns_429_with_retry_after():
+    """Test the limit answers 429 with a Retry-After header and exempts /health"""
+    client = _limited_client(limit=2)
+
+    assert [client.get("/ping").status_code for _ in range(3)] == [200, 200, 429]
+    response = client.get("/ping")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json() == {"detail": "Rate limit exceeded."}
+    assert client.get("/health").status_code == 200
+
+
+def test_middleware_keys_users_and_anonymous_clients_separately():
+    """Test authenticated requests count per user, anonymous ones per client IP"""
+    client = _limited_client(limit=2)
+    alice, bob = _bearer(1), _bearer(2)
+
+    assert [client.get("/ping", headers=alice).status_code for _ in range(3)] == [200, 200, 429]
+    # Same IP, different user: own budget; anonymous requests from that IP too
+    assert client.get("/ping", headers=bob).status_code == 200
+    assert client.get("/ping").status_code == 200
+    # An invalid token falls back to the IP key
+    bad = {"Authorization": "Bearer not-a-token"}
+    assert [client.get("/ping", headers=bad).status_code for _ in range(2)] == [200, 429]
+
+
+def test_read_and_ingest_quotas_do_not_consume_auth_limit():
+    """Test polling reads and ingestion have their own budgets while auth keeps the tight default"""
+    client = _limited_client(limit=2, quotas=(
+        Quota("ingest", 5, 60, prefixes=("/decisions",), methods=frozenset({"POST"})),
+        Quota("read", 3, 60, prefixes=("/",), methods=frozenset({"GET"})),
+    ))
+    user = _bearer(1)
+
+    assert [client.get("/ping", headers=user).status_code for _ in range(4)] == [200, 200, 200, 429]
+    assert [client.post("/decisions/", headers=user).status_code for _ in range(6)] == [200] * 5 + [429]
+    assert [client.post("/auth/login").status_code for _ in range(3)] == [200, 200, 429]
+
+
+def test_app_quotas_route_polling_and_ingest_away_from_default():
+    """Test the app's quota table sends GETs and ingestion POSTs to their own budgets"""
+    from app.main import RATE_LIMIT_QUOTAS
+
+    def quota(method, path):
+        return next((q.name for q in RATE_LIMIT_QUOTAS if q.matches(method, path)), None)
+
+    assert quota("GET", "/stats/dashboard") == "read"
+    assert quota("GET", "/decisions") == "read"
+    assert quota("POST", "/decisions/batch") == "ingest"
+    assert quota("POST", "/ethics/evaluate/batch") == "ingest"
+    assert quota("POST", "/auth/login") is None
+    assert quota("POST", "/auth/refresh") is None
+
+
+def test_security_manager_uses_shared_backend():
+    """Test SecurityManager limits through the SQLite file shared by all workers"""
+    from services.security_manager import SecurityException, SecurityManager
+
+    first, second = SecurityManager(), SecurityManager()
+    assert isinstance(first.rate_limiter.backend, SQLiteRateLimitBackend)
+    first.check_rate_limit("shared-user", max_requests=1)
+    with pytest.raises(SecurityException):
+        second.check_rate_limit("shared-user", max_requests=1)
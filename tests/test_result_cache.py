@@ -0,0 +1,135 @@
+# tests/test_result_cache.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.result_cache import DatasetResultCache
+from tests.conftest import auth_header, login
+
+
+def _counting(value="result"):
+    calls = []
+
+    def compute():
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+def test_changed_file_is_recomputed(tmp_path):
+    """Test a modified CSV gets a new fingerprint and the result is computed again"""
+    dataset = tmp_path / "data.csv"
+    dataset.write_text("gender,approved\nf,1\n")
+    cache = DatasetResultCache()
+    compute, calls = _counting()
+
+    cache.get_or_compute(dataset, compute)
+    cache.get_or_compute(dataset, compute)
+    assert len(calls) == 1
+
+    # Same size, new content and a later mtime, as an editor saving the file would leave it
+    before = os.stat(dataset)
+    dataset.write_text("gender,approved\nm,0\n")
+    os.utime(dataset, ns=(before.st_atime_ns, before.st_mtime_ns + 1_000_000_000))
+    cache.get_or_compute(dataset, compute)
+    assert len(calls) == 2
+
+    dataset.write_text("gender,approved\nm,0\nf,1\n")
+    cache.get_or_compute(dataset, compute)
+    assert len(calls) == 3
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    """Test the cache keeps max_entries results and evicts the least recently used one"""
+    paths = []
+    for name in ("a", "b", "c"):
+        paths.append(tmp_path / f"{name}.csv")
+        paths[-1].write_text(name)
+    a, b, c = paths
+    cache = DatasetResultCache(max_entries=2)
+    compute, calls = _counting()
+
+    cache.get_or_compute(a, compute)
+    cache.get_or_compute(b, compute)
+    cache.get_or_compute(a, compute)  # a is now the most recently used
+    cache.get_or_compute(c, compute)  # evicts b
+    assert len(calls) == 3
+
+    cache.get_or_compute(a, compute)
+    assert len(calls) == 3
+    cache.get_or_compute(b, compute)
+    assert len(calls) == 4
+
+
+def test_concurrent_misses_compute_once(tmp_path):
+    """Test N concurrent callers for the same dataset share a single computation"""
+    dataset = tmp_path / "data.csv"
+    dataset.write_text("gender,approved\nf,1\n")
+    cache = DatasetResultCache()
+    calls = []
+    started = threading.Event()
+
+    def slow_compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {"dp": 0.1}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_compute, dataset, slow_compute) for _ in range(8)]
+        results = [f.result(timeout=10) for f in futures]
+
+    assert started.is_set()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_compute_is_not_cached(tmp_path):
+    """Test an exception reaches the caller and the next call computes again"""
+    dataset = tmp_path / "data.csv"
+    dataset.write_text("x")
+    cache = DatasetResultCache()
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        cache.get_or_compute(dataset, failing)
+    compute, calls = _counting()
+    assert cache.get_or_compute(dataset, compute) == "result"
+    assert calls == ["result"]
+
+
+def test_invalidate_endpoint(client, make_user, tmp_path, monkeypatch):
+    """Test /admin/cache/invalidate drops one dataset's results or all of them"""
+    from app import main
+
+    (tmp_path / "datasets").mkdir()
+    for name in ("biased.csv", "fair.csv"):
+        (tmp_path / "datasets" / name).write_text(name)
+    monkeypatch.setattr(main, "project_root", tmp_path)
+    cache = DatasetResultCache()
+    monkeypatch.setattr(main, "_fairness_cache", cache)
+    compute, calls = _counting()
+    for name in ("biased.csv", "fair.csv"):
+        cache.get_or_compute(tmp_path / "datasets" / name, compute)
+
+    make_user("cache-admin", role="admin")
+    make_user("cache-viewer")
+    admin = auth_header(login(client, "cache-admin"))
+    viewer = auth_header(login(client, "cache-viewer"))
+    assert client.post("/admin/cache/invalidate", headers=viewer).status_code == 403
+
+    response = client.post("/admin/cache/invalidate", params={"dataset_name": "../biased.csv"}, headers=admin)
+    assert response.json() == {"status": "success", "removed": 1}
+    cache.get_or_compute(tmp_path / "datasets" / "fair.csv", compute)
+    assert len(calls) == 2
+
+    response = client.post("/admin/cache/invalidate", headers=admin)
+    assert response.json() == {"status": "success", "removed": 1}
+    cache.get_or_compute(tmp_path / "datasets" / "fair.csv", compute)
+    assert len(calls) == 3
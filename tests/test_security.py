@@ -54,5 +54,17 @@ def test_rate_limiting():
     with pytest.raises(SecurityException):
         security.check_rate_limit(user_id, max_requests=100)
 
+def test_audit_log_is_bounded():
+    """Test the in-memory audit log keeps only the most recent entries"""
+    security = SecurityManager()
+    size = security.audit_log.maxlen
+    
+    for i in range(size + 50):
+        security.log_audit_event("ACCESS", "test_user", f"request {i}")
+    
+    logs = security.get_audit_logs(limit=10)
+    assert len(security.audit_log) == size
+    assert [entry["details"] for entry in logs] == [f"request {i}" for i in range(size + 40, size + 50)]
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
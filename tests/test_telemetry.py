@@ -0,0 +1,40 @@
+# tests/test_telemetry.py
+import threading
+
+from utils.telemetry import MetricsRegistry
+
+
+def test_counter_merges_thread_shards():
+    """Test per-thread counter shards are summed at render time"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("status",))
+
+    def worker():
+        for _ in range(1000):
+            requests.inc("200")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    requests.inc("500")
+
+    assert requests.values() == {("200",): 4000, ("500",): 1}
+    assert 'requests_total{status="200"} 4000' in registry.render()
+
+
+def test_histogram_prometheus_format():
+    """Test histogram buckets are cumulative with +Inf, _sum and _count"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "/x")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/x"} 5.55' in text
+    assert 'latency_seconds_count{route="/x"} 3' in text
@@ -0,0 +1,253 @@
+"""
+Sliding-window-counter rate limiting with constant work per call.
+
+Each key keeps only three numbers: the start of its current window, the hit count
+in that window and the hit count of the previous window. The request rate is
+estimated as `previous * (1 - elapsed_fraction) + current`, so a call never scans
+per-request timestamps. Windows are anchored at a key's first hit.
+
+Two backends share the same algorithm:
+- MemoryRateLimitBackend: per-process dict, for single-process use (SecurityManager).
+- SQLiteRateLimitBackend: one row per key in a WAL-mode SQLite file, so every worker
+  process on the host enforces the same limit.
+
+RateLimitMiddleware can give route classes (e.g. reads, ingestion) their own Quota so
+polling or bulk clients do not exhaust the tight default budget used for auth.
+
+Keys idle for more than two windows carry no state that can still affect a
+decision and are evicted periodically.
+"""
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from utils.telemetry import REGISTRY
+
+RATE_LIMITED = REGISTRY.counter("rate_limited_requests_total", "Requests rejected by the rate limiter")
+
+EVICT_INTERVAL_SECONDS = 60.0
+
+
+def _advance(state: Optional[list], now: float, window: float) -> list:
+    """Rolls [window_start, current, previous] forward to the window containing `now`."""
+    if state is None:
+        return [now, 0, 0]
+    start, current, previous = state
+    elapsed_windows = int((now - start) // window)
+    if elapsed_windows >= 1:
+        previous = current if elapsed_windows == 1 else 0
+        current = 0
+        start += elapsed_windows * window
+    return [start, current, previous]
+
+
+def _decide(state: list, now: float, limit: int, window: float) -> Tuple[bool, float]:
+    """Counts the hit in `state` if allowed; returns (allowed, seconds until a retry may succeed)."""
+    start, current, previous = state
+    fraction = (now - start) / window
+    if previous * (1 - fraction) + current < limit:
+        state[1] = current + 1
+        return True, 0.0
+    if current >= limit:
+        # Wait for the next window, then for the carried-over weight to decay below the limit
+        retry_at = start + window + window * (1 - limit / current)
+    else:
+        retry_at = start + window * (1 - (limit - current) / previous)
+    return False, max(retry_at - now, 0.0)
+
+
+class MemoryRateLimitBackend:
+    """In-process state; each process enforces its own limit."""
+
+    def __init__(self, evict_interval: float = EVICT_INTERVAL_SECONDS):
+        self._state: Dict[str, Tuple[list, float]] = {}  # key -> ([start, current, previous], window)
+        self._lock = threading.Lock()
+        self._evict_interval = evict_interval
+        self._next_evict = 0.0
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            if now >= self._next_evict:
+                self._evict(now)
+            entry = self._state.get(key)
+            state = _advance(entry[0] if entry else None, now, window)
+            result = _decide(state, now, limit, window)
+            self._state[key] = (state, window)
+            return result
+
+    def _evict(self, now: float):
+        idle = [key for key, (state, window) in self._state.items() if state[0] + 2 * window <= now]
+        for key in idle:
+            del self._state[key]
+        self._next_evict = now + self._evict_interval
+
+    def __len__(self):
+        return len(self._state)
+
+
+class SQLiteRateLimitBackend:
+    """
+    State shared by all processes opening the same file. Each hit is one short
+    IMMEDIATE transaction (a point lookup and an upsert on the primary key).
+    """
+
+    def __init__(self, path: Union[str, Path], evict_interval: float = EVICT_INTERVAL_SECONDS,
+                 busy_timeout_ms: int = 1000):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._busy_timeout_ms = busy_timeout_ms
+        self._evict_interval = evict_interval
+        self._next_evict = 0.0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY, window_start REAL NOT NULL, window_seconds REAL NOT NULL,"
+                " current INTEGER NOT NULL, previous INTEGER NOT NULL) WITHOUT ROWID"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            # Limiter counters are not worth an fsync per request
+            conn.execute("PRAGMA synchronous = OFF")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Tuple[bool, float]:
+        conn = self._connection()
+        if now >= self._next_evict:
+            self._evict(conn, now)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, current, previous FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            state = _advance(list(row) if row else None, now, window)
+            result = _decide(state, now, limit, window)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_start, window_seconds, current, previous)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, state[0], window, state[1], state[2]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        self._next_evict = now + self._evict_interval
+        conn.execute("DELETE FROM rate_limits WHERE window_start + 2 * window_seconds <= ?", (now,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class RateLimiter:
+    """`limit` hits per `window` seconds per key, on the given backend."""
+
+    def __init__(self, limit: int, window: float, backend=None,
+                 clock: Callable[[], float] = time.time):
+        self.limit = limit
+        self.window = float(window)
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self._clock = clock  # wall clock: shared backends compare timestamps across processes
+
+    def hit(self, key: str, limit: Optional[int] = None, window: Optional[float] = None) -> Tuple[bool, float]:
+        """Records a hit for `key` if allowed. Returns (allowed, retry_after_seconds)."""
+        return self.backend.hit(
+            key,
+            self.limit if limit is None else limit,
+            self.window if window is None else float(window),
+            self._clock(),
+        )
+
+
+class Quota(NamedTuple):
+    """
+    A separate budget for requests whose method is in `methods` (None = any) and whose path
+    starts with one of `prefixes`. Counted under "<name>:<client key>", so it never
+    consumes the limiter's default budget.
+    """
+    name: str
+    limit: int
+    window: float
+    prefixes: Tuple[str, ...]
+    methods: Optional[FrozenSet[str]] = None
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and path.startswith(self.prefixes)
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware returning 429 with Retry-After once a client exceeds the limit.
+    `key_func(scope)` identifies the client; returning None skips limiting.
+    The first matching entry of `quotas` applies; other requests use the limiter's default.
+    Backend calls run in the threadpool so SQLite lock waits never block the event loop.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, key_func: Callable[[dict], Optional[str]],
+                 exempt_paths: Iterable[str] = ("/health", "/metrics"), quotas: Iterable[Quota] = ()):
+        from starlette.concurrency import run_in_threadpool
+
+        self._run_in_threadpool = run_in_threadpool
+        self.app = app
+        self.limiter = limiter
+        self.key_func = key_func
+        self.exempt_paths = set(exempt_paths)
+        self.quotas = list(quotas)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.key_func(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        quota = next((q for q in self.quotas if q.matches(scope["method"], scope["path"])), None)
+        if quota is None:
+            allowed, retry_after = await self._run_in_threadpool(self.limiter.hit, key)
+        else:
+            allowed, retry_after = await self._run_in_threadpool(
+                self.limiter.hit, f"{quota.name}:{key}", quota.limit, quota.window
+            )
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc()
+        body = b'{"detail":"Rate limit exceeded."}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})